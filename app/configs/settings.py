@@ -13,6 +13,9 @@ STATIC_DIR = os.path.join(BASE_DIR, "static")
 # 小程序任务结果存放地址
 RESULTS_DIR = os.path.join(os.path.dirname(BASE_DIR), "results")
 os.makedirs(RESULTS_DIR, exist_ok=True)
+# 查询结果时长轮询的最长等待（秒）；生成超过该时长仍未完成的任务视为失败（如进程重启导致任务中断）
+MINIPROGRAM_RESULT_MAX_WAIT = float(os.getenv("MINIPROGRAM_RESULT_MAX_WAIT", "30"))
+MINIPROGRAM_JOB_TIMEOUT = float(os.getenv("MINIPROGRAM_JOB_TIMEOUT", "600"))
 
 # system prompts存放地址
 SYSTEM_PROMPTS_DIR = os.path.join(BASE_DIR, "services", "llms", "prompts")
@@ -20,3 +23,155 @@ SYSTEM_PROMPTS_DIR = os.path.join(BASE_DIR, "services", "llms", "prompts")
 # 准备弃用：旧版大模型调用
 OPENAI_BASE_URL = "https://api.openai.com/v1"
 DEFAULT_MODEL = "gpt-4o-mini"
+
+# 大模型 provider 连接池配置（进程级共享 client，可通过环境变量调整）
+PROVIDER_HTTP2 = os.getenv("PROVIDER_HTTP2", "true").lower() == "true"
+PROVIDER_MAX_CONNECTIONS = int(os.getenv("PROVIDER_MAX_CONNECTIONS", "100"))
+PROVIDER_MAX_KEEPALIVE_CONNECTIONS = int(
+    os.getenv("PROVIDER_MAX_KEEPALIVE_CONNECTIONS", "20")
+)
+PROVIDER_KEEPALIVE_EXPIRY = float(os.getenv("PROVIDER_KEEPALIVE_EXPIRY", "60"))
+PROVIDER_CONNECT_TIMEOUT = float(os.getenv("PROVIDER_CONNECT_TIMEOUT", "10"))
+PROVIDER_READ_TIMEOUT = float(os.getenv("PROVIDER_READ_TIMEOUT", "120"))
+PROVIDER_MAX_RETRIES = int(os.getenv("PROVIDER_MAX_RETRIES", "2"))
+# 启动时预先建立到 provider 的连接（TLS 握手），减少首个请求的延迟
+PROVIDER_WARMUP = os.getenv("PROVIDER_WARMUP", "true").lower() == "true"
+
+# Qwen（DashScope 兼容模式）新加坡 baseURL
+QWEN_BASE_URL = "https://dashscope-intl.aliyuncs.com/compatible-mode/v1"
+# Gemini API 地址（仅用于启动预热）
+GEMINI_BASE_URL = "https://generativelanguage.googleapis.com"
+
+# 本地缓存文件存放地址（SQLite 磁盘缓存等）
+CACHE_DIR = os.getenv("CACHE_DIR") or os.path.join(os.path.dirname(BASE_DIR), "cache")
+
+# 洗稿结果缓存：内存 LRU + 可选 SQLite 磁盘层
+REWRITE_CACHE_ENABLED = os.getenv("REWRITE_CACHE_ENABLED", "true").lower() == "true"
+REWRITE_CACHE_MAX_ENTRIES = int(os.getenv("REWRITE_CACHE_MAX_ENTRIES", "256"))
+REWRITE_CACHE_TTL = float(os.getenv("REWRITE_CACHE_TTL", str(24 * 3600)))
+REWRITE_CACHE_DISK = os.getenv("REWRITE_CACHE_DISK", "false").lower() == "true"
+REWRITE_CACHE_MAX_DISK_ENTRIES = int(
+    os.getenv("REWRITE_CACHE_MAX_DISK_ENTRIES", "10000")
+)
+
+# 上传文件提取结果缓存（按文件内容 sha256 寻址）：内存 LRU + SQLite 磁盘层
+EXTRACTION_CACHE_ENABLED = (
+    os.getenv("EXTRACTION_CACHE_ENABLED", "true").lower() == "true"
+)
+EXTRACTION_CACHE_MAX_ENTRIES = int(os.getenv("EXTRACTION_CACHE_MAX_ENTRIES", "128"))
+EXTRACTION_CACHE_TTL = float(os.getenv("EXTRACTION_CACHE_TTL", str(7 * 24 * 3600)))
+EXTRACTION_CACHE_DISK = os.getenv("EXTRACTION_CACHE_DISK", "true").lower() == "true"
+EXTRACTION_CACHE_MAX_DISK_ENTRIES = int(
+    os.getenv("EXTRACTION_CACHE_MAX_DISK_ENTRIES", "5000")
+)
+
+# 长文本压缩（map_reduce）：每块字符上限与同时进行的分块摘要数
+SUMMARIZE_CHUNK_CHARS = int(os.getenv("SUMMARIZE_CHUNK_CHARS", "8000"))
+SUMMARIZE_CONCURRENCY = int(os.getenv("SUMMARIZE_CONCURRENCY", "4"))
+# 合并后的洗稿原文超过该 token 数（且不超过模型可用输入空间）时先按 REWRITE_LENGTH_MODE 压缩（0 表示不限制）
+REWRITE_SOURCE_MAX_TOKENS = int(os.getenv("REWRITE_SOURCE_MAX_TOKENS", "40000"))
+# 压缩方式默认直接截断；设为 map_reduce / single_summarize 时会额外调用模型摘要原文
+REWRITE_LENGTH_MODE = os.getenv("REWRITE_LENGTH_MODE", "truncate")
+# 分段并行洗稿（需显式开启）：原文超过 REWRITE_CHUNK_THRESHOLD 字符时按约 REWRITE_CHUNK_CHARS 分段同时改写
+# 各段独立改写，文风衔接不如整篇改写，默认 0 表示关闭
+REWRITE_CHUNK_THRESHOLD = int(os.getenv("REWRITE_CHUNK_THRESHOLD", "0"))
+REWRITE_CHUNK_CHARS = int(os.getenv("REWRITE_CHUNK_CHARS", "6000"))
+REWRITE_CHUNK_CONCURRENCY = int(os.getenv("REWRITE_CHUNK_CONCURRENCY", "4"))
+# 洗稿队列中 YouTube 字幕的长度策略与字符上限
+YOUTUBE_LENGTH_MODE = os.getenv("YOUTUBE_LENGTH_MODE", "truncate")
+YOUTUBE_MAX_CHARS = int(os.getenv("YOUTUBE_MAX_CHARS", "12000"))
+# 大于 0 时改按 token 数限制字幕长度
+YOUTUBE_MAX_TOKENS = int(os.getenv("YOUTUBE_MAX_TOKENS", "0"))
+
+# 本地 token 估算：词表缓存目录（离线读取）、未识别 provider 时使用的配置、短文本计数缓存
+TOKENIZER_CACHE_DIR = os.getenv("TOKENIZER_CACHE_DIR") or os.path.join(
+    CACHE_DIR, "tokenizers"
+)
+TOKENIZER_DEFAULT_PROFILE = os.getenv("TOKENIZER_DEFAULT_PROFILE", "openai")
+TOKEN_MEMO_SIZE = int(os.getenv("TOKEN_MEMO_SIZE", "1024"))
+TOKEN_MEMO_MAX_CHARS = int(os.getenv("TOKEN_MEMO_MAX_CHARS", "20000"))
+
+# 异步洗稿任务：同时执行的任务数、任务状态库（SQLite）与上传文件暂存目录、完成后的保留时长（秒）
+REWRITE_JOB_WORKERS = int(os.getenv("REWRITE_JOB_WORKERS", "2"))
+# 排队中（未开始执行）的任务数上限，超出时拒绝新任务
+REWRITE_JOB_MAX_QUEUED = int(os.getenv("REWRITE_JOB_MAX_QUEUED", "100"))
+REWRITE_JOB_DB = os.getenv("REWRITE_JOB_DB") or os.path.join(
+    CACHE_DIR, "rewrite_jobs.sqlite3"
+)
+REWRITE_JOB_FILES_DIR = os.getenv("REWRITE_JOB_FILES_DIR") or os.path.join(
+    CACHE_DIR, "rewrite_jobs"
+)
+REWRITE_JOB_RETENTION = float(os.getenv("REWRITE_JOB_RETENTION", str(24 * 3600)))
+# 清理过期任务的最短间隔（秒）：启动时清理一次，此后在任务结束时按该间隔清理
+REWRITE_JOB_PRUNE_INTERVAL = float(os.getenv("REWRITE_JOB_PRUNE_INTERVAL", "600"))
+# 单个任务的最多执行次数：执行中进程退出的任务在重启后重试，超过后记为失败
+REWRITE_JOB_MAX_ATTEMPTS = int(os.getenv("REWRITE_JOB_MAX_ATTEMPTS", "3"))
+
+# 洗稿队列中多个输入项的并发提取上限与单项超时（秒）
+EXTRACT_CONCURRENCY = int(os.getenv("EXTRACT_CONCURRENCY", "4"))
+EXTRACT_ITEM_TIMEOUT = float(os.getenv("EXTRACT_ITEM_TIMEOUT", "60"))
+
+# CPU 密集型提取（PDF/DOCX/网页正文/OCR）进程池配置
+# 进程数默认等于 CPU 核数；设为 0 时改在线程中执行
+EXTRACTOR_POOL_SIZE = int(os.getenv("EXTRACTOR_POOL_SIZE", str(os.cpu_count() or 1)))
+# worker 启动方式：spawn 在各平台行为一致，也避免 fork 带来的线程/锁状态问题
+EXTRACTOR_POOL_START_METHOD = os.getenv("EXTRACTOR_POOL_START_METHOD", "spawn")
+# 启动时预先拉起全部 worker 进程
+EXTRACTOR_POOL_WARMUP = os.getenv("EXTRACTOR_POOL_WARMUP", "false").lower() == "true"
+# 单个任务的 CPU 时间上限（秒，仅 POSIX 生效）与整体超时（秒）
+EXTRACTOR_CPU_TIME_LIMIT = float(os.getenv("EXTRACTOR_CPU_TIME_LIMIT", "60"))
+EXTRACTOR_TASK_TIMEOUT = float(os.getenv("EXTRACTOR_TASK_TIMEOUT", "120"))
+
+# 网页抓取：共享连接池与条件请求缓存
+URL_FETCH_TIMEOUT = float(os.getenv("URL_FETCH_TIMEOUT", "30"))
+URL_FETCH_MAX_CONNECTIONS = int(os.getenv("URL_FETCH_MAX_CONNECTIONS", "50"))
+URL_CACHE_MAX_ENTRIES = int(os.getenv("URL_CACHE_MAX_ENTRIES", "512"))
+# 在 TTL 内直接使用缓存；超过 TTL 后携带 ETag/Last-Modified 重新验证
+URL_CACHE_TTL = float(os.getenv("URL_CACHE_TTL", "600"))
+# 缓存条目保留时长（用于过期后的条件请求）
+URL_CACHE_RETENTION = float(os.getenv("URL_CACHE_RETENTION", str(24 * 3600)))
+URL_CACHE_DISK = os.getenv("URL_CACHE_DISK", "false").lower() == "true"
+# 单个网页响应体的最大下载字节数，超过后停止读取
+URL_FETCH_MAX_BYTES = int(os.getenv("URL_FETCH_MAX_BYTES", str(5 * 1024 * 1024)))
+
+# 文件上传：单文件与单请求的大小上限（字节）
+UPLOAD_MAX_FILE_BYTES = int(os.getenv("UPLOAD_MAX_FILE_BYTES", str(50 * 1024 * 1024)))
+UPLOAD_MAX_REQUEST_BYTES = int(
+    os.getenv("UPLOAD_MAX_REQUEST_BYTES", str(100 * 1024 * 1024))
+)
+# 超过该大小的上传文件落盘后按路径交给提取进程，避免整份读入内存再跨进程复制
+UPLOAD_SPOOL_THRESHOLD = int(os.getenv("UPLOAD_SPOOL_THRESHOLD", str(1024 * 1024)))
+
+# PDF 提取：每个进程池任务处理的页数，以及默认的字符预算（达到后提前停止，0 表示不限）
+PDF_PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", "8"))
+PDF_MAX_CHARS = int(os.getenv("PDF_MAX_CHARS", "100000"))
+# 扫描版 PDF：单个文档最多 OCR 的页数
+PDF_OCR_MAX_PAGES = int(os.getenv("PDF_OCR_MAX_PAGES", "20"))
+
+# 图片 OCR：识别前缩小到的最大宽度（像素，0 表示不缩放）
+OCR_MAX_WIDTH = int(os.getenv("OCR_MAX_WIDTH", "1080"))
+# 高度超过宽度的该倍数视为长图（如公众号长截图），切块后并行识别
+OCR_TALL_RATIO = float(os.getenv("OCR_TALL_RATIO", "3"))
+# 长图分块的高宽比，以及相邻分块的重叠像素
+OCR_TILE_ASPECT = float(os.getenv("OCR_TILE_ASPECT", "1.5"))
+OCR_TILE_OVERLAP = int(os.getenv("OCR_TILE_OVERLAP", "48"))
+# 同时进行的 OCR 任务上限，避免 OCR 占满提取进程池
+OCR_CONCURRENCY = int(
+    os.getenv("OCR_CONCURRENCY", str(max(1, EXTRACTOR_POOL_SIZE // 2)))
+)
+
+# YouTube 字幕缓存：按 videoId + 语言 + 字幕类型缓存清洗后的字幕与探测元信息
+YOUTUBE_CACHE_ENABLED = os.getenv("YOUTUBE_CACHE_ENABLED", "true").lower() == "true"
+YOUTUBE_CACHE_MAX_ENTRIES = int(os.getenv("YOUTUBE_CACHE_MAX_ENTRIES", "256"))
+YOUTUBE_CACHE_TTL = float(os.getenv("YOUTUBE_CACHE_TTL", str(7 * 24 * 3600)))
+YOUTUBE_CACHE_DISK = os.getenv("YOUTUBE_CACHE_DISK", "true").lower() == "true"
+# “无字幕”“直播”等否定结果的缓存时长（秒）
+YOUTUBE_NEGATIVE_CACHE_TTL = float(os.getenv("YOUTUBE_NEGATIVE_CACHE_TTL", "600"))
+# 元信息探测方式：fast 读取观看页内嵌数据，字段不全时回退 yt-dlp；ytdlp 始终使用 yt-dlp
+YOUTUBE_PROBE_MODE = os.getenv("YOUTUBE_PROBE_MODE", "fast").lower()
+YOUTUBE_PROBE_TIMEOUT = float(os.getenv("YOUTUBE_PROBE_TIMEOUT", "10"))
+# 字幕拉取：Transcript.fetch 先行的秒数，之后备用方式加入竞速；每种方式的超时（秒）
+YOUTUBE_CAPTION_HEAD_START = float(os.getenv("YOUTUBE_CAPTION_HEAD_START", "1.5"))
+YOUTUBE_CAPTION_STRATEGY_TIMEOUT = float(
+    os.getenv("YOUTUBE_CAPTION_STRATEGY_TIMEOUT", "20")
+)
@@ -60,3 +60,45 @@ class InvalidInputError(AppException):
             code="INVALID_INPUT_ERROR",
             details=details,
         )
+
+
+class PayloadTooLargeError(AppException):
+    """
+    上传文件或请求体超过大小上限时引发的异常。
+    """
+
+    def __init__(self, message: str, details: Optional[Dict[str, Any]] = None):
+        super().__init__(
+            message=message,
+            status_code=413,  # Payload Too Large
+            code="PAYLOAD_TOO_LARGE",
+            details=details,
+        )
+
+
+class NotFoundError(AppException):
+    """
+    请求的资源（如异步任务）不存在时引发的异常。
+    """
+
+    def __init__(self, message: str, details: Optional[Dict[str, Any]] = None):
+        super().__init__(
+            message=message,
+            status_code=404,  # Not Found
+            code="NOT_FOUND",
+            details=details,
+        )
+
+
+class ServiceUnavailableError(AppException):
+    """
+    服务暂时无法受理请求时引发的异常（如任务队列已满或 worker 未启动）。
+    """
+
+    def __init__(self, message: str, details: Optional[Dict[str, Any]] = None):
+        super().__init__(
+            message=message,
+            status_code=503,  # Service Unavailable
+            code="SERVICE_UNAVAILABLE",
+            details=details,
+        )
@@ -4,18 +4,29 @@
 """
 
 import os
-import uvicorn
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
 
 
-from app.configs.settings import STATIC_DIR
+from app.configs.settings import (
+    STATIC_DIR,
+    EXTRACTOR_POOL_WARMUP,
+    UPLOAD_MAX_REQUEST_BYTES,
+)
 from app.routers import v1_routers
 from app.configs.logger import setup_logging
 from app.middleware.request_logging import RequestLoggingMiddleware
+from app.middleware.body_limit import BodySizeLimitMiddleware
 from app.core.exceptions import AppException
+from app.services.llms.client_registry import provider_clients
+from app.services.workers import extractor_pool
+from app.services.url_fetcher import url_fetcher
+from app.services.rewrite_jobs import rewrite_job_queue
+from app.routers.rewrite import run_rewrite_job
+from app.routers.miniprogram import shutdown_story_jobs
 from app.core.handlers import (
     app_exception_handler,
     validation_exception_handler,
@@ -26,10 +37,32 @@ from app.core.handlers import (
 # 初始化日志
 setup_logging()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    应用生命周期：启动时创建并预热共享的 provider client 与提取进程池、启动洗稿任务 worker，关闭时统一释放。
+    """
+    await provider_clients.startup()
+    extractor_pool.start()
+    if EXTRACTOR_POOL_WARMUP:
+        await extractor_pool.warmup()
+    await rewrite_job_queue.start(run_rewrite_job)
+    yield
+    await shutdown_story_jobs()
+    await rewrite_job_queue.shutdown()
+    extractor_pool.shutdown()
+    await url_fetcher.aclose()
+    await provider_clients.shutdown()
+
+
 # 创建FastAPI实例
-app = FastAPI(title="Article ReAngle")
+app = FastAPI(title="Article ReAngle", lifespan=lifespan)
 
 # 配置中间件 (FastAPI中间件按后进先出顺序执行)
+# 请求体大小限制放在最内层，超限响应同样经过日志与跨域处理
+app.add_middleware(BodySizeLimitMiddleware, max_bytes=UPLOAD_MAX_REQUEST_BYTES)
+
 # RequestLoggingMiddleware 放在最外层(最后添加)，以便捕获所有请求
 app.add_middleware(RequestLoggingMiddleware)
 
@@ -67,4 +100,6 @@ if __name__ == "__main__":
     # 在项目根目录下执行 python -m app.main
     # 或者在根目录下运行 uvicorn app.main:app --host 127.0.0.1 --port 8000 --reload
     # 不要直接运行 main.py，会找不到app包名
+    import uvicorn
+
     uvicorn.run("app.main:app", host="127.0.0.1", port=8000, reload=True)
@@ -0,0 +1,84 @@
+from fastapi.responses import JSONResponse
+from loguru import logger
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.exceptions import PayloadTooLargeError
+from app.schemas.error_response_schema import BaseErrorResponse
+
+
+class BodySizeLimitMiddleware:
+    """
+    请求体大小限制中间件。
+    带 Content-Length 的超限请求在读取请求体之前直接返回 413；
+    分块传输的请求在累计读取超限时中止解析，同样返回 413。
+    两种情况的响应体都是 BaseErrorResponse（code 为 PAYLOAD_TOO_LARGE）。
+    """
+
+    def __init__(self, app: ASGIApp, max_bytes: int):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def _reject(
+        self, scope: Scope, receive: Receive, send: Send, size: int
+    ) -> None:
+        logger.warning(f"Request body rejected: {size} bytes (limit {self.max_bytes})")
+        error = PayloadTooLargeError(
+            "Request body is too large",
+            details={"size": size, "max_bytes": self.max_bytes},
+        )
+        response = JSONResponse(
+            status_code=error.status_code,
+            content=BaseErrorResponse(
+                success=False,
+                error=error.message,
+                code=error.code,
+                details=error.details,
+            ).model_dump(),
+        )
+        await response(scope, receive, send)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or self.max_bytes <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        content_length = None
+        for name, value in scope.get("headers") or []:
+            if name == b"content-length":
+                content_length = value.decode("latin-1")
+                break
+        if content_length and content_length.isdigit():
+            if int(content_length) > self.max_bytes:
+                await self._reject(scope, receive, send, int(content_length))
+                return
+
+        received = 0
+        exceeded = False
+        response_started = False
+
+        async def limited_receive() -> Message:
+            nonlocal received, exceeded
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    exceeded = True
+                    raise PayloadTooLargeError("Request body is too large")
+            return message
+
+        async def guarded_send(message: Message) -> None:
+            nonlocal response_started
+            # 超限后下游按各自方式处理中断的解析（如 FastAPI 转成 400），这里统一替换为 413
+            if exceeded and not response_started:
+                return
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except Exception:
+            if not exceeded or response_started:
+                raise
+        if exceeded and not response_started:
+            await self._reject(scope, receive, send, received)
@@ -2,19 +2,38 @@
 处理小程序请求的API路由
 """
 
+import asyncio
 import json
+import time
 import uuid
 import os
-from typing import Optional
+from typing import Annotated, Dict, Optional, Set
 
-from fastapi import APIRouter, Request
+from fastapi import APIRouter, Query, Request
 from fastapi.responses import JSONResponse
+from loguru import logger
 
-from app.configs.settings import RESULTS_DIR
+from app.configs.settings import (
+    MINIPROGRAM_JOB_TIMEOUT,
+    MINIPROGRAM_RESULT_MAX_WAIT,
+    RESULTS_DIR,
+)
 from app.services.llms.llm import call_openai
 
 miniprogram_router = APIRouter(prefix="/miniprogram")
 
+# 任务状态（写在结果文件的 status 字段中）
+JOB_PENDING = "pending"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+# 本进程内运行中的生成任务；持有引用避免任务被回收，事件用于唤醒长轮询
+_background_tasks: Set["asyncio.Task[None]"] = set()
+_job_events: Dict[str, asyncio.Event] = {}
+
+# 长轮询时查看其他进程所写结果文件的间隔（秒）
+_POLL_INTERVAL = 0.5
+
 
 def extract_story_params_from_payload(payload: dict) -> dict:
     """
@@ -172,11 +191,91 @@ async def generate_story(
 
 def write_result_file(job_id: str, data: dict) -> None:
     """
-    将结果写入文件系统。
+    将结果写入文件系统（先写临时文件再替换，查询方不会读到半个文件）。
     """
     path = os.path.join(RESULTS_DIR, f"{job_id}.json")
-    with open(path, "w", encoding="utf-8") as f:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
         json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def read_result_file(job_id: str) -> Optional[dict]:
+    """
+    读取结果文件；不存在时返回 None。生成超时仍为 pending 的任务按失败返回。
+    """
+    path = os.path.join(RESULTS_DIR, f"{job_id}.json")
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if (
+        data.get("status") == JOB_PENDING
+        and time.time() - data.get("createdAt", 0) > MINIPROGRAM_JOB_TIMEOUT
+    ):
+        return {
+            "success": False,
+            "status": JOB_FAILED,
+            "jobId": job_id,
+            "error": "生成失败: 任务超时",
+        }
+    return data
+
+
+async def run_story_job(job_id: str, story_kwargs: dict, output_kwargs: dict) -> None:
+    """
+    后台生成故事并写入结果文件，结束后唤醒等待该任务的长轮询。
+    """
+    try:
+        story_obj = await generate_story(**story_kwargs)
+        result = build_story_output_body(story_obj=story_obj, **output_kwargs)
+        result.update({"status": JOB_DONE, "jobId": job_id})
+    except asyncio.CancelledError:
+        # 服务关闭时被取消：记为失败，客户端不必等到任务超时
+        logger.warning(f"[miniprogram] story generation cancelled | job_id={job_id}")
+        result = {
+            "success": False,
+            "status": JOB_FAILED,
+            "jobId": job_id,
+            "error": "生成失败: 服务重启，任务已中断",
+        }
+        _finish_story_job(job_id, result)
+        raise
+    except Exception as e:
+        logger.exception(f"[miniprogram] story generation failed | job_id={job_id}")
+        result = {
+            "success": False,
+            "status": JOB_FAILED,
+            "jobId": job_id,
+            "error": f"生成失败: {str(e)}",
+        }
+    _finish_story_job(job_id, result)
+
+
+def _finish_story_job(job_id: str, result: dict) -> None:
+    """
+    写入最终结果并唤醒等待该任务的长轮询。
+    """
+    try:
+        write_result_file(job_id, result)
+    except Exception:
+        logger.exception(f"[miniprogram] failed to write result | job_id={job_id}")
+    finally:
+        event = _job_events.pop(job_id, None)
+        if event is not None:
+            event.set()
+
+
+async def shutdown_story_jobs() -> None:
+    """
+    取消本进程内仍在生成的故事任务（各任务会写入 failed 结果），并等待其结束。
+    """
+    tasks = list(_background_tasks)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    if tasks:
+        logger.info(f"[miniprogram] cancelled {len(tasks)} running story jobs")
 
 
 @miniprogram_router.get("/health")
@@ -216,9 +315,11 @@ async def generate_story_post(request: Request):
     """
     生成睡前故事接口。
 
+    故事在后台任务中生成，通过 resultUrl 查询结果（支持 wait 参数长轮询）。
+
     Returns:
-      - 若写盘成功：{ success, jobId, resultUrl }
-      - 若无法写盘：{ success, rewritten_text, title, length, age, theme, client }
+      - 若写盘成功：{ success, jobId, resultUrl }（立即返回）
+      - 若无法写盘：{ success, rewritten_text, title, length, age, theme, client }（同步生成）
     """
     content_type = request.headers.get("content-type", "").lower()
     if not content_type.startswith("application/json"):
@@ -249,66 +350,107 @@ async def generate_story_post(request: Request):
     if not final_api_key:
         return JSONResponse({"error": "未提供 OpenAI API Key"}, status_code=400)
 
-    # Generate story
-    try:
-        story_obj = await generate_story(
-            keywords=keywords,
-            user_prompt=json_prompt,
-            base_text=text,
-            length=length,
-            age=age,
-            theme=theme,
-            title_hint=title_hint,
-            langs=langs,
-            api_key=final_api_key,
-        )
-    except Exception as e:
-        return JSONResponse({"error": f"生成失败: {str(e)}"}, status_code=500)
+    story_kwargs = {
+        "keywords": keywords,
+        "user_prompt": json_prompt,
+        "base_text": text,
+        "length": length,
+        "age": age,
+        "theme": theme,
+        "title_hint": title_hint,
+        "langs": langs,
+        "api_key": final_api_key,
+    }
+    output_kwargs = {
+        "title_hint": title_hint,
+        "length": length,
+        "age": age,
+        "theme": theme,
+        "client": client,
+    }
 
-    # Try to persist result; if success, return jobId + resultUrl; else return story directly
+    # Try to persist a pending result; if success, generate in background and return jobId + resultUrl
     job_id = uuid.uuid4().hex
-    result_payload = build_story_output_body(
-        story_obj=story_obj,
-        title_hint=title_hint,
-        length=length,
-        age=age,
-        theme=theme,
-        client=client,
-    )
     try:
-        write_result_file(job_id, result_payload)
-        # 构造两步模式响应
-        # 从请求计算 resultUrl（基于当前站点）
-        base_url = str(request.base_url).rstrip("/")
-        result_url = f"{base_url}/results/{job_id}.json"
-        return {
-            "success": True,
-            "jobId": job_id,
-            "resultUrl": result_url,
-        }
+        write_result_file(
+            job_id,
+            {
+                "success": True,
+                "status": JOB_PENDING,
+                "jobId": job_id,
+                "createdAt": time.time(),
+            },
+        )
     except Exception:
-        # 文件系统不可写：直接返回故事（同步直返模式）
-        return result_payload
+        # 文件系统不可写：同步生成并直接返回故事（同步直返模式）
+        try:
+            story_obj = await generate_story(**story_kwargs)
+        except Exception as e:
+            return JSONResponse({"error": f"生成失败: {str(e)}"}, status_code=500)
+        return build_story_output_body(story_obj=story_obj, **output_kwargs)
+
+    _job_events[job_id] = asyncio.Event()
+    task = asyncio.create_task(run_story_job(job_id, story_kwargs, output_kwargs))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+    # 构造两步模式响应，resultUrl 指向结果查询接口（基于当前站点）
+    result_url = str(request.url_for("get_result", job_id=job_id))
+    return {
+        "success": True,
+        "jobId": job_id,
+        "resultUrl": result_url,
+    }
 
 
 # Results retrieval endpoints
 @miniprogram_router.get("/results/{job_id}.json")
-async def get_result(job_id: str):
+async def get_result(
+    job_id: str,
+    wait: Annotated[float, Query(ge=0, allow_inf_nan=False)] = 0,
+):
     """
     通过 Job ID 获取之前生成的结果。
     Retrieve a previously generated result by job ID.
-    """
-    path = os.path.join(RESULTS_DIR, f"{job_id}.json")
 
-    if not os.path.exists(path):
-        return JSONResponse({"error": "Result not found"}, status_code=404)
+    Args:
+        wait: 任务仍在生成时最多等待的秒数（长轮询，上限 MINIPROGRAM_RESULT_MAX_WAIT）
 
-    try:
-        with open(path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        return JSONResponse(data)
-    except Exception as e:
-        return JSONResponse(
-            {"error": f"读取结果失败: {str(e)}"},
-            status_code=500,
-        )
+    Returns:
+      - 生成中（202）：{ success, status: "pending", jobId }
+      - 已完成（200）：{ success, status: "done", jobId, rewritten_text, title, length, age, theme, client }
+      - 已失败（500）：{ success: false, status: "failed", jobId, error }
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + min(wait, MINIPROGRAM_RESULT_MAX_WAIT)
+    while True:
+        try:
+            data = read_result_file(job_id)
+        except Exception as e:
+            return JSONResponse(
+                {"error": f"读取结果失败: {str(e)}"},
+                status_code=500,
+            )
+        if data is None:
+            return JSONResponse({"error": "Result not found"}, status_code=404)
+        remaining = deadline - loop.time()
+        if data.get("status") != JOB_PENDING or remaining <= 0:
+            break
+        event = _job_events.get(job_id)
+        if event is not None:
+            try:
+                await asyncio.wait_for(event.wait(), timeout=remaining)
+            except asyncio.TimeoutError:
+                pass
+        else:
+            # 任务在其他进程中生成：定期重新读取结果文件
+            await asyncio.sleep(min(remaining, _POLL_INTERVAL))
+
+    # createdAt 仅用于判断任务超时，不对外返回
+    data.pop("createdAt", None)
+    status = data.get("status")
+    if status == JOB_PENDING:
+        return JSONResponse(data, status_code=202)
+    if status == JOB_FAILED:
+        return JSONResponse(data, status_code=500)
+    return JSONResponse(data)
@@ -2,55 +2,300 @@
 处理洗稿请求的API路由
 """
 
-from typing import Annotated, List, Dict, Any
+from typing import Annotated, List, Dict, Any, Optional, Set, Tuple
 from uuid import uuid4
+import asyncio
+import shutil
 import time
 import json
-from fastapi import APIRouter, Form, Request
+from fastapi import APIRouter, File, Form, Request, UploadFile
+from fastapi.responses import StreamingResponse
 from loguru import logger
 
+from app.configs.settings import (
+    EXTRACT_CONCURRENCY,
+    EXTRACT_ITEM_TIMEOUT,
+    PDF_MAX_CHARS,
+    PDF_OCR_MAX_PAGES,
+    REWRITE_LENGTH_MODE,
+    REWRITE_SOURCE_MAX_TOKENS,
+    YOUTUBE_LENGTH_MODE,
+    YOUTUBE_MAX_CHARS,
+    YOUTUBE_MAX_TOKENS,
+)
 from app.schemas.rewrite_schema import (
+    LLMType,
     RewriteRequest,
     RewriteResponse,
+    RewriteJobCreated,
+    RewriteJobStatus,
+    LLMResponse,
     TTSRequest,
     TTSResponse,
     AvatarRequest,
     AvatarResponse,
+    PdfExtractionResponse,
 )
+from app.schemas.error_response_schema import BaseErrorResponse
 from app.services.extractors import (
     extract_text_from_url,
     extract_text_from_docx,
     extract_text_from_pdf,
     extract_text_from_image,
+    extract_pdf_pages,
     ingest_youtube_url_v1,
+    apply_length_policy,
+    pdf_metrics,
+    caption_metrics,
+    EXTRACTOR_VERSIONS,
+)
+from app.services import extraction_cache, youtube_cache
+from app.services.tokens import token_counter
+from app.services.rewrite_jobs import (
+    JOB_QUEUED,
+    job_files_dir,
+    rewrite_job_queue,
+    open_uploads,
+    save_uploads,
 )
+from app.services.workers import extractor_pool
+from app.services.ocr import ocr_service
+from app.services.url_fetcher import url_fetcher
+from app.services.uploads import UploadLimitRoute, spooled_upload
 from app.services.llms import rewriting_client, tts_client, avatar_client
+from app.services.llms.stream_parser import JSONFieldStreamParser
 from app.core.exceptions import (
     ContentExtractionError,
     LLMProviderError,
     InvalidInputError,
+    NotFoundError,
 )
 
 # 设置路由前缀和标签
-rewrite_router = APIRouter(prefix="/rewrite")
+rewrite_router = APIRouter(prefix="/rewrite", route_class=UploadLimitRoute)
 
 
-@rewrite_router.post("", response_model=RewriteResponse)
-async def rewrite_article(
-    request: Request, rewrite_request: Annotated[RewriteRequest, Form()]
-):
+async def _extract_item(
+    it: Dict[str, Any], form: Any, request_id: str, llm_type: LLMType
+) -> Optional[str]:
     """
-    洗稿接口, 支持添加到队列的多重输入
+    提取队列中单个输入项的文本。
+
+    Returns:
+        Optional[str]: 带来源标记的文本片段；该项无内容时返回 None
     """
-    # 储存清洗、聚合后的原始文本
-    clean_text = ""
+    t = (it.get("type") or "").lower()
+    if t == "text":
+        content = (it.get("content") or "").strip()
+        if content:
+            return f"[文本]\n{content}"
+    elif t == "url":
+        url = (it.get("content") or "").strip()
+        if not url:
+            return None
+        try:
+            extracted = await extract_text_from_url(url)
+            return f"[链接]\n源: {url}\n{extracted.strip()}"
+        except Exception as e:
+            logger.warning(
+                "[rewrite] url extraction failed | request_id={} | url={} | reason={}",
+                request_id,
+                url,
+                e,
+            )
+            return f"[链接]\n{url}"
+    elif t == "youtube":
+        yt = (it.get("content") or "").strip()
+        if yt:
+            try:
+                yt_res = await ingest_youtube_url_v1(
+                    yt,
+                    prefer_langs=["zh", "en"],
+                    fallback_any_language=True,
+                    length_mode=YOUTUBE_LENGTH_MODE,
+                    max_chars=YOUTUBE_MAX_CHARS,
+                    llm_type_for_summarize=llm_type,
+                    max_tokens=YOUTUBE_MAX_TOKENS or None,
+                )
+                yt_text = (yt_res.get("text") or "").strip()
+                meta = yt_res.get("meta") or {}
+                return "[YouTube]\n源: {}\n标题: {}\n时长: {}秒\n字幕: {} ({})\n长度策略: {} | 原始: {} | 最终: {} | 截断: {}\n{}\n".format(
+                    yt,
+                    meta.get("title") or "",
+                    meta.get("duration") or 0,
+                    meta.get("transcript_type") or "",
+                    meta.get("lang") or "",
+                    meta.get("length_mode") or "",
+                    meta.get("orig_len") or 0,
+                    meta.get("final_len") or 0,
+                    meta.get("truncated") or False,
+                    yt_text,
+                )
+            except Exception as e:
+                logger.warning(
+                    "[rewrite] youtube ingestion failed | request_id={} | url={} | reason={}",
+                    request_id,
+                    yt,
+                    e,
+                )
+                return f"[YouTube]\n{yt}"
+    elif t == "file":
+        content_key = it.get("contentKey")
+        if not content_key:
+            return None
+        upload = form.get(content_key)
+        if not upload:
+            logger.warning(
+                "[rewrite] file not found in form | request_id={} | content_key={}",
+                request_id,
+                content_key,
+            )
+            return None
+        filename = (getattr(upload, "filename", "") or "").lower()
+        try:
+            if filename.endswith(".docx"):
+                kind = "docx"
+            elif filename.endswith(".pdf"):
+                kind = "pdf"
+            elif filename.endswith((".png", ".jpg", ".jpeg", ".webp")):
+                kind = "image"
+            else:
+                kind = None
 
-    # 贯穿整个请求的 request_id 与耗时统计
-    request_id = request.headers.get("X-Request-Id") or str(uuid4())
-    t0 = time.perf_counter()
+            if kind is None:
+                raw = await upload.read()
+                try:
+                    extracted = raw.decode("utf-8")
+                except UnicodeDecodeError:
+                    extracted = raw.decode("gbk", errors="ignore")
+            else:
+                # 按文件内容寻址的提取缓存：同一文件重复上传时跳过解析/OCR
+                meta = it.get("meta") or {}
+                page_range = meta.get("pageRange") if kind == "pdf" else None
+                options = ""
+                if kind == "pdf":
+                    # 页码范围、字符预算与 OCR 页数上限都会改变 PDF 的提取结果
+                    options = f"{page_range or ''}|{PDF_MAX_CHARS}|{PDF_OCR_MAX_PAGES}"
+                cache_key = extraction_cache.build_cache_key(
+                    kind,
+                    EXTRACTOR_VERSIONS[kind],
+                    await extraction_cache.hash_upload(upload),
+                    options=options,
+                )
+                extracted = await extraction_cache.get_cached_text(cache_key)
+                if extracted is not None:
+                    logger.info(
+                        "[rewrite] file extraction cache hit | request_id={} | filename={}",
+                        request_id,
+                        filename,
+                    )
+                else:
+                    if kind == "docx":
+                        extracted = await extract_text_from_docx(upload)
+                    elif kind == "pdf":
+                        extracted = await extract_text_from_pdf(
+                            upload, page_range=page_range, max_chars=PDF_MAX_CHARS
+                        )
+                    else:
+                        extracted = await extract_text_from_image(upload)
+                    await extraction_cache.set_cached_text(cache_key, extracted)
+            return f"[文件] {filename}\n{(extracted or '').strip()}"
+        except Exception as e:
+            logger.error(
+                "[rewrite] file extraction failed | request_id={} | filename={} | reason={}",
+                request_id,
+                filename,
+                e,
+            )
+            raise ContentExtractionError(
+                f"Failed to extract content from file: {str(e)}",
+                details={
+                    "request_id": request_id,
+                    "filename": filename,
+                    "reason": str(e),
+                },
+            )
+    else:
+        logger.warning(f"Unknown input type: {t}")
+    return None
 
-    # 支持添加到队列的多重输入（inputs）
-    form = await request.form()
+
+async def _extract_items_concurrently(
+    items: List[Dict[str, Any]], form: Any, request_id: str, llm_type: LLMType
+) -> List[str]:
+    """
+    在并发上限内同时提取所有输入项，结果保持队列原有顺序。
+
+    - 每项单独超时：链接/YouTube 超时回退为仅保留来源，文件超时视为提取失败
+    - 同一队列中重复的链接/YouTube 只抓取一次，文本也只在首次出现的位置保留一份
+    """
+    semaphore = asyncio.Semaphore(EXTRACT_CONCURRENCY)
+    seen: Set[Tuple[str, str]] = set()
+
+    async def run(index: int, it: Dict[str, Any]) -> Optional[str]:
+        t = (it.get("type") or "").lower()
+        content = (it.get("content") or "").strip()
+        t_item_start = time.perf_counter()
+        status = "ok"
+        try:
+            async with semaphore:
+                return await asyncio.wait_for(
+                    _extract_item(it, form, request_id, llm_type),
+                    timeout=EXTRACT_ITEM_TIMEOUT,
+                )
+        except asyncio.TimeoutError:
+            status = "timeout"
+            if t == "url":
+                return f"[链接]\n{content}"
+            if t == "youtube":
+                return f"[YouTube]\n{content}"
+            raise ContentExtractionError(
+                "Timed out extracting content from file",
+                details={"request_id": request_id, "timeout_s": EXTRACT_ITEM_TIMEOUT},
+            )
+        except BaseException:
+            status = "error"
+            raise
+        finally:
+            logger.info(
+                "[rewrite] item extracted | request_id={} | index={} | type={} | status={} | ms={:.1f}",
+                request_id,
+                index,
+                t,
+                status,
+                (time.perf_counter() - t_item_start) * 1000,
+            )
+
+    tasks: List["asyncio.Task[Optional[str]]"] = []
+    for index, it in enumerate(items):
+        t = (it.get("type") or "").lower()
+        content = (it.get("content") or "").strip()
+        key = (t, content)
+        if t in ("url", "youtube") and content and key in seen:
+            # 重复输入已在首次出现的位置提取，不再重复交给模型
+            continue
+        if t in ("url", "youtube") and content:
+            seen.add(key)
+        tasks.append(asyncio.ensure_future(run(index, it)))
+
+    try:
+        results = await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+    return [p for p in results if p]
+
+
+def parse_inputs(
+    rewrite_request: RewriteRequest, request_id: str
+) -> Tuple[List[Dict[str, Any]], float]:
+    """
+    解析并校验输入清单。
+
+    Returns:
+        Tuple[List[Dict[str, Any]], float]: 输入项列表，以及解析耗时（毫秒）
+    """
     inputs_raw = rewrite_request.inputs
     if not inputs_raw:
         raise InvalidInputError(
@@ -90,109 +335,20 @@ async def rewrite_article(
         type_counts["youtube"],
         est_chars,
     )
-    parts: List[str] = []
+    return items, (t_parse_end - t_parse_start) * 1000
+
+
+async def extract_source_text(
+    items: List[Dict[str, Any]], form: Any, request_id: str, llm_type: LLMType
+) -> Tuple[str, Dict[str, float]]:
+    """
+    并发提取各输入项的文本并按原顺序合并。
+
+    Returns:
+        Tuple[str, Dict[str, float]]: 合并后的原始文本，以及 extract/merge 阶段耗时（毫秒）
+    """
     t_extract_start = time.perf_counter()
-    for it in items:
-        t = (it.get("type") or "").lower()
-        if t == "text":
-            content = (it.get("content") or "").strip()
-            if content:
-                parts.append(f"[文本]\n{content}")
-        elif t == "url":
-            url = (it.get("content") or "").strip()
-            if not url:
-                continue
-            try:
-                extracted = await extract_text_from_url(url)
-                parts.append(f"[链接]\n源: {url}\n{extracted.strip()}")
-            except Exception as e:
-                logger.warning(
-                    "[rewrite] url extraction failed | request_id={} | url={} | reason={}",
-                    request_id,
-                    url,
-                    e,
-                )
-                parts.append(f"[链接]\n{url}")
-        elif t == "youtube":
-            yt = (it.get("content") or "").strip()
-            if yt:
-                try:
-                    yt_res = await ingest_youtube_url_v1(
-                        yt,
-                        prefer_langs=["zh","en"],
-                        fallback_any_language=True,
-                        length_mode="truncate",
-                        max_chars=12000,
-                        llm_type_for_summarize=None,
-                    )
-                    yt_text = (yt_res.get("text") or "").strip()
-                    meta = yt_res.get("meta") or {}
-                    parts.append(
-                        "[YouTube]\n源: {}\n标题: {}\n时长: {}秒\n字幕: {} ({})\n长度策略: {} | 原始: {} | 最终: {} | 截断: {}\n{}\n".format(
-                            yt,
-                            meta.get("title") or "",
-                            meta.get("duration") or 0,
-                            meta.get("transcript_type") or "",
-                            meta.get("lang") or "",
-                            meta.get("length_mode") or "",
-                            meta.get("orig_len") or 0,
-                            meta.get("final_len") or 0,
-                            meta.get("truncated") or False,
-                            yt_text,
-                        )
-                    )
-                except Exception as e:
-                    logger.warning(
-                        "[rewrite] youtube ingestion failed | request_id={} | url={} | reason={}",
-                        request_id,
-                        yt,
-                        e,
-                    )
-                    parts.append(f"[YouTube]\n{yt}")
-        elif t == "file":
-            content_key = it.get("contentKey")
-            if not content_key:
-                continue
-            upload = form.get(content_key)
-            if not upload:
-                logger.warning(
-                    "[rewrite] file not found in form | request_id={} | content_key={}",
-                    request_id,
-                    content_key,
-                )
-                continue
-            filename = (getattr(upload, "filename", "") or "").lower()
-            try:
-                if filename.endswith(".docx"):
-                    extracted = await extract_text_from_docx(upload)
-                elif filename.endswith(".pdf"):
-                    extracted = await extract_text_from_pdf(upload)
-                elif filename.endswith((".png", ".jpg", ".jpeg", ".webp")):
-                    extracted = await extract_text_from_image(upload)
-                else:
-                    raw = await upload.read()
-                    try:
-                        extracted = raw.decode("utf-8")
-                    except UnicodeDecodeError:
-                        extracted = raw.decode("gbk", errors="ignore")
-                parts.append(f"[文件] {filename}\n{(extracted or '').strip()}")
-            except Exception as e:
-                logger.error(
-                    "[rewrite] file extraction failed | request_id={} | filename={} | reason={}",
-                    request_id,
-                    filename,
-                    e,
-                )
-                raise ContentExtractionError(
-                    f"Failed to extract content from file: {str(e)}",
-                    details={
-                        "request_id": request_id,
-                        "filename": filename,
-                        "reason": str(e),
-                    },
-                )
-        else:
-            logger.warning(f"Unknown input type: {t}")
+    parts = await _extract_items_concurrently(items, form, request_id, llm_type)
     t_extract_end = time.perf_counter()
     t_merge_start = time.perf_counter()
     clean_text = "\n\n---\n\n".join([p for p in parts if p.strip()])
@@ -201,33 +357,95 @@ async def rewrite_article(
         raise ContentExtractionError(
             "Extracted text is empty or invalid", details={"request_id": request_id}
         )
+    timings = {
+        "extract_ms": (t_extract_end - t_extract_start) * 1000,
+        "merge_ms": (t_merge_end - t_merge_start) * 1000,
+    }
+    return clean_text, timings
 
-    # 调用rewriting_client
+
+async def collect_source_text(
+    request: Request, rewrite_request: RewriteRequest, request_id: str
+) -> Tuple[str, Dict[str, float]]:
+    """
+    洗稿的输入流水线：解析队列、并发提取各项文本并按原顺序合并。
+
+    Args:
+        request: 原始请求（用于读取表单中的上传文件）
+        rewrite_request: 洗稿请求表单
+        request_id: 贯穿整个请求的 request_id
+
+    Returns:
+        Tuple[str, Dict[str, float]]: 合并后的原始文本，以及 parse/extract/merge 各阶段耗时（毫秒）
+    """
+    # 支持添加到队列的多重输入（inputs）
+    # 表单已在绑定 RewriteRequest 时解析过，这里取到的是同一份缓存的 FormData，上传文件不会被重复读取
+    form = await request.form()
+    items, parse_ms = parse_inputs(rewrite_request, request_id)
+    clean_text, timings = await extract_source_text(
+        items, form, request_id, rewrite_request.llm_type
+    )
+    return clean_text, {"parse_ms": parse_ms, **timings}
+
+
+async def fit_source_length(
+    clean_text: str, llm_type: LLMType, request_id: str, instruction: str = ""
+) -> str:
+    """
+    合并后的原文超出 token 预算时，按 REWRITE_LENGTH_MODE 压缩后再交给模型。
+
+    预算取 REWRITE_SOURCE_MAX_TOKENS 与模型可用输入空间（上下文窗口 - 最大输出 - system prompt - 指令）中的较小值。
+    """
+    budget = token_counter.input_budget(
+        llm_type, rewriting_client.get_system_prompt(llm_type), instruction
+    )
+    if REWRITE_SOURCE_MAX_TOKENS > 0:
+        budget = min(budget, REWRITE_SOURCE_MAX_TOKENS)
+    applied = await apply_length_policy(
+        clean_text,
+        mode=REWRITE_LENGTH_MODE,
+        max_chars=len(clean_text),
+        llm_type=llm_type,
+        max_tokens=budget,
+    )
+    if applied["mode"] == "original":
+        return clean_text
+    logger.info(
+        "[rewrite] source compressed | request_id={} | mode={} | orig_tokens={} | final_tokens={} | budget={} | chunks={}",
+        request_id,
+        applied["mode"],
+        applied["orig_tokens"],
+        applied["final_tokens"],
+        budget,
+        applied.get("chunks", 0),
+    )
+    return applied["text"]
+
+
+async def generate_rewrite(
+    llm_type: LLMType, prompt: str, clean_text: str, request_id: str
+) -> Tuple[LLMResponse, bool]:
+    """
+    对合并后的原文调用模型洗稿（带结果缓存，超长原文先压缩）。
+
+    Returns:
+        Tuple[LLMResponse, bool]: 洗稿结果，以及是否命中结果缓存
+    """
     try:
-        prompt_len = len(rewrite_request.prompt or "")
-        source_len = len(clean_text or "")
         logger.info(
             "[rewrite] llm call start | request_id={} | provider={} | prompt_len={} | source_len={}",
             request_id,
-            rewrite_request.llm_type,
-            prompt_len,
-            source_len,
+            llm_type,
+            len(prompt or ""),
+            len(clean_text or ""),
         )
-        t_llm_start = time.perf_counter()
-        result = await rewriting_client.get_rewriting_result(
-            llm_type=rewrite_request.llm_type,
-            instruction=rewrite_request.prompt,
+        return await rewriting_client.get_rewriting_result_cached(
+            llm_type=llm_type,
+            instruction=prompt,
             source=clean_text,
-        )
-        t_llm_end = time.perf_counter()
-        logger.info(
-            "[rewrite] done | request_id={} | parse_ms={:.1f} | extract_ms={:.1f} | merge_ms={:.1f} | llm_ms={:.1f} | total_ms={:.1f}",
-            request_id,
-            (t_parse_end - t_parse_start) * 1000,
-            (t_extract_end - t_extract_start) * 1000,
-            (t_merge_end - t_merge_start) * 1000,
-            (t_llm_end - t_llm_start) * 1000,
-            (time.perf_counter() - t0) * 1000,
+            prepare_source=lambda text: fit_source_length(
+                text, llm_type, request_id, prompt
+            ),
         )
     except Exception as e:
         logger.exception("[rewrite] llm rewriting failed | request_id={}", request_id)
@@ -235,12 +453,46 @@ async def rewrite_article(
             f"Failed to generate rewrite: {str(e)}",
             details={
                 "request_id": request_id,
-                "provider": str(rewrite_request.llm_type),
-                "prompt_len": len(rewrite_request.prompt or ""),
+                "provider": str(llm_type),
+                "prompt_len": len(prompt or ""),
                 "source_len": len(clean_text or ""),
             },
         )
 
+
+@rewrite_router.post("", response_model=RewriteResponse)
+async def rewrite_article(
+    request: Request, rewrite_request: Annotated[RewriteRequest, Form()]
+):
+    """
+    洗稿接口, 支持添加到队列的多重输入
+    """
+    # 贯穿整个请求的 request_id 与耗时统计
+    request_id = request.headers.get("X-Request-Id") or str(uuid4())
+    t0 = time.perf_counter()
+
+    # 储存清洗、聚合后的原始文本
+    clean_text, timings = await collect_source_text(
+        request, rewrite_request, request_id
+    )
+
+    # 调用rewriting_client
+    t_llm_start = time.perf_counter()
+    result, cached = await generate_rewrite(
+        rewrite_request.llm_type, rewrite_request.prompt, clean_text, request_id
+    )
+    t_llm_end = time.perf_counter()
+    logger.info(
+        "[rewrite] done | request_id={} | parse_ms={:.1f} | extract_ms={:.1f} | merge_ms={:.1f} | llm_ms={:.1f} | cache_hit={} | total_ms={:.1f}",
+        request_id,
+        timings["parse_ms"],
+        timings["extract_ms"],
+        timings["merge_ms"],
+        (t_llm_end - t_llm_start) * 1000,
+        cached,
+        (time.perf_counter() - t0) * 1000,
+    )
+
     # 返回响应
     return RewriteResponse(
         # 原始文本
@@ -249,7 +501,301 @@ async def rewrite_article(
         summary=result.summary,
         # 洗稿后的文本
         rewritten=result.rewritten,
+        # 是否命中结果缓存
+        cached=cached,
+    )
+
+
+async def run_rewrite_job(
+    job: Dict[str, Any]
+) -> Tuple[Dict[str, Any], Dict[str, float]]:
+    """
+    执行一个异步洗稿任务：重新打开落盘的上传文件，提取文本后调用模型。
+
+    Args:
+        job: 提交时保存的任务参数 { request_id, llm_type, prompt, items, files, parse_ms }
+
+    Returns:
+        Tuple[Dict[str, Any], Dict[str, float]]: RewriteResponse 字典，以及各阶段耗时（毫秒）
+    """
+    request_id = job["request_id"]
+    llm_type = LLMType(job["llm_type"])
+    form = open_uploads(job["files"])
+    try:
+        clean_text, timings = await extract_source_text(
+            job["items"], form, request_id, llm_type
+        )
+    finally:
+        await form.close()
+    t_llm_start = time.perf_counter()
+    result, cached = await generate_rewrite(
+        llm_type, job["prompt"], clean_text, request_id
+    )
+    timings["llm_ms"] = (time.perf_counter() - t_llm_start) * 1000
+    response = RewriteResponse(
+        original=clean_text,
+        summary=result.summary,
+        rewritten=result.rewritten,
+        cached=cached,
+    )
+    return response.model_dump(), {"parse_ms": job["parse_ms"], **timings}
+
+
+@rewrite_router.post("/jobs", response_model=RewriteJobCreated, status_code=202)
+async def create_rewrite_job(
+    request: Request, rewrite_request: Annotated[RewriteRequest, Form()]
+):
+    """
+    异步洗稿接口：校验输入并保存上传文件后立即返回任务 ID，提取与模型调用由后台 worker 执行
+    """
+    job_id = str(uuid4())
+    request_id = request.headers.get("X-Request-Id") or job_id
+    form = await request.form()
+    items, parse_ms = parse_inputs(rewrite_request, request_id)
+    files = await save_uploads(job_id, form)
+    try:
+        await rewrite_job_queue.submit(
+            job_id,
+            {
+                "request_id": request_id,
+                "llm_type": rewrite_request.llm_type.value,
+                "prompt": rewrite_request.prompt,
+                "items": items,
+                "files": files,
+                "parse_ms": parse_ms,
+            },
+        )
+    except BaseException:
+        # 未能排队：删除已保存的上传文件
+        shutil.rmtree(job_files_dir(job_id), ignore_errors=True)
+        raise
+    logger.info(
+        "[rewrite] job queued | request_id={} | job_id={} | items={} | files={}",
+        request_id,
+        job_id,
+        len(items),
+        len(files),
     )
+    return RewriteJobCreated(job_id=job_id, status=JOB_QUEUED)
+
+
+@rewrite_router.get("/jobs/{job_id}", response_model=RewriteJobStatus)
+async def get_rewrite_job(job_id: str):
+    """
+    查询异步洗稿任务的状态、各阶段耗时与结果
+    """
+    job = await rewrite_job_queue.get(job_id)
+    if job is None:
+        raise NotFoundError("Rewrite job not found", details={"job_id": job_id})
+    job.pop("request")
+    return RewriteJobStatus(**job)
+
+
+# 流式输出中需要转发给前端的字段（Qwen 的正文字段名为 article）
+_STREAM_FIELD_ALIASES = {
+    "rewritten": "rewritten",
+    "article": "rewritten",
+    "summary": "summary",
+}
+
+
+def _sse_event(event: str, data: Dict[str, Any]) -> str:
+    """
+    按 Server-Sent Events 格式编码一条事件。
+    """
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@rewrite_router.post("/stream")
+async def rewrite_article_stream(
+    request: Request, rewrite_request: Annotated[RewriteRequest, Form()]
+):
+    """
+    流式洗稿接口（Server-Sent Events），输入与 /rewrite 相同。
+
+    事件序列：
+      - start: { request_id, original }
+      - delta: { field: "rewritten"|"summary", text }，可多次
+      - done:  { original, summary, rewritten }
+      - error: { success, error, code, details }（生成中途失败时）
+    """
+    request_id = request.headers.get("X-Request-Id") or str(uuid4())
+    t0 = time.perf_counter()
+
+    # 输入阶段的错误在开始推流之前抛出，仍按普通错误响应返回
+    clean_text, timings = await collect_source_text(
+        request, rewrite_request, request_id
+    )
+
+    cached_result = await rewriting_client.get_cached_result(
+        llm_type=rewrite_request.llm_type,
+        instruction=rewrite_request.prompt,
+        source=clean_text,
+    )
+
+    async def event_stream():
+        parser = JSONFieldStreamParser(_STREAM_FIELD_ALIASES)
+        raw_parts: List[str] = []
+        yield _sse_event("start", {"request_id": request_id, "original": clean_text})
+
+        if cached_result is not None:
+            # 命中结果缓存：一次性推送完整结果
+            logger.info(
+                "[rewrite] stream cache hit | request_id={} | total_ms={:.1f}",
+                request_id,
+                (time.perf_counter() - t0) * 1000,
+            )
+            yield _sse_event(
+                "delta", {"field": "rewritten", "text": cached_result.rewritten}
+            )
+            yield _sse_event(
+                "delta", {"field": "summary", "text": cached_result.summary}
+            )
+            yield _sse_event(
+                "done",
+                RewriteResponse(
+                    original=clean_text,
+                    summary=cached_result.summary,
+                    rewritten=cached_result.rewritten,
+                    cached=True,
+                ).model_dump(),
+            )
+            return
+
+        logger.info(
+            "[rewrite] llm stream start | request_id={} | provider={} | prompt_len={} | source_len={}",
+            request_id,
+            rewrite_request.llm_type,
+            len(rewrite_request.prompt or ""),
+            len(clean_text or ""),
+        )
+        t_llm_start = time.perf_counter()
+        t_first_token = None
+        try:
+            # 与 /rewrite 相同的 token 预算：超长原文先压缩（缓存仍按原文寻址）
+            llm_source = await fit_source_length(
+                clean_text,
+                rewrite_request.llm_type,
+                request_id,
+                rewrite_request.prompt,
+            )
+            async for delta in rewriting_client.stream_rewriting_result(
+                llm_type=rewrite_request.llm_type,
+                instruction=rewrite_request.prompt,
+                source=llm_source,
+            ):
+                if t_first_token is None:
+                    t_first_token = time.perf_counter()
+                raw_parts.append(delta)
+                for field, text in parser.feed(delta):
+                    yield _sse_event("delta", {"field": field, "text": text})
+        except Exception as e:
+            logger.exception("[rewrite] llm stream failed | request_id={}", request_id)
+            yield _sse_event(
+                "error",
+                BaseErrorResponse(
+                    error=f"Failed to generate rewrite: {str(e)}",
+                    code="LLM_PROVIDER_ERROR",
+                    details={
+                        "request_id": request_id,
+                        "provider": str(rewrite_request.llm_type),
+                    },
+                ).model_dump(),
+            )
+            return
+        t_llm_end = time.perf_counter()
+
+        result = LLMResponse(
+            rewritten=parser.values["rewritten"], summary=parser.values["summary"]
+        )
+        if not result.rewritten and not parser.done:
+            # 模型未按 JSON 输出：与非流式接口一致，把原始输出作为正文（不写入缓存）
+            result = LLMResponse(
+                rewritten="".join(raw_parts), summary=result.summary
+            ).mark_degraded()
+
+        logger.info(
+            "[rewrite] stream done | request_id={} | parse_ms={:.1f} | extract_ms={:.1f} | merge_ms={:.1f} | ttfb_ms={:.1f} | llm_ms={:.1f} | total_ms={:.1f}",
+            request_id,
+            timings["parse_ms"],
+            timings["extract_ms"],
+            timings["merge_ms"],
+            ((t_first_token or t_llm_end) - t_llm_start) * 1000,
+            (t_llm_end - t_llm_start) * 1000,
+            (time.perf_counter() - t0) * 1000,
+        )
+        await rewriting_client.set_cached_result(
+            llm_type=rewrite_request.llm_type,
+            instruction=rewrite_request.prompt,
+            source=clean_text,
+            result=result,
+        )
+        yield _sse_event(
+            "done",
+            RewriteResponse(
+                original=clean_text, summary=result.summary, rewritten=result.rewritten
+            ).model_dump(),
+        )
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            # 禁止反向代理缓冲，保证增量及时送达
+            "X-Accel-Buffering": "no",
+        },
+    )
+
+
+@rewrite_router.get("/cache/stats")
+async def get_cache_stats():
+    """
+    缓存命中/未命中与请求合并统计
+    """
+    return {
+        "rewrite": rewriting_client.rewrite_cache.stats(),
+        "rewrite_singleflight": rewriting_client.rewrite_flight.stats(),
+        "url": url_fetcher.stats(),
+        "extraction": extraction_cache.extraction_cache.stats(),
+        "youtube": youtube_cache.youtube_cache.stats(),
+    }
+
+
+@rewrite_router.get("/metrics")
+async def get_metrics():
+    """
+    提取进程池的排队等待与执行耗时统计，PDF 文本页/OCR 页、图片 OCR、字幕拉取方式与 token 估算统计
+    """
+    return {
+        "extractor_pool": extractor_pool.stats(),
+        "pdf": dict(pdf_metrics),
+        "ocr": ocr_service.stats(),
+        "youtube_captions": {k: dict(v) for k, v in caption_metrics.items()},
+        "tokens": token_counter.stats(),
+        "rewrite_jobs": rewrite_job_queue.stats(),
+    }
+
+
+@rewrite_router.post("/extract/pdf", response_model=PdfExtractionResponse)
+async def extract_pdf(
+    file: Annotated[UploadFile, File()],
+    page_range: Annotated[Optional[str], Form()] = None,
+    max_chars: Annotated[Optional[int], Form()] = None,
+):
+    """
+    PDF 提取接口：可指定页码范围（如 "1-20"）与字符预算，返回文本及每页耗时
+    """
+    logger.info(f"Received PDF extraction request: {file.filename}")
+    async with spooled_upload(file) as content:
+        try:
+            extraction = await extract_pdf_pages(content, page_range, max_chars)
+        except (InvalidInputError, ContentExtractionError):
+            raise
+        except Exception as e:
+            logger.exception(f"Error extracting from PDF: {file.filename}")
+            raise ContentExtractionError(f"Error extracting from PDF: {str(e)}")
+    return PdfExtractionResponse(**extraction)
 
 
 @rewrite_router.post("/tts", response_model=TTSResponse)
@@ -3,7 +3,9 @@
 """
 
 from enum import Enum
-from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, Field, PrivateAttr
 
 
 class LLMType(str, Enum):
@@ -35,6 +37,32 @@ class RewriteResponse(BaseModel):
     original: str
     summary: str
     rewritten: str
+    cached: bool = Field(default=False, description="是否命中洗稿结果缓存")
+
+
+class RewriteJobCreated(BaseModel):
+    """
+    异步洗稿任务提交响应。
+    """
+
+    job_id: str = Field(..., description="任务 ID")
+    status: str = Field(..., description="任务状态：queued/running/done/failed")
+
+
+class RewriteJobStatus(BaseModel):
+    """
+    异步洗稿任务状态。
+    """
+
+    job_id: str
+    status: str = Field(..., description="任务状态：queued/running/done/failed")
+    timings: Dict[str, float] = Field(
+        default_factory=dict, description="各阶段耗时（毫秒）"
+    )
+    result: Optional[RewriteResponse] = Field(default=None, description="洗稿结果（done 时）")
+    error: Optional[Dict[str, Any]] = Field(default=None, description="错误信息（failed 时）")
+    created_at: float
+    updated_at: float
 
 
 class LLMResponse(BaseModel):
@@ -45,6 +73,18 @@ class LLMResponse(BaseModel):
     rewritten: str = Field(..., description="洗稿文章")
     summary: str = Field(..., description="洗稿概要")
 
+    # 降级结果（模型输出无法解析、摘要合并失败等）：正常返回，但不写入结果缓存；
+    # 私有属性不出现在 JSON schema 与序列化结果中
+    _degraded: bool = PrivateAttr(default=False)
+
+    @property
+    def degraded(self) -> bool:
+        return self._degraded
+
+    def mark_degraded(self) -> "LLMResponse":
+        self._degraded = True
+        return self
+
 
 class TTSRequest(BaseModel):
     """
@@ -78,3 +118,31 @@ class AvatarResponse(BaseModel):
     """
 
     video_url: str = Field(..., description="数字人视频URL")
+
+
+class PdfPageTiming(BaseModel):
+    """
+    单页提取耗时。
+    """
+
+    page: int = Field(..., description="页码（从 1 开始）")
+    chars: int = Field(..., description="该页提取的字符数")
+    ms: float = Field(..., description="该页提取耗时（毫秒）")
+    source: str = Field(default="text", description="文本来源：text（文本层）或 ocr")
+
+
+class PdfExtractionResponse(BaseModel):
+    """
+    PDF 提取响应模型。
+    """
+
+    text: str = Field(..., description="提取的文本")
+    total_pages: int = Field(..., description="PDF 总页数")
+    pages: List[PdfPageTiming] = Field(..., description="已提取各页的耗时")
+    truncated: bool = Field(..., description="是否因字符预算提前停止")
+    text_pages: int = Field(default=0, description="从文本层提取的页数")
+    ocr_pages: int = Field(default=0, description="通过 OCR 识别的扫描页数")
+    ocr_skipped_pages: int = Field(
+        default=0, description="超出 OCR 页数预算或 OCR 不可用而跳过的扫描页数"
+    )
+    elapsed_ms: float = Field(..., description="提取总耗时（毫秒）")
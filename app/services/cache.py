@@ -0,0 +1,221 @@
+"""
+通用的两级缓存：内存 LRU（带 TTL 与容量上限）+ 可选的 SQLite 磁盘层。
+
+磁盘层的 value 以 JSON 存储，因此只缓存可 JSON 序列化的数据。
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from loguru import logger
+
+
+class TTLCache:
+    """
+    进程内 LRU 缓存，条目超过 TTL 即失效，超过容量时淘汰最久未使用的条目。
+    """
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < time.time():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        if self.max_entries <= 0:
+            return
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SQLiteCache:
+    """
+    基于 SQLite 的持久化缓存，进程重启后仍然有效。
+    """
+
+    # 每写入多少次检查一次容量
+    _PRUNE_EVERY = 64
+
+    def __init__(self, path: str, ttl: float, max_entries: int = 10000):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._writes = 0
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, expires_at = row
+            if expires_at < time.time():
+                self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+        return json.loads(value)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        payload = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, payload, expires_at),
+            )
+            self._writes += 1
+            if self._writes % self._PRUNE_EVERY == 0:
+                self._prune()
+            self._conn.commit()
+
+    def _prune(self) -> None:
+        self._conn.execute("DELETE FROM cache WHERE expires_at < ?", (time.time(),))
+        self._conn.execute(
+            "DELETE FROM cache WHERE key IN ("
+            "SELECT key FROM cache ORDER BY expires_at ASC "
+            "LIMIT MAX(0, (SELECT COUNT(*) FROM cache) - ?))",
+            (self.max_entries,),
+        )
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM cache")
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class TieredCache:
+    """
+    内存层 + 可选磁盘层。读取时先查内存，未命中再查磁盘并回填内存。
+
+    Args:
+        name: 缓存名称（用于日志与统计）
+        max_entries: 内存层容量上限
+        ttl: 默认过期时间（秒）
+        sqlite_path: 磁盘层 SQLite 文件路径，为空则只使用内存层
+        max_disk_entries: 磁盘层容量上限
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_entries: int,
+        ttl: float,
+        sqlite_path: Optional[str] = None,
+        max_disk_entries: int = 10000,
+    ):
+        self.name = name
+        self.memory = TTLCache(max_entries=max_entries, ttl=ttl)
+        self.disk: Optional[SQLiteCache] = None
+        if sqlite_path:
+            try:
+                self.disk = SQLiteCache(
+                    sqlite_path, ttl=ttl, max_entries=max_disk_entries
+                )
+            except Exception as e:
+                logger.warning(f"[cache:{name}] disk tier disabled: {e}")
+        self.hits = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    async def get(self, key: str) -> Optional[Any]:
+        value = self.memory.get(key)
+        if value is not None:
+            self.hits += 1
+            self.memory_hits += 1
+            return value
+        if self.disk is not None:
+            try:
+                value = await asyncio.to_thread(self.disk.get, key)
+            except Exception as e:
+                logger.warning(f"[cache:{self.name}] disk read failed: {e}")
+                value = None
+            if value is not None:
+                self.hits += 1
+                self.disk_hits += 1
+                self.memory.set(key, value)
+                return value
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        self.memory.set(key, value, ttl=ttl)
+        if self.disk is not None:
+            try:
+                await asyncio.to_thread(self.disk.set, key, value, ttl)
+            except Exception as e:
+                logger.warning(f"[cache:{self.name}] disk write failed: {e}")
+
+    def clear(self) -> None:
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+        self.hits = self.memory_hits = self.disk_hits = self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        命中/未命中计数与当前容量。
+        """
+        total = self.hits + self.misses
+        return {
+            "name": self.name,
+            "hits": self.hits,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "memory_entries": len(self.memory),
+            "disk_enabled": self.disk is not None,
+        }
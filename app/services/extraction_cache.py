@@ -0,0 +1,82 @@
+"""
+上传文件提取结果缓存。
+
+同一份文件（如多位编辑分别改写的同一篇通稿）反复上传时，按文件内容的 sha256 命中缓存，
+跳过 DOCX/PDF 解析与 OCR。key 中包含提取器版本与影响结果的提取参数（如 PDF 的页码范围与字符预算），
+解析逻辑或参数变化后旧结果自然失效。
+"""
+
+import asyncio
+import hashlib
+import os
+from typing import BinaryIO, Optional
+
+from starlette.datastructures import UploadFile
+
+from app.configs.settings import (
+    CACHE_DIR,
+    EXTRACTION_CACHE_ENABLED,
+    EXTRACTION_CACHE_MAX_ENTRIES,
+    EXTRACTION_CACHE_TTL,
+    EXTRACTION_CACHE_DISK,
+    EXTRACTION_CACHE_MAX_DISK_ENTRIES,
+)
+from app.services.cache import TieredCache
+
+# 计算文件哈希时的读取块大小
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+extraction_cache = TieredCache(
+    name="extraction",
+    max_entries=EXTRACTION_CACHE_MAX_ENTRIES,
+    ttl=EXTRACTION_CACHE_TTL,
+    sqlite_path=(
+        os.path.join(CACHE_DIR, "extraction_cache.sqlite3")
+        if EXTRACTION_CACHE_DISK
+        else None
+    ),
+    max_disk_entries=EXTRACTION_CACHE_MAX_DISK_ENTRIES,
+)
+
+
+def _sha256_file(file: BinaryIO) -> str:
+    file.seek(0)
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: file.read(_HASH_CHUNK_SIZE), b""):
+        digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+async def hash_upload(upload: UploadFile) -> str:
+    """
+    分块计算上传文件内容的 sha256（已落盘的大文件在线程中读取）。
+    """
+    return await asyncio.to_thread(_sha256_file, upload.file)
+
+
+def build_cache_key(
+    kind: str, version: str, content_hash: str, options: str = ""
+) -> str:
+    """
+    提取缓存的 key：(文件类型, 提取器版本, 提取参数, sha256(文件内容))。
+    """
+    return "\x1f".join([kind, version, options, content_hash])
+
+
+async def get_cached_text(key: str) -> Optional[str]:
+    """
+    查询提取缓存，未命中或缓存关闭时返回 None。
+    """
+    if not EXTRACTION_CACHE_ENABLED:
+        return None
+    return await extraction_cache.get(key)
+
+
+async def set_cached_text(key: str, text: str) -> None:
+    """
+    写入提取缓存；空结果不缓存。
+    """
+    if not EXTRACTION_CACHE_ENABLED or not text:
+        return
+    await extraction_cache.set(key, text)
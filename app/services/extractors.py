@@ -2,66 +2,97 @@
 根据不同输入源提取文本
 """
 
+import asyncio
 import httpx
-import docx
-import pypdf
-import io
-from bs4 import BeautifulSoup
-from readability import Document
+import importlib.util
+import threading
+import time
+from collections import deque
+from contextlib import aclosing
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Deque,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 from fastapi import UploadFile
 from loguru import logger
 import os
 import tempfile
-import subprocess
 from pathlib import Path
 
 from app.core.exceptions import ContentExtractionError, InvalidInputError
+from app.configs.settings import (
+    PDF_MAX_CHARS,
+    PDF_OCR_MAX_PAGES,
+    PDF_PAGES_PER_TASK,
+    SUMMARIZE_CHUNK_CHARS,
+    SUMMARIZE_CONCURRENCY,
+    YOUTUBE_CAPTION_HEAD_START,
+    YOUTUBE_CAPTION_STRATEGY_TIMEOUT,
+    YOUTUBE_PROBE_MODE,
+)
+from app.services.parsers import (
+    parse_docx,
+    parse_pdf_pages,
+    ocr_pdf_page,
+    pdf_page_count,
+)
+from app.services.ocr import ocr_service
+from app.schemas.rewrite_schema import LLMType
+from app.services.singleflight import SingleFlight
+from app.services import youtube_cache, youtube_probe
+from app.services.uploads import spooled_upload
+from app.services.url_fetcher import url_fetcher
+from app.services.text_chunks import split_text
+from app.services.tokens import token_counter
+from app.services.workers import extractor_pool
 
-from PIL import Image
 from urllib.parse import urlparse, parse_qs
 import re
 
-# 轻量 OCR（中英混排效果较好）
-try:
-    from rapidocr_onnxruntime import RapidOCR  # type: ignore
-    import numpy as np  # 仅在 RapidOCR 可用时再导入 numpy
-    _rapid_ocr = RapidOCR()  # 初始化一次复用
-except Exception:
-    _rapid_ocr = None
-    np = None  # type: ignore
+# 轻量 OCR（中英混排效果较好）；引擎在进程池 worker 中初始化
+_rapid_ocr_available = importlib.util.find_spec("rapidocr_onnxruntime") is not None
+if not _rapid_ocr_available:
     logger.warning("RapidOCR is not available. Image OCR will be disabled.")
 
  
 
+# 各类文件提取器的版本号：解析逻辑变更时递增，提取缓存中的旧结果随之失效
+EXTRACTOR_VERSIONS = {
+    "docx": "1",
+    "pdf": "3",
+    "image": "2",
+}
+
+# 合并同一 URL 的并发抓取
+_url_flight = SingleFlight("url")
+
+
 async def extract_text_from_url(url: str) -> str:
     """
     从 URL 提取主要文本内容。
+    同一 URL 的并发请求共享一次抓取与解析。
     """
-    try:
-        logger.info(f"Starting URL extraction: {url}")
-
-        # 确保URL有协议
-        if not url.startswith(("http://", "https://")):
-            url = "https://" + url
-            logger.debug(f"URL protocol added: {url}")
+    # 确保URL有协议
+    if not url.startswith(("http://", "https://")):
+        url = "https://" + url
+        logger.debug(f"URL protocol added: {url}")
 
-        async with httpx.AsyncClient() as client:
-            logger.debug("Sending HTTP request...")
-            response = await client.get(url, timeout=30.0)
-            logger.debug(f"HTTP response status: {response.status_code}")
-            response.raise_for_status()
+    return await _url_flight.do(url, lambda: _extract_text_from_url(url))
 
-        logger.debug("Parsing HTML content...")
-        doc = Document(response.text)
-        summary = doc.summary()
-        logger.debug(f"Readability summary length: {len(summary)}")
 
-        soup = BeautifulSoup(summary, "html.parser")
-        text = soup.get_text()
+async def _extract_text_from_url(url: str) -> str:
+    try:
+        logger.info(f"Starting URL extraction: {url}")
 
-        # 清理文本
-        lines = [line.strip() for line in text.split("\n") if line.strip()]
-        result = "\n".join(lines)
+        # 共享连接池抓取，带 ETag/Last-Modified 条件请求缓存
+        result = await url_fetcher.fetch_text(url)
         logger.info(f"Extraction complete. Length: {len(result)}")
 
         if not result:
@@ -83,15 +114,8 @@ async def extract_text_from_docx(file: UploadFile) -> str:
     """
     try:
         logger.info(f"Starting DOCX extraction: {file.filename}")
-        content = await file.read()
-        doc = docx.Document(io.BytesIO(content))
-
-        text_parts = []
-        for paragraph in doc.paragraphs:
-            if paragraph.text.strip():
-                text_parts.append(paragraph.text.strip())
-
-        result = "\n".join(text_parts)
+        async with spooled_upload(file) as content:
+            result = await extractor_pool.run(parse_docx, content)
         logger.info(f"DOCX extraction complete. Length: {len(result)}")
         return result
 
@@ -100,25 +124,215 @@ async def extract_text_from_docx(file: UploadFile) -> str:
         raise ContentExtractionError(f"Error extracting from DOCX: {str(e)}")
 
 
-async def extract_text_from_pdf(file: UploadFile) -> str:
+def parse_page_range(spec: Optional[str], total_pages: int) -> List[int]:
     """
-    从 PDF 文件提取文本。
+    解析页码范围（从 1 开始，含两端），返回从 0 开始的页序号列表。
+
+    支持 "5"、"1-20"、"10-"（到末页）以及逗号分隔的组合，如 "1-3,8"；
+    为空时返回全部页，超出总页数的部分会被忽略。
     """
+    if not spec or not spec.strip():
+        return list(range(total_pages))
+    selected = set()
     try:
-        logger.info(f"Starting PDF extraction: {file.filename}")
-        content = await file.read()
-        pdf_reader = pypdf.PdfReader(io.BytesIO(content))
+        for part in spec.split(","):
+            part = part.strip()
+            if not part:
+                continue
+            if "-" in part:
+                start_s, end_s = part.split("-", 1)
+                start = int(start_s) if start_s.strip() else 1
+                end = int(end_s) if end_s.strip() else total_pages
+            else:
+                start = end = int(part)
+            if start < 1 or end < start:
+                raise ValueError(part)
+            selected.update(range(start - 1, min(end, total_pages)))
+    except ValueError:
+        raise InvalidInputError(
+            f"Invalid page range: {spec}", details={"page_range": spec}
+        )
+    if not selected:
+        raise InvalidInputError(
+            "Page range selects no pages",
+            details={"page_range": spec, "total_pages": total_pages},
+        )
+    return sorted(selected)
+
+
+# PDF 提取累计统计：文本层页数与 OCR 页数
+pdf_metrics: Dict[str, int] = {
+    "documents": 0,
+    "text_pages": 0,
+    "ocr_pages": 0,
+    "ocr_skipped_pages": 0,
+}
+
 
-        text_parts = []
-        for page in pdf_reader.pages:
-            text = page.extract_text()
-            if text and text.strip():
-                text_parts.append(text.strip())
+async def _pooled_in_order(
+    fn: Callable[..., Any], args_list: List[Tuple[Any, ...]]
+) -> AsyncIterator[Any]:
+    """
+    按 args_list 的顺序产出 extractor_pool.run(fn, *args) 的结果。
+
+    同时在途的任务数等于进程池大小；调用方提前停止迭代时，取消尚未完成的任务。
+    """
+    window = max(1, extractor_pool.max_workers)
+    pending: Deque["asyncio.Task[Any]"] = deque()
+    next_index = 0
+    try:
+        while True:
+            while next_index < len(args_list) and len(pending) < window:
+                pending.append(
+                    asyncio.ensure_future(
+                        extractor_pool.run(fn, *args_list[next_index])
+                    )
+                )
+                next_index += 1
+            if not pending:
+                return
+            yield await pending.popleft()
+    finally:
+        # 提前停止或出错时，排队中的任务不再执行
+        for task in pending:
+            task.cancel()
+
+
+async def extract_pdf_pages(
+    content: Union[bytes, str],
+    page_range: Optional[str] = None,
+    max_chars: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    按页分批在进程池中并行提取 PDF 文本，结果保持页序。
+
+    按页序收集结果，累计字符数达到 max_chars 后取消尚未开始的批次并截断文本。
+    没有文本层的扫描页会在第二阶段并行 OCR，每个文档最多 PDF_OCR_MAX_PAGES 页。
+
+    Args:
+        content: PDF 字节或临时文件路径
+        page_range: 页码范围，见 parse_page_range
+        max_chars: 字符预算，None 时使用 PDF_MAX_CHARS，0 表示不限
+
+    Returns:
+        Dict[str, Any]: { text, total_pages, pages: [{page, chars, ms, source}], truncated,
+        text_pages, ocr_pages, ocr_skipped_pages, elapsed_ms }
+    """
+    t_start = time.perf_counter()
+    if max_chars is None:
+        max_chars = PDF_MAX_CHARS
+    total_pages = await extractor_pool.run(pdf_page_count, content)
+    selected = parse_page_range(page_range, total_pages)
+    batches = [
+        (content, selected[i : i + PDF_PAGES_PER_TASK])
+        for i in range(0, len(selected), PDF_PAGES_PER_TASK)
+    ]
+
+    texts: Dict[int, str] = {}
+    pages: Dict[int, Dict[str, Any]] = {}
+    ocr_candidates: List[int] = []
+    chars = 0
+    truncated = False
+
+    # 第一阶段：文本层
+    async with aclosing(_pooled_in_order(parse_pdf_pages, batches)) as results:
+        async for batch in results:
+            for index, text, ms, needs_ocr in batch:
+                pages[index] = {
+                    "page": index + 1,
+                    "chars": len(text),
+                    "ms": round(ms, 1),
+                    "source": "text",
+                }
+                if text:
+                    texts[index] = text
+                    chars += len(text) + 1
+                elif needs_ocr:
+                    ocr_candidates.append(index)
+                if max_chars and chars >= max_chars:
+                    truncated = True
+                    break
+            if truncated:
+                break
+
+    # 第二阶段：扫描页 OCR（OCR 不可用时全部扫描页计为跳过）
+    ocr_budget = ocr_candidates[:PDF_OCR_MAX_PAGES]
+    if ocr_candidates and not _rapid_ocr_available:
+        logger.warning(
+            f"PDF has {len(ocr_candidates)} image-only pages but OCR is not available"
+        )
+        ocr_budget = []
+    ocr_pages = 0
+    if ocr_budget and not truncated:
+        ocr_args = [(content, index) for index in ocr_budget]
+        async with aclosing(_pooled_in_order(ocr_pdf_page, ocr_args)) as results:
+            async for index, text, ms in results:
+                ocr_pages += 1
+                pages[index].update(
+                    chars=len(text), ms=round(pages[index]["ms"] + ms, 1), source="ocr"
+                )
+                if text:
+                    texts[index] = text
+                    chars += len(text) + 1
+                if max_chars and chars >= max_chars:
+                    truncated = True
+                    break
 
-        result = "\n".join(text_parts)
+    text = "\n".join(texts[index] for index in sorted(texts))
+    if max_chars and len(text) > max_chars:
+        text = text[:max_chars]
+    text_pages = sum(
+        1 for page in pages.values() if page["source"] == "text" and page["chars"]
+    )
+    ocr_skipped_pages = len(ocr_candidates) - ocr_pages
+
+    pdf_metrics["documents"] += 1
+    pdf_metrics["text_pages"] += text_pages
+    pdf_metrics["ocr_pages"] += ocr_pages
+    pdf_metrics["ocr_skipped_pages"] += ocr_skipped_pages
+    return {
+        "text": text,
+        "total_pages": total_pages,
+        "pages": [pages[index] for index in sorted(pages)],
+        "truncated": truncated or len(pages) < len(selected),
+        "text_pages": text_pages,
+        "ocr_pages": ocr_pages,
+        "ocr_skipped_pages": ocr_skipped_pages,
+        "elapsed_ms": round((time.perf_counter() - t_start) * 1000, 1),
+    }
+
+
+async def extract_text_from_pdf(
+    file: UploadFile,
+    page_range: Optional[str] = None,
+    max_chars: Optional[int] = None,
+) -> str:
+    """
+    从 PDF 文件提取文本，可指定页码范围与字符预算（见 extract_pdf_pages）。
+    """
+    try:
+        logger.info(f"Starting PDF extraction: {file.filename}")
+        async with spooled_upload(file) as content:
+            extraction = await extract_pdf_pages(content, page_range, max_chars)
+        result = extraction["text"]
+        slowest = max(extraction["pages"], key=lambda p: p["ms"], default=None)
+        logger.info(
+            "[pdf] extracted | file={} | total_pages={} | extracted_pages={} | text_pages={} | ocr_pages={} | ocr_skipped={} | truncated={} | elapsed_ms={} | slowest_page={}",
+            file.filename,
+            extraction["total_pages"],
+            len(extraction["pages"]),
+            extraction["text_pages"],
+            extraction["ocr_pages"],
+            extraction["ocr_skipped_pages"],
+            extraction["truncated"],
+            extraction["elapsed_ms"],
+            slowest,
+        )
         logger.info(f"PDF extraction complete. Length: {len(result)}")
         return result
 
+    except InvalidInputError:
+        raise
     except Exception as e:
         logger.exception(f"Error extracting from PDF: {file.filename}")
         raise ContentExtractionError(f"Error extracting from PDF: {str(e)}")
@@ -129,39 +343,14 @@ async def extract_text_from_image(file: UploadFile) -> str:
     从图片文件提取文本（OCR）。支持常见格式：png/jpg/jpeg/webp。
     优先使用 RapidOCR；若不可用则报错提示安装。
     """
-    if _rapid_ocr is None:
+    if not _rapid_ocr_available:
         raise ContentExtractionError(
             "OCR not available. Please install rapidocr-onnxruntime."
         )
     try:
         logger.info(f"Starting IMAGE OCR: {file.filename}")
-        content = await file.read()
-        # 基础预处理：转 RGB，尽量消除模式差异
-        image = Image.open(io.BytesIO(content)).convert("RGB")
-        np_img = np.array(image)
-        result, _ = _rapid_ocr(np_img)
-        lines = []
-        for item in (result or []):
-            # 兼容不同版本 RapidOCR 的返回：
-            # 1) [box, text, score]
-            # 2) [box, (text, score)]
-            text = ""
-            if isinstance(item, (list, tuple)):
-                if len(item) >= 3:
-                    # [box, text, score]
-                    text = str(item[1] or "")
-                elif len(item) == 2:
-                    second = item[1]
-                    if isinstance(second, (list, tuple)) and second:
-                        text = str(second[0] or "")
-                    else:
-                        text = str(second or "")
-            else:
-                # 非预期结构，跳过
-                continue
-            if text.strip():
-                lines.append(text.strip())
-        extracted = "\n".join(lines)
+        async with spooled_upload(file) as content:
+            extracted = await ocr_service.recognize(content)
         logger.info(f"IMAGE OCR complete. Length: {len(extracted)}")
         if not extracted.strip():
             # 给到用户可读的错误，便于前端提示
@@ -232,89 +421,129 @@ def validate_and_get_video_id(url: str) -> str:
 
 # Step 2: 轻量探测（不下载媒体），验证可解析性并返回基础元信息
 # 说明：不强依赖 Data API；使用 yt-dlp 的 extract_info(download=False)
-try:
-    from yt_dlp import YoutubeDL  # type: ignore
-    _yt_dlp_available = True
-except Exception:
-    _yt_dlp_available = False
+# 视频本身不满足条件（而非网络波动）时的错误原因，这类结果会被短暂缓存
+_UNSUPPORTED_VIDEO = {"reason": "unsupported_video"}
+_NO_CAPTIONS = {"reason": "no_captions"}
+
+# yt-dlp 导入较重，只检查是否安装，首次探测时再导入
+_yt_dlp_available = importlib.util.find_spec("yt_dlp") is not None
+if not _yt_dlp_available:
     logger.warning("yt-dlp is not available. YouTube metadata probing disabled.")
 
 from typing import Dict, Any, List, Optional
 
-def probe_youtube_basic_info(url: str) -> Dict[str, Any]:
+_PROBE_YDL_OPTS = {
+    "quiet": True,
+    "skip_download": True,
+    "noplaylist": True,
+    "extract_flat": "discard_in_playlist",
+    "socket_timeout": 10,
+}
+# 每个线程复用一个 YoutubeDL 实例（实例本身不是线程安全的），省去反复初始化 extractor 列表的开销
+_ydl_local = threading.local()
+
+
+def _get_youtube_dl() -> Any:
+    ydl = getattr(_ydl_local, "ydl", None)
+    if ydl is None:
+        from yt_dlp import YoutubeDL  # type: ignore
+
+        ydl = YoutubeDL(_PROBE_YDL_OPTS)
+        _ydl_local.ydl = ydl
+    return ydl
+
+
+def _ytdlp_extract_info(url: str) -> Dict[str, Any]:
+    # 在执行探测的线程中取该线程自己的 YoutubeDL 实例
+    return _get_youtube_dl().extract_info(url, download=False)
+
+
+async def probe_youtube_basic_info(url: str) -> Dict[str, Any]:
     """
-    使用 yt-dlp 做不下载媒体的元信息探测，判断是否为可解析的单视频：
+    做不下载媒体的元信息探测，判断是否为可解析的单视频：
     - 拒绝 playlist/entries
     - 拒绝直播与即将直播
     - 拒绝会员/私有/需登录/受限
     - 校验时长存在且 > 0
+    YOUTUBE_PROBE_MODE=fast 时先读取观看页内嵌的元信息，字段不全再使用 yt-dlp（阻塞调用，在线程中执行）。
     成功返回:
       { videoId, title, duration, is_live, availability, age_limit }
     失败抛 ContentExtractionError。
     """
+    if not url.startswith(("http://", "https://")):
+        url = "https://" + url
+    if YOUTUBE_PROBE_MODE == "fast":
+        t0 = time.perf_counter()
+        info = await youtube_probe.fetch_basic_info(validate_and_get_video_id(url))
+        probe_ms = (time.perf_counter() - t0) * 1000
+        if info is not None:
+            logger.info("[youtube] fast probe ok | video_id={} | probe_ms={:.1f}", info["id"], probe_ms)
+            return _check_probe_info(info)
+        logger.info("[youtube] fast probe incomplete, falling back to yt-dlp | probe_ms={:.1f}", probe_ms)
+
     if not _yt_dlp_available:
         raise ContentExtractionError(
             "yt-dlp not installed. Please `pip install yt-dlp` to enable YouTube probing."
         )
-    if not url.startswith(("http://", "https://")):
-        url = "https://" + url
-    ydl_opts = {
-        "quiet": True,
-        "skip_download": True,
-        "noplaylist": True,
-        "extract_flat": "discard_in_playlist",
-        "socket_timeout": 10,
-    }
     try:
-        with YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(url, download=False)
-        # playlist 识别
-        if info.get("_type") == "playlist" or "entries" in info:
-            raise ContentExtractionError("Playlist URL is not supported")
-        video_id = info.get("id") or ""
-        title = info.get("title") or ""
-        duration = info.get("duration")
-        is_live = bool(info.get("is_live") or (info.get("live_status") in {"is_live", "is_upcoming"}))
-        availability = (info.get("availability") or "").lower()
-        age_limit = int(info.get("age_limit") or 0)
-        # 基本可播性判断
-        if is_live:
-            raise ContentExtractionError("Live stream is not supported")
-        if not isinstance(duration, (int, float)) or int(duration) <= 0:
-            raise ContentExtractionError("Video is not playable or duration is unknown")
-        if availability and availability not in {"public", "unlisted"}:
-            # 常见：private, needs_auth, premium_only, subscriber_only 等
-            raise ContentExtractionError("Video requires membership or is restricted")
-        # v1 直接拒绝年龄限制
-        if age_limit >= 18:
-            raise ContentExtractionError("Age restricted video is not supported in v1")
-        return {
-            "videoId": video_id,
-            "title": title,
-            "duration": int(duration),
-            "is_live": is_live,
-            "availability": availability,
-            "age_limit": age_limit,
-        }
-    except ContentExtractionError:
-        raise
+        info = await asyncio.to_thread(_ytdlp_extract_info, url)
     except Exception as e:
         logger.exception(f"yt-dlp probing failed for url={url} | reason={e}")
         raise ContentExtractionError(f"Failed to probe YouTube metadata: {str(e)}")
+    return _check_probe_info(info)
+
+
+def _check_probe_info(info: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    按 yt-dlp info 字段做可解析性判断，返回探测结果。
+    """
+    # playlist 识别
+    if info.get("_type") == "playlist" or "entries" in info:
+        raise ContentExtractionError(
+            "Playlist URL is not supported", details=_UNSUPPORTED_VIDEO
+        )
+    video_id = info.get("id") or ""
+    title = info.get("title") or ""
+    duration = info.get("duration")
+    is_live = bool(info.get("is_live") or (info.get("live_status") in {"is_live", "is_upcoming"}))
+    availability = (info.get("availability") or "").lower()
+    age_limit = int(info.get("age_limit") or 0)
+    # 基本可播性判断
+    if is_live:
+        raise ContentExtractionError(
+            "Live stream is not supported", details=_UNSUPPORTED_VIDEO
+        )
+    if not isinstance(duration, (int, float)) or int(duration) <= 0:
+        raise ContentExtractionError(
+            "Video is not playable or duration is unknown",
+            details=_UNSUPPORTED_VIDEO,
+        )
+    if availability and availability not in {"public", "unlisted"}:
+        # 常见：private, needs_auth, premium_only, subscriber_only 等
+        raise ContentExtractionError(
+            "Video requires membership or is restricted",
+            details=_UNSUPPORTED_VIDEO,
+        )
+    # v1 直接拒绝年龄限制
+    if age_limit >= 18:
+        raise ContentExtractionError(
+            "Age restricted video is not supported in v1",
+            details=_UNSUPPORTED_VIDEO,
+        )
+    return {
+        "videoId": video_id,
+        "title": title,
+        "duration": int(duration),
+        "is_live": is_live,
+        "availability": availability,
+        "age_limit": age_limit,
+    }
 
 # Step 3: 字幕提取（仅字幕，不做 ASR）
 import asyncio
-try:
-    from youtube_transcript_api import YouTubeTranscriptApi  # type: ignore
-    from youtube_transcript_api._errors import (  # type: ignore
-        NoTranscriptFound,
-        TranscriptsDisabled,
-        CouldNotRetrieveTranscript,
-        VideoUnavailable,
-    )
-    _yt_transcript_available = True
-except Exception:
-    _yt_transcript_available = False
+# 同样只检查是否安装，首次拉取字幕时再导入
+_yt_transcript_available = importlib.util.find_spec("youtube_transcript_api") is not None
+if not _yt_transcript_available:
     logger.warning("youtube-transcript-api is not available. Transcript extraction disabled.")
 
 def _expand_language_preferences(prefer_langs: Optional[List[str]]) -> List[str]:
@@ -338,6 +567,86 @@ def _expand_language_preferences(prefer_langs: Optional[List[str]]) -> List[str]
                 expanded.append(v)
     return expanded
 
+def _join_caption_items(items: Any) -> str:
+    lines: List[str] = []
+    for it in items or []:
+        txt = (it.get("text") or "").strip()
+        if txt:
+            lines.append(txt)
+    return "\n".join(lines).strip()
+
+
+# 字幕拉取方式的竞速统计：各方式胜出、失败、超时次数
+caption_metrics: Dict[str, Dict[str, int]] = {
+    "wins": {},
+    "failures": {},
+    "timeouts": {},
+}
+
+
+def _count(bucket: str, name: str) -> None:
+    caption_metrics[bucket][name] = caption_metrics[bucket].get(name, 0) + 1
+
+
+async def _race_caption_strategies(
+    strategies: List[Tuple[str, Callable[[], Any]]],
+    head_start: float,
+    timeout: float,
+) -> str:
+    """
+    第一种方式先行；领先 head_start 秒仍未返回（或已失败）时启动其余方式一起竞速。
+    最先返回非空文本的方式胜出，其余任务被取消；每种方式单独受 timeout 限制。
+
+    Returns:
+        str: 胜出方式的文本，全部失败时为空字符串
+    """
+    async def run(name: str, factory: Callable[[], Any]) -> str:
+        t0 = time.perf_counter()
+        try:
+            text = await asyncio.wait_for(factory(), timeout=timeout)
+        except asyncio.TimeoutError:
+            _count("timeouts", name)
+            logger.warning(f"[youtube] caption strategy {name} timed out after {timeout}s")
+            return ""
+        except Exception as e:
+            _count("failures", name)
+            logger.warning(f"[youtube] caption strategy {name} failed: {e}")
+            return ""
+        if not text:
+            _count("failures", name)
+        logger.debug(f"[youtube] caption strategy {name} finished in {(time.perf_counter() - t0) * 1000:.0f}ms | chars={len(text or '')}")
+        return text or ""
+
+    loop = asyncio.get_running_loop()
+    tasks: Dict[asyncio.Future, str] = {}
+    waiting = list(strategies)
+    name, factory = waiting.pop(0)
+    tasks[asyncio.ensure_future(run(name, factory))] = name
+    deadline = loop.time() + head_start
+    try:
+        while tasks or waiting:
+            if waiting and (not tasks or loop.time() >= deadline):
+                for name, factory in waiting:
+                    tasks[asyncio.ensure_future(run(name, factory))] = name
+                waiting = []
+            done, _ = await asyncio.wait(
+                tasks,
+                timeout=max(0.0, deadline - loop.time()) if waiting else None,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            for task in done:
+                name = tasks.pop(task)
+                text = task.result()
+                if text:
+                    _count("wins", name)
+                    logger.info(f"[youtube] caption strategy won | strategy={name} | chars={len(text)}")
+                    return text
+        return ""
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
 async def fetch_youtube_transcript(
     video_id: str,
     prefer_langs: Optional[List[str]] = None,
@@ -353,6 +662,14 @@ async def fetch_youtube_transcript(
         raise ContentExtractionError(
             "youtube-transcript-api not installed. Please `pip install youtube-transcript-api`."
         )
+    from youtube_transcript_api import YouTubeTranscriptApi  # type: ignore
+    from youtube_transcript_api._errors import (  # type: ignore
+        NoTranscriptFound,
+        TranscriptsDisabled,
+        CouldNotRetrieveTranscript,
+        VideoUnavailable,
+    )
+
     try:
         languages = _expand_language_preferences(prefer_langs)
         # 可选 cookies（用于通过登录态提升字幕命中率）
@@ -397,46 +714,40 @@ async def fetch_youtube_transcript(
                     except Exception:
                         selected = None
         if not selected:
-            raise ContentExtractionError("该视频无可用字幕，暂不支持（后续将支持音频转写）")
+            raise ContentExtractionError(
+                "该视频无可用字幕，暂不支持（后续将支持音频转写）", details=_NO_CAPTIONS
+            )
 
-        # 主路径：优先使用选中的 Transcript.fetch()
-        merged = ""
-        try:
+        # 三种拉取方式：Transcript.fetch() 先行，领先 YOUTUBE_CAPTION_HEAD_START 秒后
+        # get_transcript 与 yt-dlp 一起加入竞速，取最先返回的非空结果
+        async def via_transcript_fetch() -> str:
             items = await asyncio.to_thread(selected.fetch)
-            lines: List[str] = []
-            for it in items or []:
-                txt = (it.get("text") or "").strip()
-                if txt:
-                    lines.append(txt)
-            merged = "\n".join(lines).strip()
-        except Exception:
-            merged = ""
+            return _join_caption_items(items)
 
-        # 兜底：遇到解析异常或空结果时，改走 get_transcript（更通用的 API）
-        if not merged:
-            try:
-                raw_items = await asyncio.to_thread(
-                    YouTubeTranscriptApi.get_transcript,
-                    video_id,
-                    languages=languages,
-                    cookies=cookies_path or None,
-                )
-                lines: List[str] = []
-                for it in raw_items or []:
-                    txt = (it.get("text") or "").strip()
-                    if txt:
-                        lines.append(txt)
-                merged = "\n".join(lines).strip()
-            except Exception:
-                merged = ""
+        async def via_get_transcript() -> str:
+            raw_items = await asyncio.to_thread(
+                YouTubeTranscriptApi.get_transcript,
+                video_id,
+                languages=languages,
+                cookies=cookies_path or None,
+            )
+            return _join_caption_items(raw_items)
 
-        if not merged:
-            # 最后兜底：使用 yt-dlp 下载字幕文件（无需 ffmpeg）
-            try:
-                merged = _download_captions_with_ytdlp(video_id, languages, cookies_path or None)
-            except Exception as e:
-                logger.warning(f"[youtube] yt-dlp caption fallback failed: {e}")
-                merged = ""
+        async def via_ytdlp() -> str:
+            # 使用 yt-dlp 下载字幕文件（无需 ffmpeg）
+            return await _download_captions_with_ytdlp(
+                video_id, languages, cookies_path or None
+            )
+
+        merged = await _race_caption_strategies(
+            [
+                ("transcript_fetch", via_transcript_fetch),
+                ("get_transcript", via_get_transcript),
+                ("ytdlp", via_ytdlp),
+            ],
+            head_start=YOUTUBE_CAPTION_HEAD_START,
+            timeout=YOUTUBE_CAPTION_STRATEGY_TIMEOUT,
+        )
 
         if not merged:
             raise ContentExtractionError("字幕拉取为空或被限制（稍后重试或更换视频试试）")
@@ -447,7 +758,10 @@ async def fetch_youtube_transcript(
             "orig_len": len(merged),
         }
     except (NoTranscriptFound, TranscriptsDisabled):
-        raise ContentExtractionError("该视频无字幕或字幕被禁用，暂不支持（后续将支持音频转写）")
+        raise ContentExtractionError(
+            "该视频无字幕或字幕被禁用，暂不支持（后续将支持音频转写）",
+            details=_NO_CAPTIONS,
+        )
     except (CouldNotRetrieveTranscript, VideoUnavailable) as e:
         raise ContentExtractionError(f"字幕获取失败：{str(e)}")
     except ContentExtractionError:
@@ -519,40 +833,47 @@ def _parse_vtt_to_text(vtt_content: str) -> str:
         body_lines.append(s)
     return clean_and_normalize_transcript("\n".join(body_lines))
 
-def _download_captions_with_ytdlp(video_id: str, languages: List[str], cookies_path: Optional[str]) -> str:
+async def _download_captions_with_ytdlp(video_id: str, languages: List[str], cookies_path: Optional[str]) -> str:
     """
-    使用 yt-dlp 下载字幕（优先 --write-sub，失败试 --write-auto-sub），返回解析后的纯文本。
+    使用 yt-dlp 子进程下载字幕，返回解析后的纯文本。
+    同时传 --write-sub 与 --write-auto-sub，yt-dlp 对同一语言优先写人工字幕，一次调用即可；
+    任务被取消时结束子进程。
     """
-    try:
-        import yt_dlp  # noqa: F401
-    except Exception:
+    if not _yt_dlp_available:
         raise ContentExtractionError("yt-dlp 未安装，无法使用字幕兜底（pip install yt-dlp）")
 
     url = f"https://www.youtube.com/watch?v={video_id}"
     lang_csv = ",".join(languages or ["zh-Hans", "zh", "en"])
     with tempfile.TemporaryDirectory(prefix="ytvtt_") as td:
         out_tpl = str(Path(td) / "%(id)s.%(ext)s")
-        base = [
+        cmd = [
             "yt-dlp",
             "--skip-download",
+            "--write-sub",
+            "--write-auto-sub",
             "--sub-format", "vtt",
             "--sub-lang", lang_csv,
             "-o", out_tpl,
             url,
         ]
         if cookies_path:
-            base += ["--cookies", cookies_path]
-        # 先人工
-        cmd1 = base + ["--write-sub"]
-        r1 = subprocess.run(cmd1, capture_output=True, text=True)
+            cmd += ["--cookies", cookies_path]
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        try:
+            _, stderr = await proc.communicate()
+        except BaseException:
+            if proc.returncode is None:
+                proc.kill()
+                await proc.wait()
+            raise
         vtt_files = list(Path(td).glob(f"{video_id}*.vtt"))
         if not vtt_files:
-            # 再自动
-            cmd2 = base + ["--write-auto-sub"]
-            r2 = subprocess.run(cmd2, capture_output=True, text=True)
-            vtt_files = list(Path(td).glob(f"{video_id}*.vtt"))
-            if not vtt_files:
-                raise ContentExtractionError("yt-dlp 无法获取字幕（人工/自动均失败）")
+            logger.debug(f"[youtube] yt-dlp stderr: {stderr.decode('utf-8', errors='ignore')[-500:]}")
+            raise ContentExtractionError("yt-dlp 无法获取字幕（人工/自动均失败）")
         # 选择与优先语言最匹配的文件
         target = None
         for code in (languages or []):
@@ -571,8 +892,8 @@ def _download_captions_with_ytdlp(video_id: str, languages: List[str], cookies_p
             raise ContentExtractionError("已下载字幕但内容为空")
         return parsed
 
-# Step 5: 长度策略（v1：字符上限，支持截断/单次摘要）
-from app.services.llms import rewriting_client  # 延迟导入，避免不必要的依赖加载
+# Step 5: 长度策略（v1：字符上限，支持截断/单次摘要/分块并行摘要）
+from app.services.llms import rewriting_client  # 模块级导入；模型 SDK 在首次创建 client 时才导入
 
 def estimate_source_length_chars(text: str) -> int:
     """
@@ -580,47 +901,149 @@ def estimate_source_length_chars(text: str) -> int:
     """
     return len(text or "")
 
+def estimate_source_length_tokens(
+    text: str, llm_type: Optional[Union[str, LLMType]] = None
+) -> int:
+    """
+    按 llm_type 对应的分词器估算 token 数。
+    """
+    return token_counter.count(text or "", llm_type)
+
+def _as_llm_type(llm_type: Union[str, LLMType]) -> LLMType:
+    if isinstance(llm_type, LLMType):
+        return llm_type
+    try:
+        return LLMType(llm_type)
+    except ValueError:
+        return LLMType[str(llm_type).upper()]
+
+async def _summarize(llm_type: LLMType, instruction: str, source: str) -> str:
+    result = await rewriting_client.get_rewriting_result(
+        llm_type=llm_type,
+        instruction=instruction,
+        source=source,
+    )
+    # 压缩后的正文在 rewritten 字段，summary 只是一句话概要
+    return (result.rewritten or result.summary or "").strip()
+
+
+async def _map_reduce_summarize(
+    src: str,
+    max_chars: int,
+    llm_type: LLMType,
+    summarize_instruction: Optional[str],
+    depth: int = 0,
+) -> Tuple[str, int]:
+    """
+    map：按段落/句子边界分块，在 SUMMARIZE_CONCURRENCY 并发上限内分别压缩；
+    reduce：按原顺序拼接各块摘要，仍超过 max_chars 时再做一次合并压缩
+    （摘要本身过长时递归 map_reduce 一层）。
+
+    Returns:
+        Tuple[str, int]: (压缩后的文本, 分块数)
+    """
+    chunks = split_text(src, SUMMARIZE_CHUNK_CHARS)
+    # 各块按原文占比分配摘要长度
+    per_chunk = max(200, max_chars // max(1, len(chunks)))
+    instruction = summarize_instruction or (
+        f"请将下面的内容压缩为精炼摘要，保留关键信息、实体与结构，长度不超过约 {per_chunk} 个字符。"
+    )
+    semaphore = asyncio.Semaphore(SUMMARIZE_CONCURRENCY)
+
+    async def summarize_chunk(chunk: str) -> str:
+        async with semaphore:
+            return await _summarize(llm_type, instruction, chunk.strip())
+
+    summaries = await asyncio.gather(*[summarize_chunk(c) for c in chunks])
+    merged = "\n\n".join(s for s in summaries if s)
+    if len(merged) <= max_chars:
+        return merged, len(chunks)
+    if len(merged) > SUMMARIZE_CHUNK_CHARS and depth < 1:
+        merged, _ = await _map_reduce_summarize(
+            merged, max_chars, llm_type, summarize_instruction, depth + 1
+        )
+        if len(merged) <= max_chars:
+            return merged, len(chunks)
+    reduce_instruction = (
+        f"下面是同一份长文按顺序分段压缩后的摘要，请合并为一篇连贯的摘要，"
+        f"去除重复内容，保留关键信息与先后顺序，长度不超过约 {max_chars} 个字符。"
+    )
+    reduced = await _summarize(llm_type, reduce_instruction, merged)
+    return reduced[:max_chars], len(chunks)
+
 async def apply_length_policy(
     text: str,
     mode: str = "truncate",
     max_chars: int = 12000,
-    llm_type: Optional[str] = None,
+    llm_type: Optional[Union[str, LLMType]] = None,
     summarize_instruction: Optional[str] = None,
+    max_tokens: Optional[int] = None,
 ) -> Dict[str, Any]:
     """
     对源文本应用长度策略：
     - mode == "truncate": 超过 max_chars 直接截断到上限
     - mode == "single_summarize": 超过上限时先用同一 LLM 做一次摘要压缩，再作为结果返回
+    - mode == "map_reduce": 超过上限时分块并行摘要，再合并各块摘要（适合超出单次上下文的长文）
+
+    传入 max_tokens 时按 llm_type 对应分词器的 token 数判断是否超限并截断，
+    摘要的字符目标按原文实测的字符/token 比例换算。
 
     返回:
       {
         "text": str,          # 处理后的文本
-        "mode": str,          # "original" | "truncate" | "single_summarize"
+        "mode": str,          # "original" | "truncate" | "single_summarize" | "map_reduce"
         "orig_len": int,      # 原始长度（字符）
         "final_len": int,     # 最终长度（字符）
-        "truncated": bool     # 是否发生截断（仅 truncate 模式）
+        "truncated": bool,    # 是否发生截断（仅 truncate 模式）
+        "chunks": int,        # 分块数（仅 map_reduce 模式）
+        "orig_tokens": int,   # 原始/最终 token 数（仅传入 max_tokens 时）
+        "final_tokens": int
       }
     """
     src = text or ""
     orig_len = estimate_source_length_chars(src)
-    if orig_len <= max_chars:
-        return {
-            "text": src,
-            "mode": "original",
-            "orig_len": orig_len,
-            "final_len": orig_len,
-            "truncated": False,
-        }
+    orig_tokens = 0
+    if max_tokens:
+        # 长文本分词较慢，放到线程中执行，避免阻塞事件循环
+        orig_tokens = await asyncio.to_thread(
+            estimate_source_length_tokens, src, llm_type
+        )
+        fits = orig_tokens <= max_tokens
+        if not fits:
+            max_chars = min(max_chars, max(1, max_tokens * orig_len // orig_tokens))
+    else:
+        fits = orig_len <= max_chars
 
-    if mode == "truncate":
-        out = src[:max_chars]
-        return {
+    async def result(out: str, applied_mode: str, truncated: bool, **extra: Any) -> Dict[str, Any]:
+        applied = {
             "text": out,
-            "mode": "truncate",
+            "mode": applied_mode,
             "orig_len": orig_len,
             "final_len": len(out),
-            "truncated": True,
+            "truncated": truncated,
+            **extra,
         }
+        if max_tokens:
+            applied["orig_tokens"] = orig_tokens
+            applied["final_tokens"] = (
+                orig_tokens
+                if out is src
+                else await asyncio.to_thread(estimate_source_length_tokens, out, llm_type)
+            )
+        return applied
+
+    async def truncate() -> str:
+        if max_tokens:
+            return await asyncio.to_thread(
+                token_counter.truncate, src, max_tokens, llm_type
+            )
+        return src[:max_chars]
+
+    if fits:
+        return await result(src, "original", False)
+
+    if mode == "truncate":
+        return await result(await truncate(), "truncate", True)
 
     if mode == "single_summarize":
         if not llm_type:
@@ -631,42 +1054,39 @@ async def apply_length_policy(
         )
         try:
             logger.info("[length_policy] single_summarize start | llm_type={} | orig_len={} | max_chars={}", llm_type, orig_len, max_chars)
-            summarized = await rewriting_client.get_rewriting_result(
-                llm_type=llm_type,
-                instruction=instruction,
-                source=src,
-            )
-            final_text = summarized or ""
-            return {
-                "text": final_text,
-                "mode": "single_summarize",
-                "orig_len": orig_len,
-                "final_len": len(final_text),
-                "truncated": False,
-            }
+            final_text = await _summarize(_as_llm_type(llm_type), instruction, src)
+            return await result(final_text, "single_summarize", False)
         except Exception as e:
             logger.exception("[length_policy] single_summarize failed | reason={}", e)
             raise ContentExtractionError(f"Summarization failed: {str(e)}")
 
+    if mode == "map_reduce":
+        if not llm_type:
+            raise ContentExtractionError("map_reduce requires llm_type")
+        t0 = time.perf_counter()
+        try:
+            final_text, chunks = await _map_reduce_summarize(
+                src, max_chars, _as_llm_type(llm_type), summarize_instruction
+            )
+        except Exception as e:
+            logger.exception("[length_policy] map_reduce failed | reason={}", e)
+            raise ContentExtractionError(f"Summarization failed: {str(e)}")
+        logger.info("[length_policy] map_reduce done | llm_type={} | orig_len={} | chunks={} | final_len={} | ms={:.1f}", llm_type, orig_len, chunks, len(final_text), (time.perf_counter() - t0) * 1000)
+        return await result(final_text, "map_reduce", False, chunks=chunks)
+
     # 未知模式：回退截断
-    out = src[:max_chars]
-    return {
-        "text": out,
-        "mode": "truncate",
-        "orig_len": orig_len,
-        "final_len": len(out),
-        "truncated": True,
-    }
+    return await result(await truncate(), "truncate", True)
 
 # Step 6: 编排（串联 1-5 步），面向路由的统一入口
 async def ingest_youtube_url_v1(
     url: str,
     prefer_langs: Optional[List[str]] = None,
     fallback_any_language: bool = True,
-    length_mode: str = "truncate",          # "truncate" | "single_summarize"
+    length_mode: str = "truncate",          # "truncate" | "single_summarize" | "map_reduce"
     max_chars: int = 12000,
-    llm_type_for_summarize: Optional[str] = None,
+    llm_type_for_summarize: Optional[Union[str, LLMType]] = None,
     summarize_instruction: Optional[str] = None,
+    max_tokens: Optional[int] = None,
 ) -> Dict[str, Any]:
     """
     v1 组合流程：校验 -> 探测 -> 拉字幕 -> 清洗规范化 -> 长度策略
@@ -682,24 +1102,60 @@ async def ingest_youtube_url_v1(
           "length_mode": str,
           "orig_len": int,
           "final_len": int,
-          "truncated": bool
+          "truncated": bool,
+          "cached": bool   # 是否命中字幕缓存
         }
       }
     """
     # Step 1
     vid = validate_and_get_video_id(url)
     logger.info("[youtube] step1 ok | video_id={}", vid)
-    # Step 2
-    basic = probe_youtube_basic_info(url)
-    logger.info("[youtube] step2 ok | video_id={} | title={} | duration={} | availability={}", basic.get("videoId"), basic.get("title"), basic.get("duration"), basic.get("availability"))
-    # Step 3
-    tr = await fetch_youtube_transcript(
-        video_id=basic.get("videoId") or vid,
-        prefer_langs=prefer_langs,
-        fallback_any_language=fallback_any_language,
+    # 字幕缓存命中时跳过探测与字幕拉取（命中“无字幕”等否定结果时直接抛出）
+    cached = await youtube_cache.get_cached_transcript(
+        vid, prefer_langs, fallback_any_language
     )
-    # Step 4
-    cleaned = clean_and_normalize_transcript(tr.get("text") or "")
+    if cached is not None:
+        logger.info("[youtube] transcript cache hit | video_id={} | lang={} | type={}", vid, cached["lang"], cached["transcript_type"])
+        basic = cached["probe"]
+        tr = {"lang": cached["lang"], "transcript_type": cached["transcript_type"]}
+        cleaned = cached["text"]
+    else:
+        # Step 2 与 Step 3 并发：探测的同时用 Step 1 的 videoId 拉取字幕
+        probe_task = asyncio.ensure_future(probe_youtube_basic_info(url))
+        transcript_task = asyncio.ensure_future(
+            fetch_youtube_transcript(
+                video_id=vid,
+                prefer_langs=prefer_langs,
+                fallback_any_language=fallback_any_language,
+            )
+        )
+        try:
+            # Step 2：探测拒绝（直播、会员等）时不再等待字幕
+            basic = await probe_task
+            logger.info("[youtube] step2 ok | video_id={} | title={} | duration={} | availability={}", basic.get("videoId"), basic.get("title"), basic.get("duration"), basic.get("availability"))
+            # Step 3
+            tr = await transcript_task
+        except ContentExtractionError as e:
+            transcript_task.cancel()
+            await youtube_cache.set_negative_result(
+                vid, prefer_langs, fallback_any_language, e
+            )
+            raise
+        except BaseException:
+            probe_task.cancel()
+            transcript_task.cancel()
+            raise
+        # Step 4
+        cleaned = clean_and_normalize_transcript(tr.get("text") or "")
+        await youtube_cache.set_cached_transcript(
+            vid,
+            prefer_langs,
+            fallback_any_language,
+            probe=basic,
+            lang=tr.get("lang") or "",
+            transcript_type=tr.get("transcript_type") or "",
+            text=cleaned,
+        )
     # Step 5
     applied = await apply_length_policy(
         text=cleaned,
@@ -707,6 +1163,7 @@ async def ingest_youtube_url_v1(
         max_chars=max_chars,
         llm_type=llm_type_for_summarize,
         summarize_instruction=summarize_instruction,
+        max_tokens=max_tokens,
     )
     logger.info("[youtube] step3-5 ok | video_id={} | lang={} | type={} | final_len={} | mode={}", basic.get("videoId"), tr.get("lang"), tr.get("transcript_type"), applied.get("final_len"), applied.get("mode"))
     return {
@@ -721,5 +1178,6 @@ async def ingest_youtube_url_v1(
             "orig_len": applied.get("orig_len") or 0,
             "final_len": applied.get("final_len") or 0,
             "truncated": bool(applied.get("truncated")),
+            "cached": cached is not None,
         },
     }
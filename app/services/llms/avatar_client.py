@@ -3,6 +3,7 @@ import asyncio
 import httpx
 from loguru import logger
 from app.core.exceptions import LLMProviderError
+from app.services.llms.client_registry import provider_clients
 
 
 class AvatarClient:
@@ -56,10 +57,10 @@ class AvatarClient:
         }
 
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    url, headers=self.headers, json=payload, timeout=30.0
-                )
+            client = provider_clients.get_http_client()
+            response = await client.post(
+                url, headers=self.headers, json=payload, timeout=30.0
+            )
 
             if response.status_code != 200:
                 logger.error(f"HeyGen generation failed: {response.text}")
@@ -85,10 +86,11 @@ class AvatarClient:
         max_retries = 30  # 30 * 4s = 120s timeout
         for _ in range(max_retries):
             try:
-                async with httpx.AsyncClient() as client:
-                    response = await client.get(
-                        url, headers=self.headers, params=params, timeout=10.0
-                    )
+                # 复用共享连接池，轮询期间保持同一条 keep-alive 连接
+                client = provider_clients.get_http_client()
+                response = await client.get(
+                    url, headers=self.headers, params=params, timeout=10.0
+                )
 
                 if response.status_code != 200:
                     logger.warning(f"HeyGen status check failed: {response.text}")
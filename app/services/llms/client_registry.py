@@ -0,0 +1,212 @@
+"""
+进程级的 provider client 注册表。
+
+每个 provider 只持有一个长连接、可复用连接池（支持 HTTP/2）的 client，
+由 app/main.py 的 lifespan 在启动时创建并预热，在关闭时统一释放。
+"""
+
+import importlib.util
+import os
+from typing import TYPE_CHECKING, List, Optional, Tuple, Union
+
+import httpx
+from loguru import logger
+
+from app.configs.settings import (
+    PROVIDER_HTTP2,
+    PROVIDER_MAX_CONNECTIONS,
+    PROVIDER_MAX_KEEPALIVE_CONNECTIONS,
+    PROVIDER_KEEPALIVE_EXPIRY,
+    PROVIDER_CONNECT_TIMEOUT,
+    PROVIDER_READ_TIMEOUT,
+    PROVIDER_MAX_RETRIES,
+    PROVIDER_WARMUP,
+    OPENAI_BASE_URL,
+    QWEN_BASE_URL,
+    GEMINI_BASE_URL,
+)
+
+# openai 与 google-genai 导入耗时较长，只在首次创建对应 client 时导入
+if TYPE_CHECKING:
+    from google import genai
+    from openai import AsyncOpenAI
+
+
+def _http2_enabled() -> bool:
+    """
+    HTTP/2 需要安装 h2，未安装时回退到 HTTP/1.1。
+    """
+    if not PROVIDER_HTTP2:
+        return False
+    if importlib.util.find_spec("h2") is None:
+        logger.warning("h2 is not installed. Provider clients fall back to HTTP/1.1.")
+        return False
+    return True
+
+
+def _build_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=PROVIDER_MAX_CONNECTIONS,
+        max_keepalive_connections=PROVIDER_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=PROVIDER_KEEPALIVE_EXPIRY,
+    )
+
+
+def _build_timeout() -> httpx.Timeout:
+    return httpx.Timeout(PROVIDER_READ_TIMEOUT, connect=PROVIDER_CONNECT_TIMEOUT)
+
+
+async def _open_connection(
+    target: Union[httpx.AsyncClient, httpx.AsyncBaseTransport], url: str
+) -> None:
+    """
+    向 url 发一个 HEAD 请求，只为在连接池中完成 DNS/TCP/TLS 握手，响应状态无关紧要。
+    Gemini 的 httpx client 由 SDK 内部创建，因此直接经由传入的 transport 发送。
+    """
+    if isinstance(target, httpx.AsyncClient):
+        await target.head(url, timeout=PROVIDER_CONNECT_TIMEOUT)
+        return
+    request = httpx.Request(
+        "HEAD",
+        url,
+        extensions={"timeout": httpx.Timeout(PROVIDER_CONNECT_TIMEOUT).as_dict()},
+    )
+    response = await target.handle_async_request(request)
+    await response.aclose()
+
+
+class ProviderClientRegistry:
+    """
+    持有各 provider 的共享 client。
+
+    所有 get_* 方法都是惰性的：lifespan 未运行时（如脚本或单元测试）首次调用会就地创建。
+    """
+
+    def __init__(self):
+        self._http_client: Optional[httpx.AsyncClient] = None
+        self._openai_client: Optional["AsyncOpenAI"] = None
+        self._openai_http_client: Optional[httpx.AsyncClient] = None
+        self._qwen_client: Optional["AsyncOpenAI"] = None
+        self._qwen_http_client: Optional[httpx.AsyncClient] = None
+        self._gemini_client: Optional["genai.Client"] = None
+        self._gemini_transport: Optional[httpx.AsyncHTTPTransport] = None
+
+    def _build_http_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            http2=_http2_enabled(),
+            limits=_build_limits(),
+            timeout=_build_timeout(),
+        )
+
+    def get_http_client(self) -> httpx.AsyncClient:
+        """
+        通用的 httpx 异步 client（如 HeyGen 等直接走 HTTP 的 provider）。
+        """
+        if self._http_client is None or self._http_client.is_closed:
+            self._http_client = self._build_http_client()
+        return self._http_client
+
+    def get_openai_client(self) -> "AsyncOpenAI":
+        """
+        OpenAI 异步 client，会自动获取环境变量中的“OPENAI_API_KEY”。
+        """
+        if self._openai_client is None:
+            from openai import AsyncOpenAI
+
+            self._openai_http_client = self._build_http_client()
+            self._openai_client = AsyncOpenAI(
+                http_client=self._openai_http_client,
+                timeout=_build_timeout(),
+                max_retries=PROVIDER_MAX_RETRIES,
+            )
+        return self._openai_client
+
+    def get_qwen_client(self) -> "AsyncOpenAI":
+        """
+        Qwen（OpenAI 兼容模式）异步 client，使用环境变量中的“DASHSCOPE_API_KEY”。
+        """
+        if self._qwen_client is None:
+            from openai import AsyncOpenAI
+
+            self._qwen_http_client = self._build_http_client()
+            self._qwen_client = AsyncOpenAI(
+                api_key=os.getenv("DASHSCOPE_API_KEY"),
+                base_url=QWEN_BASE_URL,
+                http_client=self._qwen_http_client,
+                timeout=_build_timeout(),
+                max_retries=PROVIDER_MAX_RETRIES,
+            )
+        return self._qwen_client
+
+    def get_gemini_client(self) -> "genai.Client":
+        """
+        Gemini client，会自动获取环境变量中的“GEMINI_API_KEY”。
+        显式传入 httpx transport，使 aio 调用走可复用的 httpx 连接池。
+        """
+        if self._gemini_client is None:
+            from google import genai
+            from google.genai import types as genai_types
+
+            self._gemini_transport = httpx.AsyncHTTPTransport(
+                http2=_http2_enabled(), limits=_build_limits()
+            )
+            self._gemini_client = genai.Client(
+                http_options=genai_types.HttpOptions(
+                    timeout=int(PROVIDER_READ_TIMEOUT * 1000),
+                    async_client_args={"transport": self._gemini_transport},
+                )
+            )
+        return self._gemini_client
+
+    async def startup(self) -> None:
+        """
+        创建共享 client；对已配置 API Key 的 provider 预先建立连接。
+        """
+        self.get_http_client()
+        warmups: List[
+            Tuple[Union[httpx.AsyncClient, httpx.AsyncBaseTransport], str]
+        ] = []
+        if os.getenv("OPENAI_API_KEY"):
+            self.get_openai_client()
+            warmups.append((self._openai_http_client, OPENAI_BASE_URL))
+        if os.getenv("DASHSCOPE_API_KEY"):
+            self.get_qwen_client()
+            warmups.append((self._qwen_http_client, QWEN_BASE_URL))
+        if os.getenv("GEMINI_API_KEY"):
+            self.get_gemini_client()
+            warmups.append((self._gemini_transport, GEMINI_BASE_URL))
+
+        if PROVIDER_WARMUP:
+            for target, url in warmups:
+                try:
+                    await _open_connection(target, url)
+                except httpx.HTTPError as e:
+                    logger.warning(f"Provider warmup failed for {url}: {e}")
+        logger.info("Provider client registry started")
+
+    async def shutdown(self) -> None:
+        """
+        关闭所有共享 client 及其连接池。
+        """
+        if self._openai_client is not None:
+            await self._openai_client.close()
+        if self._qwen_client is not None:
+            await self._qwen_client.close()
+        if self._gemini_client is not None:
+            await self._gemini_client.aio.aclose()
+            self._gemini_client.close()
+        if self._http_client is not None:
+            await self._http_client.aclose()
+
+        self._http_client = None
+        self._openai_client = None
+        self._openai_http_client = None
+        self._qwen_client = None
+        self._qwen_http_client = None
+        self._gemini_client = None
+        self._gemini_transport = None
+        logger.info("Provider client registry closed")
+
+
+# 进程级单例
+provider_clients = ProviderClientRegistry()
@@ -3,16 +3,44 @@
 """
 
 import os
-import yaml
 import json
-from google import genai
+from typing import AsyncIterator
 from loguru import logger
 
-from app.configs.settings import SYSTEM_PROMPTS_DIR
 from app.core.exceptions import LLMProviderError
+from app.services.llms.client_registry import provider_clients
+from app.services.llms.prompt_store import prompt_store
 from app.schemas.rewrite_schema import LLMResponse
 
 
+def _build_contents(instruction: str, source: str) -> str:
+    """
+    加载system prompt并校验API Key，合并为Gemini的contents。
+    """
+    # 从内存缓存中获取system prompt（yaml文件修改后自动重新加载）
+    try:
+        system_prompt = prompt_store.get("gemini")
+    except Exception as e:
+        logger.error(f"Failed to load system prompt: {e}")
+        raise LLMProviderError(
+            f"Configuration error: Failed to load system prompt: {str(e)}"
+        )
+
+    if not os.getenv("GEMINI_API_KEY"):
+        logger.error("GEMINI_API_KEY not found in environment")
+        raise LLMProviderError("Server configuration error: Missing Gemini API Key")
+
+    # 合并system prompt，instruction，和source
+    return f"{system_prompt}\n\nInstruction: {instruction}\n\nSource: {source}"
+
+
+# 结构化输出配置
+_GENERATE_CONFIG = {
+    "response_mime_type": "application/json",
+    "response_json_schema": LLMResponse.model_json_schema(),
+}
+
+
 async def get_rewriting_result(
     instruction: str,
     source: str,
@@ -31,41 +59,17 @@ async def get_rewriting_result(
     """
     try:
         logger.info(f"Calling Gemini API (model: {model})")
+        combined_content = _build_contents(instruction, source)
 
-        # 从yaml文件中加载system prompt
-        prompt_file = os.path.join(SYSTEM_PROMPTS_DIR, "gemini_system_prompt.yaml")
-
-        try:
-            with open(prompt_file, "r", encoding="utf-8") as f:
-                prompt_data = yaml.safe_load(f)
-                system_prompt = prompt_data.get("system_prompt", "")
-        except Exception as e:
-            logger.error(f"Failed to load system prompt: {e}")
-            raise LLMProviderError(
-                f"Configuration error: Failed to load system prompt: {str(e)}"
-            )
-
-        if not os.getenv("GEMINI_API_KEY"):
-            logger.error("GEMINI_API_KEY not found in environment")
-            raise LLMProviderError("Server configuration error: Missing Gemini API Key")
-
-        # 初始化Gemini client，此处会自动获取环境变量中的“GEMINI_API_KEY”
-        client = genai.Client()
-
-        # 合并system prompt，instruction，和source
-        combined_content = (
-            f"{system_prompt}\n\nInstruction: {instruction}\n\nSource: {source}"
-        )
+        # 获取进程级共享的Gemini client，此处会自动获取环境变量中的“GEMINI_API_KEY”
+        client = provider_clients.get_gemini_client()
 
-        # 通过models创建任务，获取response对象
+        # 通过aio.models创建异步任务，获取response对象，避免阻塞事件循环
         logger.debug("Sending request to Gemini...")
-        response = client.models.generate_content(
+        response = await client.aio.models.generate_content(
             model=model,
             contents=combined_content,
-            config={
-                "response_mime_type": "application/json",
-                "response_json_schema": LLMResponse.model_json_schema(),
-            },
+            config=_GENERATE_CONFIG,
         )
         logger.info("Gemini API request successful")
 
@@ -74,3 +78,39 @@ async def get_rewriting_result(
     except Exception as e:
         logger.exception("Gemini API call failed")
         raise LLMProviderError(f"Gemini API error: {str(e)}")
+
+
+async def stream_rewriting_result(
+    instruction: str,
+    source: str,
+    model: str = "gemini-2.5-flash",
+) -> AsyncIterator[str]:
+    """
+    以流式方式调用 Gemini API 洗稿。
+
+    Args:
+        instruction: 用户输入的洗稿方式或选择的洗稿风格预设
+        source: 原始文章
+        model: 模型选择，默认为gemini-2.5-flash
+
+    Yields:
+        str: 模型输出的JSON文本增量
+    """
+    try:
+        logger.info(f"Streaming Gemini API (model: {model})")
+        combined_content = _build_contents(instruction, source)
+        client = provider_clients.get_gemini_client()
+
+        stream = await client.aio.models.generate_content_stream(
+            model=model,
+            contents=combined_content,
+            config=_GENERATE_CONFIG,
+        )
+        async for chunk in stream:
+            if chunk.text:
+                yield chunk.text
+        logger.info("Gemini API stream finished")
+
+    except Exception as e:
+        logger.exception("Gemini API stream failed")
+        raise LLMProviderError(f"Gemini API error: {str(e)}")
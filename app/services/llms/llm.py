@@ -3,12 +3,11 @@
 """
 
 import os
-import requests
+from typing import Optional
 
 from app.configs.settings import OPENAI_BASE_URL, DEFAULT_MODEL
-
-
-from typing import Optional
+from app.services.llms.client_registry import provider_clients
+from app.services.tokens import token_counter
 
 
 async def call_openai(
@@ -24,26 +23,29 @@ async def call_openai(
         return "错误：未提供 OpenAI API Key（既没有界面输入，也没有环境变量 OPENAI_API_KEY）。"
 
     try:
-        # 使用requests库作为备用方案
         headers = {
             "Authorization": f"Bearer {key_to_use}",
             "Content-Type": "application/json",
         }
 
-        # 智能token计算（采用api/index.py的逻辑）
+        # 智能token计算：按模型对应的分词器计数（system prompt 的计数结果会被缓存）
         user_message = next(
             (msg["content"] for msg in messages if msg["role"] == "user"), ""
         )
-        text_length = len(user_message)
+        user_tokens = token_counter.count(user_message, model)
 
         # 目标生成长度：原文约110%，以保证不变短；保底1000
-        target_tokens = max(1000, int(text_length * 1.1))
+        target_tokens = max(1000, int(user_tokens * 1.1))
         # 经验上限：gpt-4o-mini 总窗口约 20000，生成上限≈16000
         model_total_window = 20000
         model_completion_cap = 16000
-        # 估算输入token（粗略按4字符≈1token），并为系统/提示保留额外预算
-        system_and_overhead_tokens = 300
-        approx_input_tokens = int(len(user_message) / 4) + system_and_overhead_tokens
+        # 输入token = 各条消息的 token 数 + 每条消息的格式开销
+        message_overhead_tokens = 4
+        approx_input_tokens = sum(
+            token_counter.count(msg.get("content") or "", model)
+            + message_overhead_tokens
+            for msg in messages
+        )
 
         # 可用生成空间 = 总窗口 - 输入 - 安全余量
         safety_margin = 500
@@ -71,8 +73,8 @@ async def call_openai(
                 f"请缩短输入或改用分段重写。"
             )
 
-        # 使用requests库发送请求
-        response = requests.post(
+        # 通过共享的 httpx 异步 client 发送请求，不阻塞事件循环
+        response = await provider_clients.get_http_client().post(
             f"{OPENAI_BASE_URL}/chat/completions",
             headers=headers,
             json=request_data,
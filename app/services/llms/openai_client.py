@@ -3,15 +3,51 @@
 """
 
 import os
-import yaml
-from openai import OpenAI
+from typing import AsyncIterator, Dict, List
 from loguru import logger
 
-from app.configs.settings import SYSTEM_PROMPTS_DIR
 from app.core.exceptions import LLMProviderError
+from app.services.llms.client_registry import provider_clients
+from app.services.llms.prompt_store import prompt_store
 from app.schemas.rewrite_schema import LLMResponse
 
 
+def _build_input(instruction: str, source: str) -> List[Dict[str, str]]:
+    """
+    加载system prompt并校验API Key，构造Responses API的input。
+    """
+    # 从内存缓存中获取system prompt（yaml文件修改后自动重新加载）
+    try:
+        system_prompt = prompt_store.get("openai")
+    except Exception as e:
+        logger.error(f"Failed to load system prompt: {e}")
+        raise LLMProviderError(
+            f"Configuration error: Failed to load system prompt: {str(e)}"
+        )
+
+    if not os.getenv("OPENAI_API_KEY"):
+        logger.error("OPENAI_API_KEY not found in environment")
+        raise LLMProviderError("Server configuration error: Missing OpenAI API Key")
+
+    return [
+        {
+            # system prompt
+            "role": "system",
+            "content": system_prompt,
+        },
+        {
+            # instruction
+            "role": "user",
+            "content": instruction,
+        },
+        {
+            # source
+            "role": "user",
+            "content": source,
+        },
+    ]
+
+
 async def get_rewriting_result(
     instruction: str,
     source: str,
@@ -30,50 +66,18 @@ async def get_rewriting_result(
     """
     try:
         logger.info(f"Calling OpenAI API (model: {model})")
+        input_messages = _build_input(instruction, source)
 
-        # 从yaml文件中加载system prompt
-        prompt_file = os.path.join(SYSTEM_PROMPTS_DIR, "openai_system_prompt.yaml")
-
-        try:
-            with open(prompt_file, "r", encoding="utf-8") as f:
-                prompt_data = yaml.safe_load(f)
-                system_prompt = prompt_data.get("system_prompt", "")
-        except Exception as e:
-            logger.error(f"Failed to load system prompt: {e}")
-            raise LLMProviderError(
-                f"Configuration error: Failed to load system prompt: {str(e)}"
-            )
-
-        if not os.getenv("OPENAI_API_KEY"):
-            logger.error("OPENAI_API_KEY not found in environment")
-            raise LLMProviderError("Server configuration error: Missing OpenAI API Key")
-
-        # 初始化OpenAI client，此处会自动获取环境变量中的“OPENAI_API_KEY”
-        client = OpenAI()
+        # 获取进程级共享的OpenAI异步client，避免每次请求重新建立连接
+        client = provider_clients.get_openai_client()
 
         # 通过Responses创建任务，获取response对象
         logger.debug("Sending request to OpenAI...")
 
-        response = client.responses.parse(
+        response = await client.responses.parse(
             model=model,
             text_format=LLMResponse,
-            input=[
-                {
-                    # system prompt
-                    "role": "system",
-                    "content": system_prompt,
-                },
-                {
-                    # instruction
-                    "role": "user",
-                    "content": instruction,
-                },
-                {
-                    # source
-                    "role": "user",
-                    "content": source,
-                },
-            ],
+            input=input_messages,
         )
         logger.info("OpenAI API request successful")
 
@@ -82,3 +86,39 @@ async def get_rewriting_result(
     except Exception as e:
         logger.exception("OpenAI API call failed")
         raise LLMProviderError(f"OpenAI API error: {str(e)}")
+
+
+async def stream_rewriting_result(
+    instruction: str,
+    source: str,
+    model: str = "gpt-5",
+) -> AsyncIterator[str]:
+    """
+    以流式方式调用 OpenAI Responses API 洗稿。
+
+    Args:
+        instruction: 用户输入的洗稿方式或选择的洗稿风格预设
+        source: 原始文章
+        model: 模型选择，默认为gpt-5
+
+    Yields:
+        str: 模型输出的JSON文本增量
+    """
+    try:
+        logger.info(f"Streaming OpenAI API (model: {model})")
+        input_messages = _build_input(instruction, source)
+        client = provider_clients.get_openai_client()
+
+        async with client.responses.stream(
+            model=model,
+            text_format=LLMResponse,
+            input=input_messages,
+        ) as stream:
+            async for event in stream:
+                if event.type == "response.output_text.delta" and event.delta:
+                    yield event.delta
+        logger.info("OpenAI API stream finished")
+
+    except Exception as e:
+        logger.exception("OpenAI API stream failed")
+        raise LLMProviderError(f"OpenAI API error: {str(e)}")
@@ -0,0 +1,117 @@
+"""
+System prompt 的内存缓存。
+
+每个 prompts/*_system_prompt.yaml 只在首次使用或文件 mtime 变化时重新解析，
+并提供 prompt 版本号（内容哈希），供其它缓存拼接到 key 中。
+"""
+
+import hashlib
+import os
+import threading
+from dataclasses import dataclass
+from typing import Dict
+
+import yaml
+from loguru import logger
+
+from app.configs.settings import SYSTEM_PROMPTS_DIR
+
+
+@dataclass(frozen=True)
+class PromptEntry:
+    """
+    已加载的 system prompt。
+    """
+
+    text: str
+    version: str
+    mtime_ns: int
+
+
+class PromptStore:
+    """
+    按 provider 名称（openai / gemini / qwen）缓存 system prompt。
+    """
+
+    def __init__(self, prompts_dir: str = SYSTEM_PROMPTS_DIR):
+        self.prompts_dir = prompts_dir
+        self._entries: Dict[str, PromptEntry] = {}
+        # 重新加载失败的文件 mtime：文件再次变化前不重复读取
+        self._failed_mtimes: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.prompts_dir, f"{name}_system_prompt.yaml")
+
+    def _load(self, name: str) -> PromptEntry:
+        path = self._path(name)
+        cached = self._entries.get(name)
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except OSError as e:
+            if cached is None:
+                raise
+            logger.error(
+                f"Failed to stat system prompt '{name}', keeping version "
+                f"{cached.version}: {e}"
+            )
+            return cached
+        if cached is not None and mtime_ns in (
+            cached.mtime_ns,
+            self._failed_mtimes.get(name),
+        ):
+            return cached
+
+        with self._lock:
+            cached = self._entries.get(name)
+            if cached is not None and mtime_ns in (
+                cached.mtime_ns,
+                self._failed_mtimes.get(name),
+            ):
+                return cached
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    prompt_data = yaml.safe_load(f)
+                text = prompt_data.get("system_prompt", "")
+            except Exception as e:
+                if cached is None:
+                    raise
+                # 热更新失败时继续使用旧版本，避免一次错误编辑影响线上请求
+                self._failed_mtimes[name] = mtime_ns
+                logger.error(
+                    f"Failed to reload system prompt '{name}', keeping version "
+                    f"{cached.version}: {e}"
+                )
+                return cached
+
+            version = hashlib.sha256(text.encode("utf-8")).hexdigest()[:12]
+            entry = PromptEntry(text=text, version=version, mtime_ns=mtime_ns)
+            self._entries[name] = entry
+            self._failed_mtimes.pop(name, None)
+            if cached is not None:
+                logger.info(
+                    f"System prompt '{name}' reloaded: {cached.version} -> {version}"
+                )
+            return entry
+
+    def get(self, name: str) -> str:
+        """
+        获取 system prompt 文本。
+
+        Args:
+            name: provider 名称，对应 prompts/{name}_system_prompt.yaml
+
+        Returns:
+            str: system prompt 文本
+        """
+        return self._load(name).text
+
+    def get_version(self, name: str) -> str:
+        """
+        获取 system prompt 的版本号（内容 sha256 前 12 位）。
+        """
+        return self._load(name).version
+
+
+# 进程级单例
+prompt_store = PromptStore()
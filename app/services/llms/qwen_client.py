@@ -1,14 +1,50 @@
 import os
-import yaml
 import json
-from openai import OpenAI
+from typing import AsyncIterator, Dict, List
 from loguru import logger
 
-from app.configs.settings import SYSTEM_PROMPTS_DIR
 from app.core.exceptions import LLMProviderError
+from app.services.llms.client_registry import provider_clients
+from app.services.llms.prompt_store import prompt_store
 from app.schemas.rewrite_schema import LLMResponse
 
 
+def _build_messages(instruction: str, source: str) -> List[Dict[str, str]]:
+    """
+    加载system prompt并校验API Key，构造Chat Completions的messages。
+    """
+    # 从内存缓存中获取system prompt（yaml文件修改后自动重新加载）
+    try:
+        system_prompt = prompt_store.get("qwen")
+    except Exception as e:
+        logger.error(f"Failed to load system prompt: {e}")
+        raise LLMProviderError(
+            f"Configuration error: Failed to load system prompt: {str(e)}"
+        )
+
+    if not os.getenv("DASHSCOPE_API_KEY"):
+        logger.error("DASHSCOPE_API_KEY not found in environment")
+        raise LLMProviderError("Server configuration error: Missing Qwen API Key")
+
+    return [
+        {
+            # system prompt
+            "role": "system",
+            "content": system_prompt,
+        },
+        {
+            # instruction
+            "role": "user",
+            "content": instruction,
+        },
+        {
+            # source
+            "role": "user",
+            "content": source,
+        },
+    ]
+
+
 async def get_rewriting_result(
     instruction: str,
     source: str,
@@ -27,50 +63,15 @@ async def get_rewriting_result(
     """
     try:
         logger.info(f"Calling Qwen API (model: {model})")
+        messages = _build_messages(instruction, source)
 
-        # 从yaml文件中加载system prompt
-        prompt_file = os.path.join(SYSTEM_PROMPTS_DIR, "qwen_system_prompt.yaml")
-
-        try:
-            with open(prompt_file, "r", encoding="utf-8") as f:
-                prompt_data = yaml.safe_load(f)
-                system_prompt = prompt_data.get("system_prompt", "")
-        except Exception as e:
-            logger.error(f"Failed to load system prompt: {e}")
-            raise LLMProviderError(
-                f"Configuration error: Failed to load system prompt: {str(e)}"
-            )
-
-        if not os.getenv("DASHSCOPE_API_KEY"):
-            logger.error("DASHSCOPE_API_KEY not found in environment")
-            raise LLMProviderError("Server configuration error: Missing Qwen API Key")
-
-        # 初始化OpenAI client，此处需要从环境变量中获取‘DASHSCOPE_API_KEY’，并设定Qwen新加坡baseURL
-        client = OpenAI(
-            api_key=os.getenv("DASHSCOPE_API_KEY"),
-            base_url="https://dashscope-intl.aliyuncs.com/compatible-mode/v1",
-        )
+        # 获取进程级共享的Qwen异步client（OpenAI兼容模式，新加坡baseURL）
+        client = provider_clients.get_qwen_client()
 
         logger.debug("Sending request to Qwen...")
-        completion = client.chat.completions.create(
+        completion = await client.chat.completions.create(
             model=model,
-            messages=[
-                {
-                    # system prompt
-                    "role": "system",
-                    "content": system_prompt,
-                },
-                {
-                    # instruction
-                    "role": "user",
-                    "content": instruction,
-                },
-                {
-                    # source
-                    "role": "user",
-                    "content": source,
-                },
-            ],
+            messages=messages,
             response_format={
                 "type": "json_object"
             },  # 指定返回JSON格式，确保输出结构化数据
@@ -88,12 +89,48 @@ async def get_rewriting_result(
             logger.error(f"Failed to parse Qwen JSON response: {e}")
             return LLMResponse(
                 rewritten=completion.choices[0].message.content, summary=""
-            )
+            ).mark_degraded()
 
     except Exception as e:
         logger.exception("Qwen API call failed")
         raise LLMProviderError(f"Qwen API error: {str(e)}")
 
+
+async def stream_rewriting_result(
+    instruction: str,
+    source: str,
+    model: str = "qwen-flash",
+) -> AsyncIterator[str]:
+    """
+    以流式方式调用 OpenAI Completions API (Qwen) 洗稿。
+
+    Args:
+        instruction: 用户输入的洗稿方式或选择的洗稿风格预设
+        source: 原始文章
+        model: 模型选择，默认为qwen-flash
+
+    Yields:
+        str: 模型输出的JSON文本增量（字段为 article / summary）
+    """
+    try:
+        logger.info(f"Streaming Qwen API (model: {model})")
+        messages = _build_messages(instruction, source)
+        client = provider_clients.get_qwen_client()
+
+        stream = await client.chat.completions.create(
+            model=model,
+            messages=messages,
+            response_format={"type": "json_object"},
+            stream=True,
+        )
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                yield delta
+        logger.info("Qwen API stream finished")
+
     except Exception as e:
-        logger.exception("Qwen API call failed")
+        logger.exception("Qwen API stream failed")
         raise LLMProviderError(f"Qwen API error: {str(e)}")
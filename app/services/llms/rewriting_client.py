@@ -2,11 +2,54 @@
 调用大模型的统一接口
 """
 
+import asyncio
+import hashlib
+import os
+import time
+from typing import AsyncIterator, Awaitable, Callable, List, Optional, Tuple
 from loguru import logger
+from app.configs.settings import (
+    CACHE_DIR,
+    REWRITE_CACHE_ENABLED,
+    REWRITE_CACHE_MAX_ENTRIES,
+    REWRITE_CACHE_TTL,
+    REWRITE_CACHE_DISK,
+    REWRITE_CACHE_MAX_DISK_ENTRIES,
+    REWRITE_CHUNK_THRESHOLD,
+    REWRITE_CHUNK_CHARS,
+    REWRITE_CHUNK_CONCURRENCY,
+    REWRITE_LENGTH_MODE,
+    REWRITE_SOURCE_MAX_TOKENS,
+)
 from app.schemas.rewrite_schema import LLMType, LLMResponse
+from app.services.cache import TieredCache
+from app.services.singleflight import SingleFlight
+from app.services.text_chunks import split_text
 from app.services.llms import openai_client, gemini_client, qwen_client
+from app.services.llms.prompt_store import prompt_store
 from app.core.exceptions import LLMProviderError
 
+# 各模型对应的 system prompt 名称
+_PROMPT_NAMES = {
+    LLMType.OPENAI: "openai",
+    LLMType.GEMINI: "gemini",
+    LLMType.QWEN: "qwen",
+}
+
+# 洗稿结果缓存
+rewrite_cache = TieredCache(
+    name="rewrite",
+    max_entries=REWRITE_CACHE_MAX_ENTRIES,
+    ttl=REWRITE_CACHE_TTL,
+    sqlite_path=(
+        os.path.join(CACHE_DIR, "rewrite_cache.sqlite3") if REWRITE_CACHE_DISK else None
+    ),
+    max_disk_entries=REWRITE_CACHE_MAX_DISK_ENTRIES,
+)
+
+# 合并相同 key 的并发洗稿请求
+rewrite_flight = SingleFlight("rewrite")
+
 
 async def get_rewriting_result(
     llm_type: LLMType,
@@ -58,3 +101,282 @@ async def get_rewriting_result(
     except Exception as e:
         logger.exception(f"Error in rewriting client using {llm_type.name}")
         raise LLMProviderError(f"Unexpected error during rewriting: {str(e)}")
+
+
+# 分段改写时附带的上一段原文结尾长度，帮助模型衔接上下文
+_CHUNK_CONTEXT_CHARS = 200
+
+# 合并各段摘要（reduce）时的指令
+_SUMMARY_REDUCE_INSTRUCTION = (
+    "下面是同一篇长文各部分的摘要（按原文顺序排列）。"
+    "请把它们合并为一段概括全文的摘要，放在 summary 字段；rewritten 字段可留空。"
+)
+
+
+def _chunk_instruction(instruction: str, index: int, total: int, previous: str) -> str:
+    """
+    各段共享的风格指令：原始洗稿要求 + 段落位置说明 + 上一段原文结尾（仅供衔接）。
+    """
+    parts = [
+        instruction,
+        f"\n\n【分段说明】这是同一篇长文的第 {index + 1}/{total} 部分，各部分会按顺序拼接成完整文章。"
+        "请只改写本部分内容，保持与全文一致的风格、人称与术语；"
+        + ("不要另写开头导语；" if index > 0 else "")
+        + ("不要另写结尾总结；" if index < total - 1 else "")
+        + "summary 只概括本部分。",
+    ]
+    if previous:
+        parts.append(f"\n【上一部分原文结尾（仅供衔接，不要改写）】\n{previous}")
+    return "".join(parts)
+
+
+async def get_chunked_rewriting_result(
+    llm_type: LLMType,
+    instruction: str,
+    source: str,
+) -> LLMResponse:
+    """
+    分段并行洗稿：按段落/句子边界把长文切成约 REWRITE_CHUNK_CHARS 字符的若干段，
+    在 REWRITE_CHUNK_CONCURRENCY 并发上限内同时改写，再按原顺序拼接正文；
+    各段摘要再经一次模型调用合并为全文摘要（失败时退回逐行拼接各段摘要）。
+    改写阶段的耗时接近最慢的一段，而不是各段之和。
+    Args:
+        llm_type: 模型选择
+        instruction: 用户输入的洗稿方式或选择的洗稿风格预设
+        source: 原始文章
+    Returns:
+        LLMResponse: 拼接后的洗稿结果和摘要
+    """
+    chunks = [c.strip() for c in split_text(source, REWRITE_CHUNK_CHARS) if c.strip()]
+    if len(chunks) <= 1:
+        return await get_rewriting_result(
+            llm_type=llm_type, instruction=instruction, source=source
+        )
+
+    semaphore = asyncio.Semaphore(REWRITE_CHUNK_CONCURRENCY)
+    t0 = time.perf_counter()
+
+    async def rewrite_chunk(index: int) -> Tuple[LLMResponse, float]:
+        previous = chunks[index - 1][-_CHUNK_CONTEXT_CHARS:] if index > 0 else ""
+        async with semaphore:
+            t_start = time.perf_counter()
+            result = await get_rewriting_result(
+                llm_type=llm_type,
+                instruction=_chunk_instruction(
+                    instruction, index, len(chunks), previous
+                ),
+                source=chunks[index],
+            )
+            return result, (time.perf_counter() - t_start) * 1000
+
+    results = await asyncio.gather(*[rewrite_chunk(i) for i in range(len(chunks))])
+    summary, reduced = await _reduce_chunk_summaries(
+        llm_type, [r.summary.strip() for r, _ in results if r.summary.strip()]
+    )
+    logger.info(
+        f"Chunked rewrite done (provider: {llm_type.name}, chunks: {len(chunks)}, "
+        f"slowest_ms: {max(ms for _, ms in results):.1f}, "
+        f"total_ms: {(time.perf_counter() - t0) * 1000:.1f})"
+    )
+    result = LLMResponse(
+        rewritten="\n\n".join(r.rewritten.strip() for r, _ in results if r.rewritten),
+        summary=summary,
+    )
+    if not reduced or any(r.degraded for r, _ in results):
+        result.mark_degraded()
+    return result
+
+
+async def _reduce_chunk_summaries(
+    llm_type: LLMType, summaries: List[str]
+) -> Tuple[str, bool]:
+    """
+    把各段摘要合并为全文摘要；合并调用失败或无输出时按行拼接各段摘要。
+    Returns:
+        Tuple[str, bool]: 全文摘要，以及是否正常完成合并（退回拼接时为 False）
+    """
+    joined = "\n".join(summaries)
+    if len(summaries) <= 1:
+        return joined, True
+    try:
+        result = await get_rewriting_result(
+            llm_type=llm_type,
+            instruction=_SUMMARY_REDUCE_INSTRUCTION,
+            source=joined,
+        )
+    except LLMProviderError as e:
+        logger.warning(f"Chunk summary reduce failed, using joined summaries: {e}")
+        return joined, False
+    summary = (result.summary or result.rewritten or "").strip()
+    if not summary:
+        return joined, False
+    return summary, not result.degraded
+
+
+async def stream_rewriting_result(
+    llm_type: LLMType,
+    instruction: str,
+    source: str,
+) -> AsyncIterator[str]:
+    """
+    根据用户选择模型调用对应client的流式接口。
+    Args:
+        llm_type: 模型选择
+        instruction: 用户输入的洗稿方式或选择的洗稿风格预设
+        source: 原始文章
+    Yields:
+        str: 模型输出的JSON文本增量
+    """
+    model = llm_type.value
+    logger.info(
+        f"Processing streaming rewrite request with provider: {llm_type.name}, model: {model}"
+    )
+
+    if llm_type == LLMType.OPENAI:
+        stream = openai_client.stream_rewriting_result(
+            instruction=instruction, source=source, model=model
+        )
+    elif llm_type == LLMType.GEMINI:
+        stream = gemini_client.stream_rewriting_result(
+            instruction=instruction, source=source, model=model
+        )
+    elif llm_type == LLMType.QWEN:
+        stream = qwen_client.stream_rewriting_result(
+            instruction=instruction, source=source, model=model
+        )
+    else:
+        raise LLMProviderError(f"Unsupported LLM type: {llm_type.name}")
+
+    try:
+        async for delta in stream:
+            yield delta
+    except LLMProviderError:
+        raise
+    except Exception as e:
+        logger.exception(f"Error in streaming rewriting client using {llm_type.name}")
+        raise LLMProviderError(f"Unexpected error during rewriting: {str(e)}")
+
+
+def get_system_prompt(llm_type: LLMType) -> str:
+    """
+    返回对应模型当前使用的 system prompt（用于估算固定输入开销），读取失败时为空字符串。
+    """
+    try:
+        return prompt_store.get(_PROMPT_NAMES[llm_type])
+    except Exception:
+        return ""
+
+
+def _config_fingerprint() -> str:
+    """
+    影响洗稿结果的服务端配置：长文压缩方式与 token 预算、分段阈值与段长、摘要合并指令。
+    """
+    return "|".join(
+        [
+            REWRITE_LENGTH_MODE,
+            str(REWRITE_SOURCE_MAX_TOKENS),
+            str(REWRITE_CHUNK_THRESHOLD),
+            str(REWRITE_CHUNK_CHARS),
+            _SUMMARY_REDUCE_INSTRUCTION,
+        ]
+    )
+
+
+def build_cache_key(llm_type: LLMType, instruction: str, source: str) -> str:
+    """
+    结果缓存的 key：(llm_type, instruction, system prompt 版本, 配置指纹, sha256(source))。
+    system prompt 或长文压缩、分段配置修改后 key 随之变化，旧结果自然失效。
+    """
+    try:
+        prompt_version = prompt_store.get_version(_PROMPT_NAMES[llm_type])
+    except Exception:
+        prompt_version = "unknown"
+    source_hash = hashlib.sha256((source or "").encode("utf-8")).hexdigest()
+    raw_key = "\x1f".join(
+        [
+            llm_type.value,
+            instruction or "",
+            prompt_version,
+            _config_fingerprint(),
+            source_hash,
+        ]
+    )
+    return hashlib.sha256(raw_key.encode("utf-8")).hexdigest()
+
+
+async def get_cached_result(
+    llm_type: LLMType, instruction: str, source: str
+) -> Optional[LLMResponse]:
+    """
+    查询结果缓存，未命中或缓存关闭时返回 None。
+    """
+    if not REWRITE_CACHE_ENABLED:
+        return None
+    cached = await rewrite_cache.get(build_cache_key(llm_type, instruction, source))
+    if cached is None:
+        return None
+    logger.info(f"Rewrite cache hit (provider: {llm_type.name})")
+    return LLMResponse.model_validate(cached)
+
+
+async def set_cached_result(
+    llm_type: LLMType, instruction: str, source: str, result: LLMResponse
+) -> None:
+    """
+    写入结果缓存；降级结果不缓存，下次请求重新调用模型。
+    """
+    if not REWRITE_CACHE_ENABLED or result.degraded:
+        return
+    await rewrite_cache.set(
+        build_cache_key(llm_type, instruction, source), result.model_dump()
+    )
+
+
+async def get_rewriting_result_cached(
+    llm_type: LLMType,
+    instruction: str,
+    source: str,
+    prepare_source: Optional[Callable[[str], Awaitable[str]]] = None,
+) -> Tuple[LLMResponse, bool]:
+    """
+    带结果缓存的洗稿入口：命中缓存时不再调用模型；
+    相同 key 的并发请求只发起一次模型调用（single-flight）。
+    Args:
+        llm_type: 模型选择
+        instruction: 用户输入的洗稿方式或选择的洗稿风格预设
+        source: 原始文章
+        prepare_source: 调用模型前对原文的预处理（如长文压缩）；缓存仍按原文寻址，命中时不执行
+    Returns:
+        Tuple[LLMResponse, bool]: 洗稿结果，以及是否命中缓存
+    """
+    cache_key = build_cache_key(llm_type, instruction, source)
+    if REWRITE_CACHE_ENABLED:
+        cached = await rewrite_cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"Rewrite cache hit (provider: {llm_type.name})")
+            return LLMResponse.model_validate(cached), True
+
+    async def _call() -> LLMResponse:
+        llm_source = await prepare_source(source) if prepare_source else source
+        if 0 < REWRITE_CHUNK_THRESHOLD < len(llm_source):
+            # 超长原文分段并行改写
+            result = await get_chunked_rewriting_result(
+                llm_type=llm_type,
+                instruction=instruction,
+                source=llm_source,
+            )
+        else:
+            result = await get_rewriting_result(
+                llm_type=llm_type,
+                instruction=instruction,
+                source=llm_source,
+            )
+        if REWRITE_CACHE_ENABLED and not result.degraded:
+            await rewrite_cache.set(cache_key, result.model_dump())
+        elif result.degraded:
+            logger.warning(
+                f"Degraded rewrite result not cached (provider: {llm_type.name})"
+            )
+        return result
+
+    return await rewrite_flight.do(cache_key, _call), False
@@ -0,0 +1,189 @@
+"""
+增量解析模型流式输出的 JSON 对象。
+
+模型以 {"rewritten": "...", "summary": "..."} 的形式逐 token 输出，
+这里在 JSON 尚未完整时就按字段产出字符串值的增量，便于前端边生成边渲染。
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+# 解析状态
+_OUTSIDE = "outside"  # 顶层对象开始之前（可能有 ```json 等前缀）
+_KEY_SEEK = "key_seek"  # 等待下一个 key 或对象结束
+_KEY = "key"  # 正在读取 key
+_COLON = "colon"  # 等待冒号
+_VALUE_SEEK = "value_seek"  # 等待 value 开始
+_STRING = "string"  # 正在读取字符串 value
+_SKIP_NESTED = "skip_nested"  # 跳过嵌套对象/数组
+_SKIP_SCALAR = "skip_scalar"  # 跳过数字/布尔/null
+_DONE = "done"  # 顶层对象已结束
+
+_SIMPLE_ESCAPES = {
+    '"': '"',
+    "\\": "\\",
+    "/": "/",
+    "b": "\b",
+    "f": "\f",
+    "n": "\n",
+    "r": "\r",
+    "t": "\t",
+}
+
+
+class JSONFieldStreamParser:
+    """
+    按字段增量解析顶层 JSON 对象中的字符串值。
+
+    Args:
+        field_aliases: 原始字段名 -> 输出字段名，例如 Qwen 的 "article" 映射到 "rewritten"。
+            不在映射中的字段会被跳过。
+    """
+
+    def __init__(self, field_aliases: Dict[str, str]):
+        self.field_aliases = field_aliases
+        # 各输出字段已解析出的完整文本
+        self.values: Dict[str, str] = {name: "" for name in field_aliases.values()}
+        self._state = _OUTSIDE
+        self._key: List[str] = []
+        self._field: Optional[str] = None
+        self._escape: Optional[str] = None  # 进行中的转义序列（不含反斜杠）
+        self._high_surrogate: Optional[int] = None
+        self._nested_depth = 0
+        self._nested_in_string = False
+        self._nested_escape = False
+
+    @property
+    def done(self) -> bool:
+        return self._state == _DONE
+
+    def feed(self, chunk: str) -> List[Tuple[str, str]]:
+        """
+        输入一段模型输出，返回本段解析出的字段增量。
+
+        Args:
+            chunk: 模型输出的文本增量
+
+        Returns:
+            List[Tuple[str, str]]: [(输出字段名, 文本增量), ...]，同一字段的连续增量会被合并
+        """
+        deltas: List[Tuple[str, str]] = []
+        for ch in chunk or "":
+            text = self._step(ch)
+            if text and self._field is not None:
+                self.values[self._field] += text
+                if deltas and deltas[-1][0] == self._field:
+                    deltas[-1] = (self._field, deltas[-1][1] + text)
+                else:
+                    deltas.append((self._field, text))
+        return deltas
+
+    def _step(self, ch: str) -> str:
+        state = self._state
+        if state == _OUTSIDE:
+            if ch == "{":
+                self._state = _KEY_SEEK
+        elif state == _KEY_SEEK:
+            if ch == '"':
+                self._key = []
+                self._escape = None
+                self._state = _KEY
+            elif ch == "}":
+                self._state = _DONE
+        elif state == _KEY:
+            if self._escape is not None:
+                self._key.append(_SIMPLE_ESCAPES.get(ch, ch))
+                self._escape = None
+            elif ch == "\\":
+                self._escape = ""
+            elif ch == '"':
+                self._state = _COLON
+            else:
+                self._key.append(ch)
+        elif state == _COLON:
+            if ch == ":":
+                self._state = _VALUE_SEEK
+        elif state == _VALUE_SEEK:
+            if ch == '"':
+                self._field = self.field_aliases.get("".join(self._key))
+                self._escape = None
+                self._high_surrogate = None
+                self._state = _STRING
+            elif ch in "{[":
+                self._nested_depth = 1
+                self._nested_in_string = False
+                self._nested_escape = False
+                self._state = _SKIP_NESTED
+            elif not ch.isspace():
+                self._state = _SKIP_SCALAR
+        elif state == _STRING:
+            return self._step_string(ch)
+        elif state == _SKIP_NESTED:
+            self._step_nested(ch)
+        elif state == _SKIP_SCALAR:
+            if ch == ",":
+                self._state = _KEY_SEEK
+            elif ch == "}":
+                self._state = _DONE
+        return ""
+
+    def _step_string(self, ch: str) -> str:
+        if self._escape is not None:
+            if self._escape == "" and ch != "u":
+                self._escape = None
+                return self._flush_surrogate() + _SIMPLE_ESCAPES.get(ch, ch)
+            self._escape += ch
+            # \uXXXX：收集满 4 位十六进制后解码
+            if len(self._escape) < 5:
+                return ""
+            try:
+                code = int(self._escape[1:], 16)
+            except ValueError:
+                code = 0xFFFD
+            self._escape = None
+            return self._decode_code_unit(code)
+        if ch == "\\":
+            self._escape = ""
+            return ""
+        if ch == '"':
+            self._state = _KEY_SEEK
+            return self._flush_surrogate()
+        return self._flush_surrogate() + ch
+
+    def _decode_code_unit(self, code: int) -> str:
+        if 0xD800 <= code <= 0xDBFF:
+            prefix = self._flush_surrogate()
+            self._high_surrogate = code
+            return prefix
+        if 0xDC00 <= code <= 0xDFFF and self._high_surrogate is not None:
+            high = self._high_surrogate
+            self._high_surrogate = None
+            return chr(0x10000 + ((high - 0xD800) << 10) + (code - 0xDC00))
+        if 0xDC00 <= code <= 0xDFFF:
+            # 孤立的低位代理项同样无法编码为 UTF-8
+            return self._flush_surrogate() + "\ufffd"
+        return self._flush_surrogate() + chr(code)
+
+    def _flush_surrogate(self) -> str:
+        # 孤立的高位代理项无法组成合法字符，使用替换字符
+        if self._high_surrogate is None:
+            return ""
+        self._high_surrogate = None
+        return "\ufffd"
+
+    def _step_nested(self, ch: str) -> None:
+        if self._nested_in_string:
+            if self._nested_escape:
+                self._nested_escape = False
+            elif ch == "\\":
+                self._nested_escape = True
+            elif ch == '"':
+                self._nested_in_string = False
+            return
+        if ch == '"':
+            self._nested_in_string = True
+        elif ch in "{[":
+            self._nested_depth += 1
+        elif ch in "}]":
+            self._nested_depth -= 1
+            if self._nested_depth == 0:
+                self._state = _KEY_SEEK
@@ -1,10 +1,9 @@
 import os
 import logging
-import dashscope
 from app.core.exceptions import LLMProviderError
 
-# 设置 Dashscope API 的基础 URL
-dashscope.base_http_api_url = "https://dashscope-intl.aliyuncs.com/api/v1"
+# Dashscope API 的基础 URL（dashscope 在首次调用时才导入）
+DASHSCOPE_BASE_HTTP_API_URL = "https://dashscope-intl.aliyuncs.com/api/v1"
 
 # 配置日志记录器
 logger = logging.getLogger(__name__)
@@ -35,6 +34,10 @@ async def get_tts_result(
         logger.error("未在环境变量中找到 DASHSCOPE_API_KEY")
         raise LLMProviderError("Server configuration error: Missing Qwen API Key")
 
+    import dashscope
+
+    dashscope.base_http_api_url = DASHSCOPE_BASE_HTTP_API_URL
+
     try:
         # 记录请求开始日志
         logger.info(
@@ -0,0 +1,115 @@
+"""
+图片 OCR 服务。
+
+RapidOCR 引擎在每个提取进程中首次使用时才加载；本服务负责在事件循环侧调度：
+- 普通图片缩小到 OCR_MAX_WIDTH 后整张识别；
+- 长截图先切成重叠的分块，分块并行识别后按阅读顺序合并；
+- 同时进行的识别任务数不超过 OCR_CONCURRENCY，避免占满提取进程池。
+"""
+
+import asyncio
+import io
+import time
+from typing import Any, Dict, Optional, Tuple, Union
+
+from loguru import logger
+
+from app.configs.settings import (
+    OCR_CONCURRENCY,
+    OCR_MAX_WIDTH,
+    OCR_TALL_RATIO,
+    OCR_TILE_ASPECT,
+    OCR_TILE_OVERLAP,
+)
+from app.services.parsers import ocr_image, ocr_tile, split_image_tiles
+from app.services.workers import extractor_pool
+
+
+def _image_size(content: Union[bytes, str]) -> Tuple[int, int]:
+    """
+    只读取图片头获取尺寸，不解码像素。
+    """
+    from PIL import Image
+
+    source = io.BytesIO(content) if isinstance(content, bytes) else content
+    with Image.open(source) as image:
+        return image.size
+
+
+class OcrService:
+    """
+    在提取进程池上执行 OCR，并统计吞吐。
+    """
+
+    def __init__(self):
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.images = 0
+        self.tiles = 0
+        self.total_ms = 0.0
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(OCR_CONCURRENCY)
+        return self._semaphore
+
+    async def _run(self, fn: Any, *args: Any) -> Any:
+        async with self._get_semaphore():
+            return await extractor_pool.run(fn, *args)
+
+    async def recognize(self, content: Union[bytes, str]) -> str:
+        """
+        识别图片中的文字。
+
+        Args:
+            content: 图片字节或文件路径
+
+        Returns:
+            str: 按阅读顺序逐行拼接的文本
+        """
+        t_start = time.perf_counter()
+        width, height = _image_size(content)
+        if height <= width * OCR_TALL_RATIO:
+            text = await self._run(ocr_image, content, OCR_MAX_WIDTH)
+            tiles = 1
+        else:
+            tile_specs = await self._run(
+                split_image_tiles,
+                content,
+                OCR_MAX_WIDTH,
+                OCR_TILE_ASPECT,
+                OCR_TILE_OVERLAP,
+            )
+            results = await asyncio.gather(
+                *[self._run(ocr_tile, *spec) for spec in tile_specs]
+            )
+            text = "\n".join(line for lines in results for line in lines)
+            tiles = len(tile_specs)
+
+        elapsed_ms = (time.perf_counter() - t_start) * 1000
+        self.images += 1
+        self.tiles += tiles
+        self.total_ms += elapsed_ms
+        logger.info(
+            "[ocr] recognized | size={}x{} | tiles={} | chars={} | ms={:.1f}",
+            width,
+            height,
+            tiles,
+            len(text),
+            elapsed_ms,
+        )
+        return text
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        已识别图片数、分块数与平均耗时。
+        """
+        return {
+            "images": self.images,
+            "tiles": self.tiles,
+            "avg_ms": round(self.total_ms / self.images, 1) if self.images else 0.0,
+            "concurrency": OCR_CONCURRENCY,
+        }
+
+
+# 进程级单例
+ocr_service = OcrService()
@@ -0,0 +1,272 @@
+"""
+CPU 密集型的文档解析函数，在进程池的 worker 中执行。
+
+所有函数都是纯函数：输入字节/文本（大文件为临时文件路径），输出文本，便于跨进程传递。
+本模块只在函数内部导入重型依赖，保证 worker 进程启动足够轻量。
+"""
+
+import hashlib
+import io
+import os
+import time
+from typing import Any, BinaryIO, List, Optional, Tuple, Union
+
+# 每个 worker 进程内惰性初始化的 OCR 引擎
+_ocr_engine: Optional[Any] = None
+# 每个 worker 进程最近打开的 PDF：(来源标识, PdfReader)，同一文档的后续分批任务直接复用
+_pdf_reader: Optional[Tuple[str, Any]] = None
+
+
+def _open_source(source: Union[bytes, str]) -> Union[BinaryIO, str]:
+    """
+    字节包装为内存文件，路径原样返回（各解析库均可直接按路径读取）。
+    """
+    if isinstance(source, (bytes, bytearray)):
+        return io.BytesIO(source)
+    return source
+
+
+def parse_docx(content: Union[bytes, str]) -> str:
+    """
+    解析 DOCX 字节或文件，返回按段落拼接的文本。
+    """
+    import docx
+
+    doc = docx.Document(_open_source(content))
+    text_parts = []
+    for paragraph in doc.paragraphs:
+        if paragraph.text.strip():
+            text_parts.append(paragraph.text.strip())
+    return "\n".join(text_parts)
+
+
+def parse_pdf(content: Union[bytes, str]) -> str:
+    """
+    解析 PDF 字节或文件，返回按页拼接的文本。
+    """
+    import pypdf
+
+    pdf_reader = pypdf.PdfReader(_open_source(content))
+    text_parts = []
+    for page in pdf_reader.pages:
+        text = page.extract_text()
+        if text and text.strip():
+            text_parts.append(text.strip())
+    return "\n".join(text_parts)
+
+
+def _get_pdf_reader(content: Union[bytes, str]) -> Any:
+    """
+    打开 PDF 并在本进程内缓存，避免分批提取时每批都重新解析交叉引用表与页树。
+    """
+    global _pdf_reader
+    import pypdf
+
+    if isinstance(content, (bytes, bytearray)):
+        key = "sha1:" + hashlib.sha1(content).hexdigest()
+    else:
+        key = f"path:{content}:{os.stat(content).st_mtime_ns}"
+    if _pdf_reader is None or _pdf_reader[0] != key:
+        _pdf_reader = (key, pypdf.PdfReader(_open_source(content)))
+    return _pdf_reader[1]
+
+
+def pdf_page_count(content: Union[bytes, str]) -> int:
+    """
+    返回 PDF 的总页数（只解析交叉引用表，不提取文本）。
+    """
+    return len(_get_pdf_reader(content).pages)
+
+
+def _page_has_images(page: Any) -> bool:
+    """
+    页面资源中是否引用了图片 XObject。
+    """
+    try:
+        resources = page.get("/Resources")
+        xobjects = resources.get_object().get("/XObject") if resources else None
+        if not xobjects:
+            return False
+        return any(
+            obj.get_object().get("/Subtype") == "/Image"
+            for obj in xobjects.get_object().values()
+        )
+    except Exception:
+        return False
+
+
+def parse_pdf_pages(
+    content: Union[bytes, str], pages: List[int]
+) -> List[Tuple[int, str, float, bool]]:
+    """
+    提取 PDF 中指定页（从 0 开始）的文本。
+
+    Returns:
+        List[Tuple[int, str, float, bool]]: 每页的 (页序号, 文本, 耗时毫秒, 是否需要 OCR)；
+        没有文本层但包含图片的页（扫描件）标记为需要 OCR
+    """
+    pdf_reader = _get_pdf_reader(content)
+    results = []
+    for index in pages:
+        t_start = time.perf_counter()
+        page = pdf_reader.pages[index]
+        text = (page.extract_text() or "").strip()
+        needs_ocr = not text and _page_has_images(page)
+        results.append(
+            (index, text, (time.perf_counter() - t_start) * 1000, needs_ocr)
+        )
+    return results
+
+
+def ocr_pdf_page(content: Union[bytes, str], index: int) -> Tuple[int, str, float]:
+    """
+    对 PDF 中一页（从 0 开始）内嵌的图片逐张 OCR，按图片顺序拼接。
+
+    Returns:
+        Tuple[int, str, float]: (页序号, 文本, 耗时毫秒)
+    """
+    t_start = time.perf_counter()
+    page = _get_pdf_reader(content).pages[index]
+    texts = []
+    for image in page.images:
+        text = ocr_image(image.data)
+        if text.strip():
+            texts.append(text.strip())
+    return index, "\n".join(texts), (time.perf_counter() - t_start) * 1000
+
+
+def parse_html(html: str) -> str:
+    """
+    使用 readability 提取网页正文，再用 BeautifulSoup 去标签并清理空行。
+    """
+    from bs4 import BeautifulSoup
+    from readability import Document
+
+    summary = Document(html).summary()
+    soup = BeautifulSoup(summary, "html.parser")
+    text = soup.get_text()
+    lines = [line.strip() for line in text.split("\n") if line.strip()]
+    return "\n".join(lines)
+
+
+def _get_ocr_engine() -> Any:
+    global _ocr_engine
+    if _ocr_engine is None:
+        from rapidocr_onnxruntime import RapidOCR  # type: ignore
+
+        _ocr_engine = RapidOCR()
+    return _ocr_engine
+
+
+def _parse_ocr_result(result: Any) -> List[Tuple[float, str]]:
+    """
+    把 RapidOCR 的识别结果整理为 [(文本框中心纵坐标, 文本)]，保持引擎给出的阅读顺序。
+    """
+    lines: List[Tuple[float, str]] = []
+    for item in result or []:
+        # 兼容不同版本 RapidOCR 的返回：
+        # 1) [box, text, score]
+        # 2) [box, (text, score)]
+        text = ""
+        if isinstance(item, (list, tuple)):
+            if len(item) >= 3:
+                # [box, text, score]
+                text = str(item[1] or "")
+            elif len(item) == 2:
+                second = item[1]
+                if isinstance(second, (list, tuple)) and second:
+                    text = str(second[0] or "")
+                else:
+                    text = str(second or "")
+        else:
+            # 非预期结构，跳过
+            continue
+        if not text.strip():
+            continue
+        try:
+            center_y = sum(float(point[1]) for point in item[0]) / len(item[0])
+        except Exception:
+            center_y = 0.0
+        lines.append((center_y, text.strip()))
+    return lines
+
+
+def _downscale(image: Any, max_width: int) -> Any:
+    """
+    宽度超过 max_width 时按比例缩小；手机截图的原始分辨率远超识别所需，缩小后推理明显更快。
+    """
+    from PIL import Image
+
+    if max_width <= 0 or image.width <= max_width:
+        return image
+    height = max(1, round(image.height * max_width / image.width))
+    return image.resize((max_width, height), Image.LANCZOS)
+
+
+def _recognize(image: Any) -> List[Tuple[float, str]]:
+    import numpy as np
+
+    result, _ = _get_ocr_engine()(np.array(image))
+    return _parse_ocr_result(result)
+
+
+def ocr_image(content: Union[bytes, str], max_width: int = 0) -> str:
+    """
+    对图片字节或文件做 OCR，返回按行拼接的文本。
+
+    Args:
+        content: 图片字节或文件路径
+        max_width: 识别前把图片缩小到的最大宽度，0 表示不缩放
+    """
+    from PIL import Image
+
+    # 基础预处理：转 RGB，尽量消除模式差异
+    image = Image.open(_open_source(content)).convert("RGB")
+    image = _downscale(image, max_width)
+    return "\n".join(text for _, text in _recognize(image))
+
+
+def split_image_tiles(
+    content: Union[bytes, str],
+    max_width: int,
+    tile_aspect: float,
+    overlap: int,
+) -> List[Tuple[bytes, int, int, int]]:
+    """
+    缩小长图并按纵向切成相互重叠的分块，供多个 worker 并行识别。
+
+    每个分块负责 [own_top, own_bottom) 区间内的文字；上下各多截取 overlap 像素，
+    避免切线上的文字被截断。坐标均为缩小后的图片坐标。
+
+    Returns:
+        List[Tuple[bytes, int, int, int]]: 每块的 (PNG 字节, 分块顶部坐标, own_top, own_bottom)
+    """
+    from PIL import Image
+
+    image = _downscale(Image.open(_open_source(content)).convert("RGB"), max_width)
+    width, height = image.size
+    tile_height = max(1, int(width * tile_aspect))
+    tiles = []
+    for own_top in range(0, height, tile_height):
+        own_bottom = min(height, own_top + tile_height)
+        top = max(0, own_top - overlap)
+        bottom = min(height, own_bottom + overlap)
+        buffer = io.BytesIO()
+        image.crop((0, top, width, bottom)).save(buffer, format="PNG")
+        tiles.append((buffer.getvalue(), top, own_top, own_bottom))
+    return tiles
+
+
+def ocr_tile(content: bytes, top: int, own_top: int, own_bottom: int) -> List[str]:
+    """
+    识别一个分块，只保留中心落在 [own_top, own_bottom) 内的文本行，
+    重叠区域中的文字由负责该区域的分块输出，合并时不会重复。
+    """
+    from PIL import Image
+
+    image = Image.open(io.BytesIO(content)).convert("RGB")
+    return [
+        text
+        for center_y, text in _recognize(image)
+        if own_top <= top + center_y < own_bottom
+    ]
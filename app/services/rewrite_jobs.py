@@ -0,0 +1,406 @@
+"""
+异步洗稿任务：SQLite 任务表 + 进程内 worker。
+
+提交时任务写入 SQLite 并放入内存队列，REWRITE_JOB_WORKERS 个 worker 依次取出执行；
+上传文件在提交时落盘到任务目录，执行时重新打开。
+服务重启后，未完成（queued/running）的任务会重新排队；
+每次开始执行计一次尝试，超过 REWRITE_JOB_MAX_ATTEMPTS 次的任务不再执行，直接记为失败。
+已结束的任务保留 REWRITE_JOB_RETENTION 秒，在启动时及之后每隔 REWRITE_JOB_PRUNE_INTERVAL 秒清理。
+"""
+
+import asyncio
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from loguru import logger
+from starlette.datastructures import FormData, Headers, UploadFile
+
+from app.configs.settings import (
+    REWRITE_JOB_DB,
+    REWRITE_JOB_FILES_DIR,
+    REWRITE_JOB_MAX_ATTEMPTS,
+    REWRITE_JOB_MAX_QUEUED,
+    REWRITE_JOB_PRUNE_INTERVAL,
+    REWRITE_JOB_RETENTION,
+    REWRITE_JOB_WORKERS,
+)
+from app.core.exceptions import AppException, ServiceUnavailableError
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+# 任务执行函数：输入提交时保存的请求，返回 (结果, 各阶段耗时毫秒)
+JobHandler = Callable[
+    [Dict[str, Any]], Awaitable[Tuple[Dict[str, Any], Dict[str, float]]]
+]
+
+# 上传文件落盘时的块大小
+_COPY_CHUNK_SIZE = 1024 * 1024
+
+
+class RewriteJobStore:
+    """
+    基于 SQLite 的任务状态表，JSON 字段以文本存储。
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, status TEXT NOT NULL, request TEXT NOT NULL, "
+            "result TEXT, error TEXT, timings TEXT NOT NULL, "
+            "created_at REAL NOT NULL, updated_at REAL NOT NULL, "
+            "attempts INTEGER NOT NULL DEFAULT 0)"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        if "attempts" not in columns:
+            # 兼容没有 attempts 列的旧任务库
+            self._conn.execute(
+                "ALTER TABLE jobs ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0"
+            )
+        self._conn.commit()
+
+    def create(self, job_id: str, request: Dict[str, Any]) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, status, request, timings, created_at, updated_at) "
+                "VALUES (?, ?, ?, '{}', ?, ?)",
+                (job_id, JOB_QUEUED, json.dumps(request, ensure_ascii=False), now, now),
+            )
+            self._conn.commit()
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, status, request, result, error, timings, created_at, "
+                "updated_at, attempts FROM jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "job_id": row[0],
+            "status": row[1],
+            "request": json.loads(row[2]),
+            "result": json.loads(row[3]) if row[3] else None,
+            "error": json.loads(row[4]) if row[4] else None,
+            "timings": json.loads(row[5]),
+            "created_at": row[6],
+            "updated_at": row[7],
+            "attempts": row[8],
+        }
+
+    def claim(self, job_id: str, timings: Dict[str, float]) -> int:
+        """
+        标记任务开始执行并累加尝试次数，返回本次是第几次尝试。
+        """
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, timings = ?, attempts = attempts + 1, "
+                "updated_at = ? WHERE id = ?",
+                (JOB_RUNNING, json.dumps(timings), time.time(), job_id),
+            )
+            self._conn.commit()
+            row = self._conn.execute(
+                "SELECT attempts FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return row[0] if row else 0
+
+    def update(
+        self,
+        job_id: str,
+        status: str,
+        timings: Dict[str, float],
+        result: Optional[Dict[str, Any]] = None,
+        error: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, timings = ?, result = ?, error = ?, "
+                "updated_at = ? WHERE id = ?",
+                (
+                    status,
+                    json.dumps(timings),
+                    (
+                        json.dumps(result, ensure_ascii=False)
+                        if result is not None
+                        else None
+                    ),
+                    (
+                        json.dumps(error, ensure_ascii=False)
+                        if error is not None
+                        else None
+                    ),
+                    time.time(),
+                    job_id,
+                ),
+            )
+            self._conn.commit()
+
+    def unfinished(self) -> List[str]:
+        """
+        尚未完成的任务（包括上次退出时正在执行的任务），按提交顺序排列。
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id FROM jobs WHERE status IN (?, ?) ORDER BY created_at",
+                (JOB_QUEUED, JOB_RUNNING),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def prune(self, older_than: float) -> List[str]:
+        """
+        删除 older_than 之前已结束的任务，返回被删除的任务 ID。
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id FROM jobs WHERE status IN (?, ?) AND updated_at < ?",
+                (JOB_DONE, JOB_FAILED, older_than),
+            ).fetchall()
+            self._conn.executemany("DELETE FROM jobs WHERE id = ?", rows)
+            self._conn.commit()
+        return [row[0] for row in rows]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def job_files_dir(job_id: str) -> str:
+    return os.path.join(REWRITE_JOB_FILES_DIR, job_id)
+
+
+def _save_upload(upload: UploadFile, path: str) -> None:
+    upload.file.seek(0)
+    with open(path, "wb") as out:
+        shutil.copyfileobj(upload.file, out, _COPY_CHUNK_SIZE)
+
+
+async def save_uploads(job_id: str, form: FormData) -> Dict[str, Dict[str, Any]]:
+    """
+    把表单中的上传文件保存到任务目录，返回 {表单字段: {filename, path, content_type}}。
+    """
+    files: Dict[str, Dict[str, Any]] = {}
+    for index, (key, value) in enumerate(form.multi_items()):
+        if not isinstance(value, UploadFile):
+            continue
+        os.makedirs(job_files_dir(job_id), exist_ok=True)
+        path = os.path.join(job_files_dir(job_id), f"{index}.upload")
+        await asyncio.to_thread(_save_upload, value, path)
+        files[key] = {
+            "filename": value.filename,
+            "path": path,
+            "content_type": value.content_type,
+        }
+    return files
+
+
+def open_uploads(files: Dict[str, Dict[str, Any]]) -> FormData:
+    """
+    重新打开任务目录中的上传文件，组装成与原请求等价的 FormData（调用方负责关闭）。
+    """
+    items = []
+    for key, info in files.items():
+        items.append(
+            (
+                key,
+                UploadFile(
+                    file=open(info["path"], "rb"),
+                    size=os.path.getsize(info["path"]),
+                    filename=info["filename"],
+                    headers=Headers({"content-type": info.get("content_type") or ""}),
+                ),
+            )
+        )
+    return FormData(items)
+
+
+class RewriteJobQueue:
+    """
+    任务队列与 worker：最多 workers 个任务同时执行，最多 max_queued 个任务排队。
+    """
+
+    def __init__(
+        self,
+        db_path: str = REWRITE_JOB_DB,
+        workers: int = REWRITE_JOB_WORKERS,
+        max_queued: int = REWRITE_JOB_MAX_QUEUED,
+        max_attempts: int = REWRITE_JOB_MAX_ATTEMPTS,
+    ):
+        self.db_path = db_path
+        self.workers = max(1, workers)
+        self.max_queued = max_queued
+        self.max_attempts = max(1, max_attempts)
+        self._store: Optional[RewriteJobStore] = None
+        self._queue: Optional["asyncio.Queue[str]"] = None
+        self._tasks: List["asyncio.Task[None]"] = []
+        self._handler: Optional[JobHandler] = None
+        self._last_prune = 0.0
+        self.completed = 0
+        self.failed = 0
+        self.pruned = 0
+
+    @property
+    def store(self) -> RewriteJobStore:
+        if self._store is None:
+            self._store = RewriteJobStore(self.db_path)
+        return self._store
+
+    async def start(self, handler: JobHandler) -> None:
+        """
+        启动 worker，并把上次未完成的任务重新排队。
+        """
+        if self._tasks:
+            return
+        self._handler = handler
+        self._queue = asyncio.Queue()
+        await self._prune()
+        pending = await asyncio.to_thread(self.store.unfinished)
+        for job_id in pending:
+            self._queue.put_nowait(job_id)
+        if pending:
+            logger.info(f"[jobs] re-queued {len(pending)} unfinished rewrite jobs")
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        logger.info(f"[jobs] rewrite job workers started (workers: {self.workers})")
+
+    async def shutdown(self) -> None:
+        """
+        停止 worker；执行中的任务保持 running 状态，下次启动时重新执行。
+        """
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._store is not None:
+            self._store.close()
+            self._store = None
+
+    async def submit(self, job_id: str, request: Dict[str, Any]) -> None:
+        """
+        保存任务并排队。
+
+        Raises:
+            ServiceUnavailableError: worker 未启动或排队任务已达 max_queued
+        """
+        if self._queue is None or not self._tasks:
+            raise ServiceUnavailableError(
+                "Rewrite job workers are not running", details={"job_id": job_id}
+            )
+        if self._queue.qsize() >= self.max_queued:
+            raise ServiceUnavailableError(
+                "Too many rewrite jobs queued, please retry later",
+                details={"job_id": job_id, "max_queued": self.max_queued},
+            )
+        await asyncio.to_thread(self.store.create, job_id, request)
+        self._queue.put_nowait(job_id)
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return await asyncio.to_thread(self.store.get, job_id)
+
+    async def _prune(self) -> None:
+        """
+        删除超过保留时长的已结束任务及其暂存文件。
+        """
+        self._last_prune = time.time()
+        pruned = await asyncio.to_thread(
+            self.store.prune, self._last_prune - REWRITE_JOB_RETENTION
+        )
+        for job_id in pruned:
+            shutil.rmtree(job_files_dir(job_id), ignore_errors=True)
+        if pruned:
+            self.pruned += len(pruned)
+            logger.info(f"[jobs] pruned {len(pruned)} expired rewrite jobs")
+
+    async def _worker(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            except Exception:
+                logger.exception(f"[jobs] failed to update job state | job_id={job_id}")
+            finally:
+                self._queue.task_done()
+            if time.time() - self._last_prune >= REWRITE_JOB_PRUNE_INTERVAL:
+                try:
+                    await self._prune()
+                except Exception:
+                    logger.exception("[jobs] failed to prune expired rewrite jobs")
+
+    async def _run(self, job_id: str) -> None:
+        job = await asyncio.to_thread(self.store.get, job_id)
+        if job is None or job["status"] not in (JOB_QUEUED, JOB_RUNNING):
+            return
+        started = time.time()
+        timings = {"queue_ms": round((started - job["created_at"]) * 1000, 1)}
+        if job["attempts"] >= self.max_attempts:
+            # 之前每次执行都没能结束（进程崩溃或被重启），不再重试
+            error = {
+                "error": f"Rewrite job was interrupted {job['attempts']} times",
+                "code": "INTERNAL_ERROR",
+                "details": {"attempts": job["attempts"]},
+            }
+            await asyncio.to_thread(
+                self.store.update, job_id, JOB_FAILED, timings, None, error
+            )
+            self.failed += 1
+            logger.warning(
+                f"[jobs] rewrite job abandoned | job_id={job_id} | attempts={job['attempts']}"
+            )
+            shutil.rmtree(job_files_dir(job_id), ignore_errors=True)
+            return
+        attempt = await asyncio.to_thread(self.store.claim, job_id, timings)
+        logger.info(f"[jobs] rewrite job started | job_id={job_id} | attempt={attempt}")
+        try:
+            result, stage_timings = await self._handler(job["request"])
+        except Exception as e:
+            if isinstance(e, AppException):
+                error = {"error": e.message, "code": e.code, "details": e.details}
+            else:
+                logger.exception(f"[jobs] rewrite job crashed | job_id={job_id}")
+                error = {"error": str(e), "code": "INTERNAL_ERROR", "details": None}
+            timings["total_ms"] = round((time.time() - started) * 1000, 1)
+            await asyncio.to_thread(
+                self.store.update, job_id, JOB_FAILED, timings, None, error
+            )
+            self.failed += 1
+            logger.warning(
+                f"[jobs] rewrite job failed | job_id={job_id} | reason={error['error']}"
+            )
+        else:
+            timings.update({k: round(v, 1) for k, v in stage_timings.items()})
+            timings["total_ms"] = round((time.time() - started) * 1000, 1)
+            await asyncio.to_thread(
+                self.store.update, job_id, JOB_DONE, timings, result
+            )
+            self.completed += 1
+            logger.info(
+                f"[jobs] rewrite job done | job_id={job_id} | total_ms={timings['total_ms']}"
+            )
+        shutil.rmtree(job_files_dir(job_id), ignore_errors=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "max_queued": self.max_queued,
+            "max_attempts": self.max_attempts,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "completed": self.completed,
+            "failed": self.failed,
+            "pruned": self.pruned,
+        }
+
+
+# 进程级单例
+rewrite_job_queue = RewriteJobQueue()
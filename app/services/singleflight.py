@@ -0,0 +1,82 @@
+"""
+Single-flight：合并相同 key 的并发调用。
+
+同一 key 在执行期间再次被调用时，不会重复发起，而是等待同一个进行中的任务。
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, TypeVar
+
+from loguru import logger
+
+T = TypeVar("T")
+
+
+class _Call:
+    """
+    一次进行中的调用及其等待者数量。
+    """
+
+    def __init__(self, task: "asyncio.Task[Any]"):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    按 key 合并并发调用。
+
+    取消语义：单个等待者被取消（如客户端断开）只影响它自己，共享任务继续为其它等待者执行；
+    只有最后一个等待者也被取消时，才会取消共享任务。
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[str, _Call] = {}
+        self.started = 0
+        self.coalesced = 0
+
+    def _forget(self, key: str, call: _Call, *_: Any) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        执行 fn，若相同 key 已在执行中则等待其结果。
+
+        Args:
+            key: 合并调用的 key
+            fn: 无参协程函数，仅在没有进行中的调用时执行
+
+        Returns:
+            fn 的返回值（异常同样会传递给所有等待者）
+        """
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(asyncio.ensure_future(fn()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _, c=call: self._forget(key, c))
+            self.started += 1
+        else:
+            self.coalesced += 1
+            logger.info(f"[singleflight:{self.name}] joined in-flight call")
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        except asyncio.CancelledError:
+            if not call.task.done() and call.waiters == 1:
+                # 最后一个等待者离开：不再需要结果，取消共享任务并让后续调用重新发起
+                self._forget(key, call)
+                call.task.cancel()
+            raise
+        finally:
+            call.waiters -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "started": self.started,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._calls),
+        }
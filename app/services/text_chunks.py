@@ -0,0 +1,69 @@
+"""
+长文本分块：依次按空行（段落）、换行、句末标点切分，中英文通用。
+
+切分点保留在前一块的末尾，所有分块按顺序拼接后与原文完全一致。
+"""
+
+import re
+from typing import List
+
+# 由粗到细的切分层级：段落 → 行 → 句子
+_BOUNDARIES = (
+    re.compile(r"\n[ \t]*\n\s*"),
+    re.compile(r"\n"),
+    # 中文句末标点（可跟引号/括号）；英文句号等后需有空白，避免切开小数与缩写中的点
+    re.compile(r"[。！？；…]+[”’」』\"')）]*\s*|[.!?;]+[\"')\]]*\s+"),
+)
+
+
+def _split_at(text: str, pattern: "re.Pattern[str]") -> List[str]:
+    pieces: List[str] = []
+    start = 0
+    for match in pattern.finditer(text):
+        if match.end() > start:
+            pieces.append(text[start : match.end()])
+            start = match.end()
+    if start < len(text):
+        pieces.append(text[start:])
+    return pieces
+
+
+def _split_units(text: str, max_chars: int, level: int = 0) -> List[str]:
+    """
+    把文本切成不超过 max_chars 的最小单元：优先使用粗粒度边界，仍过长时再用更细的边界，
+    没有可用边界时按长度硬切。
+    """
+    if len(text) <= max_chars:
+        return [text]
+    if level >= len(_BOUNDARIES):
+        return [text[i : i + max_chars] for i in range(0, len(text), max_chars)]
+    units: List[str] = []
+    for piece in _split_at(text, _BOUNDARIES[level]):
+        units.extend(_split_units(piece, max_chars, level + 1))
+    return units
+
+
+def split_text(text: str, max_chars: int) -> List[str]:
+    """
+    将文本切分为若干块，每块不超过 max_chars 个字符，并尽量在段落/句子边界处断开。
+
+    Args:
+        text: 原文
+        max_chars: 每块的字符上限
+
+    Returns:
+        List[str]: 按原顺序排列的分块；"".join(分块) == text
+    """
+    if not text:
+        return []
+    max_chars = max(1, max_chars)
+    chunks: List[str] = []
+    current = ""
+    for unit in _split_units(text, max_chars):
+        if current and len(current) + len(unit) > max_chars:
+            chunks.append(current)
+            current = ""
+        current += unit
+    if current:
+        chunks.append(current)
+    return chunks
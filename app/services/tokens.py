@@ -0,0 +1,332 @@
+"""
+本地 token 估算服务：按 provider 选择分词器配置，完全离线运行。
+
+- openai：tiktoken 的 o200k_base 词表
+- qwen：HF tokenizers 格式的 tokenizer.json
+- gemini：没有可离线使用的官方分词器，按字符类别的经验系数估算
+
+词表文件只从 cache_dir（默认 TOKENIZER_CACHE_DIR）读取，请求过程中不会联网下载；
+词表缺失或依赖未安装时回退到经验系数估算（中文按字计、其余按约 4 字符 1 token）。
+部署时可执行 `python -m app.services.tokens` 预先下载词表。
+
+system prompt 等重复出现的短文本的计数结果会被缓存（按文本的 sha256 寻址，不保留原文）。
+"""
+
+import base64
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+from loguru import logger
+
+from app.configs.settings import (
+    TOKENIZER_CACHE_DIR,
+    TOKENIZER_DEFAULT_PROFILE,
+    TOKEN_MEMO_MAX_CHARS,
+    TOKEN_MEMO_SIZE,
+)
+
+_TIKTOKEN_URLS = {
+    "o200k_base": "https://openaipublic.blob.core.windows.net/encodings/o200k_base.tiktoken",
+    "cl100k_base": "https://openaipublic.blob.core.windows.net/encodings/cl100k_base.tiktoken",
+}
+# tiktoken 编码的切词正则与特殊 token，与 tiktoken_ext.openai_public 中的定义一致
+_TIKTOKEN_SPECS = {
+    "o200k_base": {
+        "pat_str": "|".join(
+            [
+                r"""[^\r\n\p{L}\p{N}]?[\p{Lu}\p{Lt}\p{Lm}\p{Lo}\p{M}]*[\p{Ll}\p{Lm}\p{Lo}\p{M}]+(?i:'s|'t|'re|'ve|'m|'ll|'d)?""",
+                r"""[^\r\n\p{L}\p{N}]?[\p{Lu}\p{Lt}\p{Lm}\p{Lo}\p{M}]+[\p{Ll}\p{Lm}\p{Lo}\p{M}]*(?i:'s|'t|'re|'ve|'m|'ll|'d)?""",
+                r"""\p{N}{1,3}""",
+                r""" ?[^\s\p{L}\p{N}]+[\r\n/]*""",
+                r"""\s*[\r\n]+""",
+                r"""\s+(?!\S)""",
+                r"""\s+""",
+            ]
+        ),
+        "special_tokens": {"<|endoftext|>": 199999, "<|endofprompt|>": 200018},
+    },
+    "cl100k_base": {
+        "pat_str": r"""'(?i:[sdmt]|ll|ve|re)|[^\r\n\p{L}\p{N}]?+\p{L}++|\p{N}{1,3}+| ?[^\s\p{L}\p{N}]++[\r\n]*+|\s++$|\s*[\r\n]|\s+(?!\S)|\s""",
+        "special_tokens": {
+            "<|endoftext|>": 100257,
+            "<|fim_prefix|>": 100258,
+            "<|fim_middle|>": 100259,
+            "<|fim_suffix|>": 100260,
+            "<|endofprompt|>": 100276,
+        },
+    },
+}
+_HF_TOKENIZER_URLS = {
+    "qwen/tokenizer.json": "https://huggingface.co/Qwen/Qwen2.5-7B-Instruct/resolve/main/tokenizer.json",
+}
+
+# 中日韩文字与全角标点：这些字符在各家分词器中大约 1 字 ≈ 1 token 或略少
+_CJK_RE = re.compile(
+    r"[\u3000-\u303f\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff"
+    r"\uac00-\ud7af\uf900-\ufaff\uff00-\uffef]"
+)
+
+
+@dataclass(frozen=True)
+class TokenizerProfile:
+    """
+    单个 provider 的分词器与上下文限制。
+    """
+
+    name: str
+    # 经验系数：每个中日韩字符的 token 数、其余字符每 token 的字符数
+    cjk_tokens_per_char: float
+    chars_per_token: float
+    context_window: int
+    max_output_tokens: int
+    tiktoken_encoding: Optional[str] = None
+    # 相对 TOKENIZER_CACHE_DIR 的 tokenizer.json 路径
+    hf_tokenizer_file: Optional[str] = None
+
+
+PROFILES: Dict[str, TokenizerProfile] = {
+    "openai": TokenizerProfile(
+        name="openai",
+        cjk_tokens_per_char=0.8,
+        chars_per_token=4.0,
+        context_window=400000,
+        max_output_tokens=128000,
+        tiktoken_encoding="o200k_base",
+    ),
+    "gemini": TokenizerProfile(
+        name="gemini",
+        cjk_tokens_per_char=1.0,
+        chars_per_token=4.0,
+        context_window=1048576,
+        max_output_tokens=65536,
+    ),
+    "qwen": TokenizerProfile(
+        name="qwen",
+        cjk_tokens_per_char=0.7,
+        chars_per_token=4.0,
+        context_window=1000000,
+        max_output_tokens=32768,
+        hf_tokenizer_file="qwen/tokenizer.json",
+    ),
+}
+
+
+def _tiktoken_vocab_path(cache_dir: str, encoding: str) -> str:
+    return os.path.join(cache_dir, "tiktoken", f"{encoding}.tiktoken")
+
+
+def _load_tiktoken_encoding(path: str, encoding: str) -> Any:
+    """
+    从本地 .tiktoken 词表文件（每行 “base64(token) rank”）构建编码，不经过 tiktoken 的下载缓存。
+    """
+    import tiktoken
+
+    with open(path, "rb") as f:
+        ranks = {
+            base64.b64decode(token): int(rank)
+            for token, rank in (line.split() for line in f if line.strip())
+        }
+    return tiktoken.Encoding(
+        name=encoding, mergeable_ranks=ranks, **_TIKTOKEN_SPECS[encoding]
+    )
+
+
+# 截断时按比例估算截断点的最多次数，之后在剩余区间内二分
+_TRUNCATE_PROPORTIONAL_STEPS = 4
+
+
+class TokenCounter:
+    """
+    按 provider 计数与截断文本，分词器在首次使用时加载。
+    """
+
+    def __init__(self, cache_dir: str = TOKENIZER_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self._encoders: Dict[str, Optional[Callable[[str], int]]] = {}
+        self._backends: Dict[str, str] = {}
+        self._memo: "OrderedDict[Any, int]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.memo_hits = 0
+        self.memo_misses = 0
+
+    def profile(self, provider: Any = None) -> TokenizerProfile:
+        """
+        根据 LLMType、模型名或 provider 名选择分词器配置。
+        """
+        value = str(getattr(provider, "value", provider) or "").lower()
+        for name in PROFILES:
+            if value.startswith(name):
+                return PROFILES[name]
+        if value.startswith(("gpt", "o1", "o3", "o4")):
+            return PROFILES["openai"]
+        return PROFILES[TOKENIZER_DEFAULT_PROFILE]
+
+    def _load_encoder(
+        self, profile: TokenizerProfile
+    ) -> Optional[Callable[[str], int]]:
+        if profile.tiktoken_encoding:
+            path = _tiktoken_vocab_path(self.cache_dir, profile.tiktoken_encoding)
+            if os.path.exists(path):
+                try:
+                    encoding = _load_tiktoken_encoding(
+                        path, profile.tiktoken_encoding
+                    )
+                    self._backends[profile.name] = (
+                        f"tiktoken:{profile.tiktoken_encoding}"
+                    )
+                    return lambda text: len(
+                        encoding.encode(text, disallowed_special=())
+                    )
+                except Exception as e:
+                    logger.warning(f"[tokens] failed to load tiktoken vocab: {e}")
+        if profile.hf_tokenizer_file:
+            path = os.path.join(self.cache_dir, profile.hf_tokenizer_file)
+            if os.path.exists(path):
+                try:
+                    from tokenizers import Tokenizer  # type: ignore
+
+                    tokenizer = Tokenizer.from_file(path)
+                    self._backends[profile.name] = "hf:" + profile.hf_tokenizer_file
+                    return lambda text: len(
+                        tokenizer.encode(text, add_special_tokens=False).ids
+                    )
+                except Exception as e:
+                    logger.warning(f"[tokens] failed to load tokenizer.json: {e}")
+        self._backends[profile.name] = "heuristic"
+        logger.info(f"[tokens] using heuristic token estimation for {profile.name}")
+        return None
+
+    def _encoder(self, profile: TokenizerProfile) -> Optional[Callable[[str], int]]:
+        if profile.name not in self._encoders:
+            with self._lock:
+                if profile.name not in self._encoders:
+                    self._encoders[profile.name] = self._load_encoder(profile)
+        return self._encoders[profile.name]
+
+    @staticmethod
+    def _estimate(profile: TokenizerProfile, text: str) -> int:
+        cjk = len(_CJK_RE.findall(text))
+        other = len(text) - cjk
+        return int(
+            cjk * profile.cjk_tokens_per_char
+            + (other + profile.chars_per_token - 1) // profile.chars_per_token
+        )
+
+    def _count(self, profile: TokenizerProfile, text: str) -> int:
+        encoder = self._encoder(profile)
+        return encoder(text) if encoder is not None else self._estimate(profile, text)
+
+    def count(self, text: str, provider: Any = None) -> int:
+        """
+        估算文本在指定 provider 下的 token 数。
+
+        Args:
+            text: 文本
+            provider: LLMType、模型名或 provider 名，缺省使用 TOKENIZER_DEFAULT_PROFILE
+
+        Returns:
+            int: token 数
+        """
+        if not text:
+            return 0
+        profile = self.profile(provider)
+        if len(text) > TOKEN_MEMO_MAX_CHARS:
+            return self._count(profile, text)
+        key = (profile.name, hashlib.sha256(text.encode("utf-8")).digest())
+        with self._lock:
+            if key in self._memo:
+                self._memo.move_to_end(key)
+                self.memo_hits += 1
+                return self._memo[key]
+            self.memo_misses += 1
+        tokens = self._count(profile, text)
+        with self._lock:
+            self._memo[key] = tokens
+            if len(self._memo) > TOKEN_MEMO_SIZE:
+                self._memo.popitem(last=False)
+        return tokens
+
+    def truncate(self, text: str, max_tokens: int, provider: Any = None) -> str:
+        """
+        截取不超过 max_tokens 的最长前缀。
+
+        先按 token 密度估算截断点并做几次比例修正，再在剩余的小区间内二分，
+        只需对前缀做少量几次分词。长文本分词耗时较长，异步代码中应放到线程中调用。
+        """
+        profile = self.profile(provider)
+        total = self._count(profile, text)
+        if total <= max_tokens:
+            return text
+        if max_tokens <= 0:
+            return ""
+        # low：已知不超限的最长前缀长度；high：结果长度的上界
+        low, high = 0, len(text) - 1
+        guess = len(text) * max_tokens // total
+        for _ in range(_TRUNCATE_PROPORTIONAL_STEPS):
+            guess = max(low + 1, min(high, guess))
+            tokens = self._count(profile, text[:guess])
+            if tokens <= max_tokens:
+                low = guess
+            else:
+                high = guess - 1
+            if low >= high:
+                return text[:low]
+            guess = guess * max_tokens // max(1, tokens)
+        while low < high:
+            mid = (low + high + 1) // 2
+            if self._count(profile, text[:mid]) <= max_tokens:
+                low = mid
+            else:
+                high = mid - 1
+        return text[:low]
+
+    def input_budget(self, provider: Any = None, *overhead: str) -> int:
+        """
+        可用于输入正文的 token 数：上下文窗口 - 最大输出 - 固定开销（system prompt、指令等）。
+        """
+        profile = self.profile(provider)
+        used = sum(self.count(text, provider) for text in overhead)
+        return max(0, profile.context_window - profile.max_output_tokens - used)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backends": dict(self._backends),
+            "memo_entries": len(self._memo),
+            "memo_hits": self.memo_hits,
+            "memo_misses": self.memo_misses,
+        }
+
+
+# 进程级单例
+token_counter = TokenCounter()
+
+
+def download_vocab(cache_dir: str = TOKENIZER_CACHE_DIR) -> None:
+    """
+    预先下载各 provider 的词表到 cache_dir（需联网，部署时执行一次）。
+    """
+    import httpx
+
+    downloads = {
+        _tiktoken_vocab_path(cache_dir, encoding): url
+        for encoding, url in _TIKTOKEN_URLS.items()
+    }
+    downloads.update(
+        {os.path.join(cache_dir, name): url for name, url in _HF_TOKENIZER_URLS.items()}
+    )
+    for path, url in downloads.items():
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        response = httpx.get(url, follow_redirects=True, timeout=60)
+        response.raise_for_status()
+        with open(path, "wb") as f:
+            f.write(response.content)
+        logger.info(f"[tokens] cached vocab {os.path.relpath(path, cache_dir)}")
+
+
+if __name__ == "__main__":
+    download_vocab()
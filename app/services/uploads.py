@@ -0,0 +1,162 @@
+"""
+上传文件的大小校验与落盘。
+
+multipart 表单由 SizeLimitedMultiPartParser 解析：边接收边按文件累计字节数，
+单个文件超过 UPLOAD_MAX_FILE_BYTES 时立即中止解析并返回 413，不再继续读取与落盘；
+请求体总量仍由 BodySizeLimitMiddleware 的 UPLOAD_MAX_REQUEST_BYTES 限制。
+
+解析时超过 1MB 的文件已写入匿名临时文件；
+提取时小文件直接以字节传给进程池，大文件复制到具名临时文件后只传路径，
+避免整份读入内存再经 pickle 复制到 worker 进程。
+"""
+
+import asyncio
+import os
+import shutil
+import tempfile
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Coroutine, List, Union
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+from loguru import logger
+from multipart.multipart import parse_options_header
+from starlette.datastructures import FormData, UploadFile
+from starlette.exceptions import HTTPException
+from starlette.formparsers import MultiPartException, MultiPartParser
+
+from app.configs.settings import UPLOAD_MAX_FILE_BYTES, UPLOAD_SPOOL_THRESHOLD
+from app.core.exceptions import PayloadTooLargeError
+
+# 复制到具名临时文件时的块大小
+_COPY_CHUNK_SIZE = 1024 * 1024
+
+
+class SizeLimitedMultiPartParser(MultiPartParser):
+    """
+    在解析过程中累计每个上传文件的字节数，超过 UPLOAD_MAX_FILE_BYTES 时立即中止。
+
+    Raises:
+        PayloadTooLargeError: 任一文件超过 UPLOAD_MAX_FILE_BYTES
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._current_file_bytes = 0
+        self._opened_files: List[UploadFile] = []
+
+    def on_headers_finished(self) -> None:
+        super().on_headers_finished()
+        self._current_file_bytes = 0
+        if self._current_part.file is not None:
+            self._opened_files.append(self._current_part.file)
+
+    def on_part_data(self, data: bytes, start: int, end: int) -> None:
+        upload = self._current_part.file
+        if upload is not None:
+            self._current_file_bytes += end - start
+            if self._current_file_bytes > UPLOAD_MAX_FILE_BYTES:
+                raise PayloadTooLargeError(
+                    f"File is too large: {upload.filename}",
+                    details={
+                        "field": self._current_part.field_name,
+                        "filename": upload.filename,
+                        "max_bytes": UPLOAD_MAX_FILE_BYTES,
+                    },
+                )
+        super().on_part_data(data, start, end)
+
+    async def parse(self) -> FormData:
+        try:
+            return await super().parse()
+        except PayloadTooLargeError:
+            for upload in self._opened_files:
+                upload.file.close()
+            raise
+
+
+class UploadLimitRequest(Request):
+    """
+    multipart 表单改用 SizeLimitedMultiPartParser 解析的 Request。
+    """
+
+    async def _get_form(self, **kwargs) -> FormData:
+        if self._form is None:
+            content_type, _ = parse_options_header(self.headers.get("Content-Type"))
+            if content_type == b"multipart/form-data":
+                parser = SizeLimitedMultiPartParser(
+                    self.headers, self.stream(), **kwargs
+                )
+                try:
+                    self._form = await parser.parse()
+                except MultiPartException as exc:
+                    raise HTTPException(status_code=400, detail=exc.message)
+        return await super()._get_form(**kwargs)
+
+
+class UploadLimitRoute(APIRoute):
+    """
+    使用 UploadLimitRequest 的路由类，供接收上传文件的 router 通过 route_class 指定。
+    """
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[None, None, Response]]:
+        handler = super().get_route_handler()
+
+        async def route_handler(request: Request) -> Response:
+            try:
+                return await handler(UploadLimitRequest(request.scope, request.receive))
+            except HTTPException as exc:
+                # FastAPI 把解析表单时的异常统一转成 400，这里还原为 413
+                if isinstance(exc.__cause__, PayloadTooLargeError):
+                    raise exc.__cause__
+                raise
+
+        return route_handler
+
+
+def _measure(upload: UploadFile) -> int:
+    position = upload.file.tell()
+    upload.file.seek(0, os.SEEK_END)
+    size = upload.file.tell()
+    upload.file.seek(position)
+    return size
+
+
+def _copy_to_named_file(upload: UploadFile) -> str:
+    upload.file.seek(0)
+    fd, path = tempfile.mkstemp(
+        prefix="upload_", suffix=os.path.splitext(upload.filename or "")[1]
+    )
+    try:
+        with os.fdopen(fd, "wb") as out:
+            shutil.copyfileobj(upload.file, out, _COPY_CHUNK_SIZE)
+    except BaseException:
+        os.unlink(path)
+        raise
+    return path
+
+
+@asynccontextmanager
+async def spooled_upload(upload: UploadFile) -> AsyncIterator[Union[bytes, str]]:
+    """
+    以适合交给进程池的形式提供上传文件内容。
+
+    Yields:
+        Union[bytes, str]: 小文件为字节；超过 UPLOAD_SPOOL_THRESHOLD 的文件为临时文件路径，
+        退出上下文后删除
+    """
+    size = upload.size if upload.size is not None else _measure(upload)
+    if size <= UPLOAD_SPOOL_THRESHOLD:
+        await upload.seek(0)
+        yield await upload.read()
+        return
+
+    path = await asyncio.to_thread(_copy_to_named_file, upload)
+    logger.debug(f"Upload spooled to disk: {upload.filename} ({size} bytes)")
+    try:
+        yield path
+    finally:
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
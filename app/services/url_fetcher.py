@@ -0,0 +1,295 @@
+"""
+网页抓取层：共享连接池 + 条件请求缓存 + 限长流式下载。
+
+缓存保存提取后的正文与验证头（ETag / Last-Modified）：
+- 在 URL_CACHE_TTL 内直接返回缓存，不发网络请求；
+- 过期后携带 If-None-Match / If-Modified-Since 重新验证，304 时跳过下载与 readability 解析。
+"""
+
+import codecs
+import os
+import re
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+from loguru import logger
+
+from app.configs.settings import (
+    CACHE_DIR,
+    URL_CACHE_MAX_ENTRIES,
+    URL_CACHE_TTL,
+    URL_CACHE_RETENTION,
+    URL_CACHE_DISK,
+    URL_FETCH_TIMEOUT,
+    URL_FETCH_MAX_BYTES,
+    URL_FETCH_MAX_CONNECTIONS,
+)
+from app.core.exceptions import ContentExtractionError
+from app.services.cache import TieredCache
+from app.services.parsers import parse_html
+from app.services.workers import extractor_pool
+
+_DEFAULT_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+    ),
+    "Accept": "text/html,application/xhtml+xml;q=0.9,*/*;q=0.8",
+}
+
+# 允许抓取的网页类型
+_HTML_MIME_TYPES = {"text/html", "application/xhtml+xml", "application/xml"}
+# 用于 meta 标签与内容探测的前缀字节数
+_SNIFF_BYTES = 4096
+_META_CHARSET_RE = re.compile(
+    rb"""<meta[^>]+charset\s*=\s*["']?\s*([A-Za-z0-9_\-:.]+)""", re.IGNORECASE
+)
+_BOMS = (
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+
+def _is_html_content_type(content_type: str) -> bool:
+    """
+    只接受网页/文本类型；缺少 Content-Type 时放行，由后续解析判断。
+    """
+    mime = content_type.split(";")[0].strip().lower()
+    return not mime or mime in _HTML_MIME_TYPES or mime.startswith("text/")
+
+
+def _normalize_charset(charset: Optional[str]) -> Optional[str]:
+    if not charset:
+        return None
+    charset = charset.strip().strip("\"'").lower()
+    # 常见的中文网页会把 gb2312 当作 gbk/gb18030 使用，统一按超集解码
+    if charset in ("gb2312", "gbk", "x-gbk"):
+        charset = "gb18030"
+    try:
+        return codecs.lookup(charset).name
+    except LookupError:
+        return None
+
+
+def _charset_from_content_type(content_type: str) -> Optional[str]:
+    for param in content_type.split(";")[1:]:
+        key, _, value = param.partition("=")
+        if key.strip().lower() == "charset":
+            return _normalize_charset(value)
+    return None
+
+
+def _charset_from_meta(sample: bytes) -> Optional[str]:
+    """
+    从 <meta charset> 或 <meta http-equiv="Content-Type" content="...charset=..."> 中读取编码。
+    """
+    match = _META_CHARSET_RE.search(sample)
+    if not match:
+        return None
+    return _normalize_charset(match.group(1).decode("ascii", errors="ignore"))
+
+
+def _sniff_charset(sample: bytes) -> Optional[str]:
+    """
+    兜底的编码探测：BOM 优先，其次使用 charset_normalizer 的统计结果。
+    """
+    for bom, charset in _BOMS:
+        if sample.startswith(bom):
+            return charset
+    try:
+        from charset_normalizer import from_bytes
+    except ImportError:
+        return None
+    best = from_bytes(sample).best()
+    return _normalize_charset(best.encoding) if best is not None else None
+
+
+async def _read_html(
+    response: httpx.Response, content_type: str
+) -> Tuple[str, str, int, bool]:
+    """
+    流式读取响应体并增量解码。
+
+    超过 URL_FETCH_MAX_BYTES 时停止读取并使用已收到的部分；
+    编码依次取自响应头、meta 标签、内容探测，最后回退到 utf-8。
+
+    Returns:
+        Tuple[str, str, int, bool]: (文本, 编码, 已接收字节数, 是否被截断)
+    """
+    content_length = response.headers.get("content-length")
+    if content_length and content_length.isdigit():
+        if int(content_length) > URL_FETCH_MAX_BYTES:
+            logger.warning(
+                f"Response declares {content_length} bytes, reading at most "
+                f"{URL_FETCH_MAX_BYTES}"
+            )
+
+    header_charset = _charset_from_content_type(content_type)
+    decoder = None
+    encoding = ""
+    sample = b""
+    parts: List[str] = []
+    received = 0
+    truncated = False
+
+    async for chunk in response.aiter_bytes():
+        if received + len(chunk) > URL_FETCH_MAX_BYTES:
+            chunk = chunk[: URL_FETCH_MAX_BYTES - received]
+            truncated = True
+        received += len(chunk)
+
+        if decoder is None:
+            # 攒够探测所需的前缀后再确定编码
+            sample += chunk
+            if len(sample) < _SNIFF_BYTES and not truncated:
+                continue
+            encoding = (
+                header_charset
+                or _charset_from_meta(sample[:_SNIFF_BYTES])
+                or _sniff_charset(sample[:_SNIFF_BYTES])
+                or "utf-8"
+            )
+            decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+            chunk, sample = sample, b""
+
+        parts.append(decoder.decode(chunk))
+        if truncated:
+            break
+
+    if decoder is None:
+        # 响应体小于探测窗口
+        encoding = (
+            header_charset
+            or _charset_from_meta(sample)
+            or _sniff_charset(sample)
+            or "utf-8"
+        )
+        decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        parts.append(decoder.decode(sample))
+    parts.append(decoder.decode(b"", final=True))
+
+    if truncated:
+        logger.warning(
+            f"Response body exceeded {URL_FETCH_MAX_BYTES} bytes and was truncated"
+        )
+    return "".join(parts), encoding, received, truncated
+
+
+class UrlFetcher:
+    """
+    使用共享 httpx client 抓取网页并提取正文，带条件请求缓存。
+    """
+
+    def __init__(self):
+        self._client: Optional[httpx.AsyncClient] = None
+        self.cache = TieredCache(
+            name="url",
+            max_entries=URL_CACHE_MAX_ENTRIES,
+            ttl=URL_CACHE_RETENTION,
+            sqlite_path=(
+                os.path.join(CACHE_DIR, "url_cache.sqlite3") if URL_CACHE_DISK else None
+            ),
+        )
+        self.revalidated = 0
+
+    def get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                headers=_DEFAULT_HEADERS,
+                follow_redirects=True,
+                timeout=URL_FETCH_TIMEOUT,
+                limits=httpx.Limits(max_connections=URL_FETCH_MAX_CONNECTIONS),
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def fetch_text(self, url: str) -> str:
+        """
+        抓取 URL 并返回提取后的正文。
+
+        Args:
+            url: 带协议的完整 URL
+
+        Returns:
+            str: 清理后的正文文本
+        """
+        entry: Optional[Dict[str, Any]] = await self.cache.get(url)
+        if entry is not None and time.time() - entry["fetched_at"] < URL_CACHE_TTL:
+            logger.info(f"URL cache hit (fresh): {url}")
+            return entry["text"]
+
+        headers: Dict[str, str] = {}
+        if entry is not None:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        logger.debug("Sending HTTP request...")
+        t_start = time.perf_counter()
+        async with self.get_client().stream("GET", url, headers=headers) as response:
+            ttfb_ms = (time.perf_counter() - t_start) * 1000
+            logger.debug(f"HTTP response status: {response.status_code}")
+
+            if response.status_code == 304 and entry is not None:
+                # 内容未变化：沿用缓存正文，只刷新时间戳
+                self.revalidated += 1
+                logger.info(f"URL cache revalidated (304): {url}")
+                entry["fetched_at"] = time.time()
+                await self.cache.set(url, entry)
+                return entry["text"]
+
+            response.raise_for_status()
+            content_type = response.headers.get("content-type", "")
+            if not _is_html_content_type(content_type):
+                # 非网页内容（视频、压缩包等）不下载正文，直接拒绝
+                raise ContentExtractionError(
+                    f"Unsupported content type: {content_type}",
+                    details={"url": url, "content_type": content_type},
+                )
+            html, encoding, received, truncated = await _read_html(
+                response, content_type
+            )
+
+        logger.info(
+            "[url] fetched | url={} | status={} | ttfb_ms={:.1f} | bytes={} | max_bytes={} | encoding={} | truncated={}",
+            url,
+            response.status_code,
+            ttfb_ms,
+            received,
+            URL_FETCH_MAX_BYTES,
+            encoding,
+            truncated,
+        )
+
+        # readability 正文提取与清理在进程池中执行
+        logger.debug("Parsing HTML content...")
+        text = await extractor_pool.run(parse_html, html)
+        if not text:
+            raise ContentExtractionError("Extracted text is empty")
+
+        await self.cache.set(
+            url,
+            {
+                "text": text,
+                "etag": response.headers.get("etag"),
+                "last_modified": response.headers.get("last-modified"),
+                "fetched_at": time.time(),
+            },
+        )
+        return text
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self.cache.stats()
+        stats["revalidated"] = self.revalidated
+        return stats
+
+
+# 进程级单例
+url_fetcher = UrlFetcher()
@@ -0,0 +1,239 @@
+"""
+CPU 密集型提取任务的进程池。
+
+PDF/DOCX 解析、readability 正文提取和 OCR 推理都会长时间占用 CPU，
+放在事件循环里会卡住同一 worker 上的所有请求，因此统一提交到这里的进程池执行。
+"""
+
+import asyncio
+import multiprocessing
+import os
+import signal
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from loguru import logger
+
+from app.configs.settings import (
+    EXTRACTOR_POOL_SIZE,
+    EXTRACTOR_POOL_START_METHOD,
+    EXTRACTOR_CPU_TIME_LIMIT,
+    EXTRACTOR_TASK_TIMEOUT,
+)
+from app.core.exceptions import ContentExtractionError
+
+try:
+    import resource  # 仅 POSIX 可用
+except ImportError:  # pragma: no cover - Windows
+    resource = None  # type: ignore
+
+
+class CPUTimeExceeded(Exception):
+    """
+    worker 中的任务超过 CPU 时间上限。
+    """
+
+
+def _raise_cpu_time_exceeded(signum, frame):
+    raise CPUTimeExceeded("CPU time limit exceeded")
+
+
+def _run_task(
+    fn: Callable[..., Any], args: Tuple[Any, ...], cpu_time_limit: float
+) -> Tuple[Any, float, float]:
+    """
+    在 worker 进程中执行任务，返回 (结果, 开始时间, 结束时间)。
+
+    通过调低 RLIMIT_CPU 软限制为单个任务设置 CPU 时间上限，超限时内核发送 SIGXCPU，
+    由信号处理函数在任务内部抛出 CPUTimeExceeded；任务结束后恢复原限制。
+    """
+    started = time.time()
+    original_limit = None
+    if cpu_time_limit > 0 and resource is not None and hasattr(signal, "SIGXCPU"):
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        used = usage.ru_utime + usage.ru_stime
+        soft, hard = resource.getrlimit(resource.RLIMIT_CPU)
+        new_soft = int(used + cpu_time_limit) + 1
+        if hard == resource.RLIM_INFINITY or new_soft < hard:
+            signal.signal(signal.SIGXCPU, _raise_cpu_time_exceeded)
+            resource.setrlimit(resource.RLIMIT_CPU, (new_soft, hard))
+            original_limit = (soft, hard)
+    try:
+        result = fn(*args)
+    finally:
+        if original_limit is not None:
+            resource.setrlimit(resource.RLIMIT_CPU, original_limit)
+    return result, started, time.time()
+
+
+def _noop() -> int:
+    return os.getpid()
+
+
+class ExtractorPool:
+    """
+    管理提取任务的 ProcessPoolExecutor，并记录排队等待与执行耗时。
+
+    EXTRACTOR_POOL_SIZE 为 0 时不创建进程池，任务改在线程中执行（同样不阻塞事件循环）。
+    """
+
+    def __init__(self):
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.max_workers = EXTRACTOR_POOL_SIZE
+        self.tasks = 0
+        self.failures = 0
+        self.restarts = 0
+        self.total_queue_ms = 0.0
+        self.total_exec_ms = 0.0
+        self.max_queue_ms = 0.0
+        self.max_exec_ms = 0.0
+
+    def start(self) -> None:
+        """
+        创建进程池（worker 进程按需启动）。
+        """
+        if self._executor is not None or self.max_workers <= 0:
+            return
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context(EXTRACTOR_POOL_START_METHOD),
+        )
+        logger.info(
+            f"Extractor process pool started (workers: {self.max_workers}, "
+            f"start method: {EXTRACTOR_POOL_START_METHOD})"
+        )
+
+    async def warmup(self) -> None:
+        """
+        预先拉起全部 worker 进程，避免首个请求承担进程启动耗时。
+        """
+        self.start()
+        if self._executor is None:
+            return
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(
+            *[
+                loop.run_in_executor(self._executor, _noop)
+                for _ in range(self.max_workers)
+            ]
+        )
+
+    def shutdown(self) -> None:
+        """
+        关闭进程池，取消尚未开始的任务。
+        """
+        if self._executor is None:
+            return
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self._executor = None
+        logger.info("Extractor process pool closed")
+
+    def _restart(self, executor: Optional[ProcessPoolExecutor]) -> None:
+        """
+        终止卡死的 worker 并重建进程池。
+
+        只处理任务提交时所在的进程池：旧池被终止后，其上其余任务也会以
+        BrokenProcessPool 失败，这些失败不应再终止已重建的新池。
+        """
+        if executor is None or executor is not self._executor:
+            return
+        self._executor = None
+        self.restarts += 1
+        # ProcessPoolExecutor 没有公开的终止接口，只能直接结束其子进程
+        for process in list((getattr(executor, "_processes", None) or {}).values()):
+            try:
+                process.kill()
+            except Exception:
+                pass
+        executor.shutdown(wait=False, cancel_futures=True)
+        logger.warning("Extractor process pool restarted")
+        self.start()
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """
+        在进程池中执行 fn(*args)。
+
+        Args:
+            fn: 模块级函数（需可 pickle），输入字节/文本，输出文本
+            *args: 传给 fn 的参数
+
+        Returns:
+            fn 的返回值
+
+        Raises:
+            ContentExtractionError: 超过 CPU 时间上限、整体超时或 worker 异常退出
+        """
+        self.start()
+        name = getattr(fn, "__name__", str(fn))
+        submitted = time.time()
+        executor = self._executor
+        try:
+            if executor is None:
+                future = asyncio.to_thread(_run_task, fn, args, 0)
+            else:
+                future = asyncio.get_running_loop().run_in_executor(
+                    executor, _run_task, fn, args, EXTRACTOR_CPU_TIME_LIMIT
+                )
+            result, started, finished = await asyncio.wait_for(
+                future, timeout=EXTRACTOR_TASK_TIMEOUT
+            )
+        except CPUTimeExceeded:
+            self.failures += 1
+            logger.warning(f"[workers] {name} exceeded CPU time limit")
+            raise ContentExtractionError(
+                "Document is too complex to process (CPU time limit exceeded)",
+                details={"cpu_time_limit_s": EXTRACTOR_CPU_TIME_LIMIT},
+            )
+        except asyncio.TimeoutError:
+            self.failures += 1
+            logger.warning(f"[workers] {name} timed out, restarting pool")
+            self._restart(executor)
+            raise ContentExtractionError(
+                "Document processing timed out",
+                details={"timeout_s": EXTRACTOR_TASK_TIMEOUT},
+            )
+        except BrokenProcessPool as e:
+            self.failures += 1
+            logger.error(f"[workers] {name} crashed the worker process: {e}")
+            self._restart(executor)
+            raise ContentExtractionError("Document processing worker crashed")
+
+        queue_ms = max(0.0, started - submitted) * 1000
+        exec_ms = (finished - started) * 1000
+        self.tasks += 1
+        self.total_queue_ms += queue_ms
+        self.total_exec_ms += exec_ms
+        self.max_queue_ms = max(self.max_queue_ms, queue_ms)
+        self.max_exec_ms = max(self.max_exec_ms, exec_ms)
+        logger.info(
+            "[workers] task done | fn={} | queue_ms={:.1f} | exec_ms={:.1f}",
+            name,
+            queue_ms,
+            exec_ms,
+        )
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        排队等待与执行耗时统计。
+        """
+        return {
+            "workers": self.max_workers,
+            "tasks": self.tasks,
+            "failures": self.failures,
+            "restarts": self.restarts,
+            "avg_queue_ms": (
+                round(self.total_queue_ms / self.tasks, 1) if self.tasks else 0.0
+            ),
+            "avg_exec_ms": (
+                round(self.total_exec_ms / self.tasks, 1) if self.tasks else 0.0
+            ),
+            "max_queue_ms": round(self.max_queue_ms, 1),
+            "max_exec_ms": round(self.max_exec_ms, 1),
+        }
+
+
+# 进程级单例
+extractor_pool = ExtractorPool()
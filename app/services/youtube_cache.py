@@ -0,0 +1,120 @@
+"""
+YouTube 字幕缓存。
+
+字幕几乎不会变化，同一视频重复提交时直接复用清洗后的字幕与探测元信息，跳过全部网络步骤。
+两级 key：
+- 请求 key（videoId + 语言偏好 + 是否回退任意语言）-> 实际选中的语言与字幕类型；
+- 字幕 key（videoId + 语言 + 字幕类型）-> 字幕正文与探测元信息。
+“无字幕”“直播”等否定结果以较短的 TTL 缓存在请求 key 上。
+"""
+
+import os
+from typing import Any, Dict, List, Optional
+
+from app.configs.settings import (
+    CACHE_DIR,
+    YOUTUBE_CACHE_ENABLED,
+    YOUTUBE_CACHE_MAX_ENTRIES,
+    YOUTUBE_CACHE_TTL,
+    YOUTUBE_CACHE_DISK,
+    YOUTUBE_NEGATIVE_CACHE_TTL,
+)
+from app.core.exceptions import ContentExtractionError
+from app.services.cache import TieredCache
+
+# 可以缓存的否定结果：视频本身不满足条件，短期内重试也不会成功
+_NEGATIVE_REASONS = {"no_captions", "unsupported_video"}
+
+youtube_cache = TieredCache(
+    name="youtube",
+    max_entries=YOUTUBE_CACHE_MAX_ENTRIES,
+    ttl=YOUTUBE_CACHE_TTL,
+    sqlite_path=(
+        os.path.join(CACHE_DIR, "youtube_cache.sqlite3") if YOUTUBE_CACHE_DISK else None
+    ),
+)
+
+
+def _request_key(
+    video_id: str, prefer_langs: Optional[List[str]], fallback_any_language: bool
+) -> str:
+    langs = ",".join(prefer_langs or ["zh", "en"])
+    return f"request:{video_id}:{langs}:{int(bool(fallback_any_language))}"
+
+
+def _transcript_key(video_id: str, lang: str, transcript_type: str) -> str:
+    return f"transcript:{video_id}:{lang}:{transcript_type}"
+
+
+async def get_cached_transcript(
+    video_id: str, prefer_langs: Optional[List[str]], fallback_any_language: bool
+) -> Optional[Dict[str, Any]]:
+    """
+    查询字幕缓存。
+
+    Returns:
+        Optional[Dict[str, Any]]: { text, lang, transcript_type, probe }；未命中返回 None
+
+    Raises:
+        ContentExtractionError: 命中否定结果（如无字幕）时，抛出与首次相同的错误
+    """
+    if not YOUTUBE_CACHE_ENABLED:
+        return None
+    resolved = await youtube_cache.get(
+        _request_key(video_id, prefer_langs, fallback_any_language)
+    )
+    if resolved is None:
+        return None
+    if resolved.get("negative"):
+        raise ContentExtractionError(resolved["message"], details=resolved["details"])
+    return await youtube_cache.get(
+        _transcript_key(video_id, resolved["lang"], resolved["transcript_type"])
+    )
+
+
+async def set_cached_transcript(
+    video_id: str,
+    prefer_langs: Optional[List[str]],
+    fallback_any_language: bool,
+    probe: Dict[str, Any],
+    lang: str,
+    transcript_type: str,
+    text: str,
+) -> None:
+    """
+    写入清洗后的字幕与探测元信息。
+    """
+    if not YOUTUBE_CACHE_ENABLED or not text:
+        return
+    await youtube_cache.set(
+        _transcript_key(video_id, lang, transcript_type),
+        {
+            "text": text,
+            "lang": lang,
+            "transcript_type": transcript_type,
+            "probe": probe,
+        },
+    )
+    await youtube_cache.set(
+        _request_key(video_id, prefer_langs, fallback_any_language),
+        {"lang": lang, "transcript_type": transcript_type},
+    )
+
+
+async def set_negative_result(
+    video_id: str,
+    prefer_langs: Optional[List[str]],
+    fallback_any_language: bool,
+    error: ContentExtractionError,
+) -> None:
+    """
+    短暂缓存否定结果；网络错误等临时失败不缓存。
+    """
+    details = error.details or {}
+    if not YOUTUBE_CACHE_ENABLED or details.get("reason") not in _NEGATIVE_REASONS:
+        return
+    await youtube_cache.set(
+        _request_key(video_id, prefer_langs, fallback_any_language),
+        {"negative": True, "message": error.message, "details": details},
+        ttl=YOUTUBE_NEGATIVE_CACHE_TTL,
+    )
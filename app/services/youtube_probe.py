@@ -0,0 +1,106 @@
+"""
+YouTube 元信息的轻量探测。
+
+yt-dlp 的 extract_info 会解析全部格式与播放器数据（多次请求 + 播放器 JS），
+而探测只需要标题、时长、直播状态与可见性。这些字段都在观看页内嵌的
+ytInitialPlayerResponse 中，一次页面请求即可读出；字段缺失或状态不明确时返回 None，
+由调用方回退到 yt-dlp 做权威判断。
+
+oEmbed 接口只提供标题与作者，没有时长与直播状态，不足以完成探测，因此不使用。
+
+请求经由 client_registry 中共享的 httpx 异步 client 发出，随应用 lifespan 一起关闭。
+"""
+
+import json
+from typing import Any, Dict, Optional
+
+import httpx
+from loguru import logger
+
+from app.configs.settings import YOUTUBE_PROBE_TIMEOUT
+from app.services.llms.client_registry import provider_clients
+
+_WATCH_URL = "https://www.youtube.com/watch"
+_PLAYER_RESPONSE_MARKERS = (
+    "var ytInitialPlayerResponse = ",
+    "ytInitialPlayerResponse = ",
+)
+_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+    ),
+    "Accept-Language": "en-US,en;q=0.8",
+    # 跳过欧盟地区的 cookie 同意页（共享 client 不保存 cookie，直接放在请求头中）
+    "Cookie": "CONSENT=YES+cb; SOCS=CAI",
+}
+
+
+def parse_player_response(html: str) -> Optional[Dict[str, Any]]:
+    """
+    从观看页 HTML 中取出 ytInitialPlayerResponse 对象。
+    """
+    decoder = json.JSONDecoder()
+    for marker in _PLAYER_RESPONSE_MARKERS:
+        start = html.find(marker)
+        if start < 0:
+            continue
+        try:
+            data, _ = decoder.raw_decode(html, start + len(marker))
+        except ValueError:
+            continue
+        if isinstance(data, dict):
+            return data
+    return None
+
+
+def info_from_player_response(data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    把 player response 转成与 yt-dlp info 同名的字段：
+      { id, title, duration, is_live, availability, age_limit }
+
+    播放状态不是 OK（需登录、年龄限制、会员、私有、直播未开始等）或缺少必要字段时返回 None。
+    """
+    status = (data.get("playabilityStatus") or {}).get("status")
+    details = data.get("videoDetails") or {}
+    microformat = (data.get("microformat") or {}).get("playerMicroformatRenderer") or {}
+    video_id = details.get("videoId")
+    title = details.get("title")
+    length = details.get("lengthSeconds")
+    if status != "OK" or not video_id or not title or not str(length or "").isdigit():
+        return None
+    broadcast = microformat.get("liveBroadcastDetails") or {}
+    is_live = bool(
+        details.get("isLive") or details.get("isUpcoming") or broadcast.get("isLiveNow")
+    )
+    return {
+        "id": video_id,
+        "title": title,
+        "duration": int(length),
+        "is_live": is_live,
+        "availability": "unlisted" if microformat.get("isUnlisted") else "public",
+        # 未登录即可播放，说明不是年龄限制视频
+        "age_limit": 0,
+    }
+
+
+async def fetch_basic_info(video_id: str) -> Optional[Dict[str, Any]]:
+    """
+    请求观看页并读取元信息；请求失败或字段不全时返回 None。
+    """
+    try:
+        response = await provider_clients.get_http_client().get(
+            _WATCH_URL,
+            params={"v": video_id, "hl": "en", "has_verified": "1"},
+            headers=_HEADERS,
+            follow_redirects=True,
+            timeout=YOUTUBE_PROBE_TIMEOUT,
+        )
+        response.raise_for_status()
+    except httpx.HTTPError as e:
+        logger.warning(f"[youtube] fast probe request failed | video_id={video_id} | reason={e}")
+        return None
+    data = parse_player_response(response.text)
+    if data is None:
+        return None
+    return info_from_player_response(data)
@@ -0,0 +1,78 @@
+"""
+图片 OCR 吞吐基准（images/sec）。
+
+生成普通截图与长截图两类图片，分别测量整张识别与分块并行识别的吞吐。
+需要安装 rapidocr-onnxruntime 与 numpy。
+
+用法（项目根目录）：
+    python -m benchmarks.ocr_throughput --images 20 --workers 4
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import io
+import time
+
+from PIL import Image, ImageDraw
+
+from app.services import ocr as ocr_module
+from app.services.ocr import OcrService
+from app.services.workers import ExtractorPool
+
+
+def make_screenshot(width: int, height: int, seed: int) -> bytes:
+    """
+    生成白底多行文字的截图。
+    """
+    image = Image.new("RGB", (width, height), "white")
+    draw = ImageDraw.Draw(image)
+    line_height = 48
+    for index, y in enumerate(range(40, height - line_height, line_height)):
+        draw.text(
+            (40, y),
+            f"Line {seed}-{index}: The quick brown fox jumps over the lazy dog",
+            fill="black",
+            font_size=28,
+        )
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+async def measure(images, workers: int, concurrency: int) -> float:
+    pool = ExtractorPool()
+    pool.max_workers = workers
+    ocr_module.extractor_pool = pool
+    ocr_module.OCR_CONCURRENCY = concurrency
+    service = OcrService()
+    try:
+        await pool.warmup()
+        # 预热：每个 worker 加载一次 OCR 模型
+        await asyncio.gather(*[service.recognize(images[0]) for _ in range(workers)])
+        t_start = time.perf_counter()
+        await asyncio.gather(*[service.recognize(image) for image in images])
+        return len(images) / (time.perf_counter() - t_start)
+    finally:
+        pool.shutdown()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--images", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    if importlib.util.find_spec("rapidocr_onnxruntime") is None:
+        raise SystemExit("rapidocr-onnxruntime is not installed")
+
+    phone = [make_screenshot(1170, 2532, i) for i in range(args.images)]
+    tall = [make_screenshot(1170, 12000, i) for i in range(max(1, args.images // 5))]
+
+    for name, images in (("phone 1170x2532", phone), ("tall 1170x12000", tall)):
+        rate = asyncio.run(measure(images, args.workers, args.workers))
+        print(f"{name}: {rate:.2f} images/sec (workers={args.workers})")
+
+
+if __name__ == "__main__":
+    main()
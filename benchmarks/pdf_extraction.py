@@ -0,0 +1,97 @@
+"""
+PDF 提取基准：逐页串行提取 vs. 进程池分批并行提取。
+
+用法（项目根目录）：
+    python -m benchmarks.pdf_extraction --pages 400 --workers 4
+"""
+
+import argparse
+import asyncio
+import io
+import time
+
+from pypdf import PdfWriter
+from pypdf.generic import DecodedStreamObject, DictionaryObject, NameObject
+
+from app.services import extractors
+from app.services.parsers import parse_pdf
+from app.services.workers import ExtractorPool
+
+
+def make_pdf(pages: int, lines_per_page: int = 45) -> bytes:
+    """
+    生成每页含多行文本的 PDF。
+    """
+    writer = PdfWriter()
+    font = writer._add_object(
+        DictionaryObject(
+            {
+                NameObject("/Type"): NameObject("/Font"),
+                NameObject("/Subtype"): NameObject("/Type1"),
+                NameObject("/BaseFont"): NameObject("/Helvetica"),
+            }
+        )
+    )
+    for page_no in range(pages):
+        page = writer.add_blank_page(width=612, height=792)
+        page[NameObject("/Resources")] = DictionaryObject(
+            {NameObject("/Font"): DictionaryObject({NameObject("/F1"): font})}
+        )
+        ops = ["BT /F1 10 Tf 40 760 Td 12 TL"]
+        for line in range(lines_per_page):
+            ops.append(
+                f"(Page {page_no + 1} line {line + 1}: the quick brown fox "
+                f"jumps over the lazy dog 0123456789) '"
+            )
+        ops.append("ET")
+        stream = DecodedStreamObject()
+        stream.set_data("\n".join(ops).encode("latin-1"))
+        page[NameObject("/Contents")] = writer._add_object(stream)
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+async def run_parallel(content: bytes, workers: int, max_chars: int) -> dict:
+    pool = ExtractorPool()
+    pool.max_workers = workers
+    extractors.extractor_pool = pool
+    try:
+        await pool.warmup()
+        return await extractors.extract_pdf_pages(content, max_chars=max_chars)
+    finally:
+        pool.shutdown()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=400)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--max-chars", type=int, default=20000)
+    args = parser.parse_args()
+
+    content = make_pdf(args.pages)
+    print(f"PDF: {args.pages} pages, {len(content) / 1024:.0f} KB")
+
+    t_start = time.perf_counter()
+    text = parse_pdf(content)
+    sequential_s = time.perf_counter() - t_start
+    print(f"sequential (all pages):        {sequential_s:.2f}s  chars={len(text)}")
+
+    result = asyncio.run(run_parallel(content, args.workers, 0))
+    parallel_s = result["elapsed_ms"] / 1000
+    print(
+        f"parallel x{args.workers} (all pages):    {parallel_s:.2f}s  "
+        f"chars={len(result['text'])}  speedup={sequential_s / parallel_s:.1f}x"
+    )
+
+    result = asyncio.run(run_parallel(content, args.workers, args.max_chars))
+    budget_s = result["elapsed_ms"] / 1000
+    print(
+        f"parallel x{args.workers} (budget {args.max_chars}): {budget_s:.2f}s  "
+        f"pages={len(result['pages'])}  speedup={sequential_s / budget_s:.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""
+YouTube 元信息探测基准：观看页轻量探测 vs. yt-dlp 完整探测。
+
+先在联网环境录制每个视频两种探测方式的 HTTP 交互，之后离线回放比较耗时、请求数与下载字节数；
+回放时每个请求额外等待 --rtt-ms 毫秒，模拟网络往返。
+
+用法（项目根目录）：
+    python -m benchmarks.youtube_probe --record https://www.youtube.com/watch?v=dQw4w9WgXcQ
+    python -m benchmarks.youtube_probe --rounds 5 --rtt-ms 80
+"""
+
+import argparse
+import base64
+import io
+import json
+import os
+import time
+from collections import defaultdict, deque
+from typing import Any, Callable, Dict, List
+
+import httpx
+
+from app.core.exceptions import ContentExtractionError
+from app.services import extractors, youtube_probe
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "youtube")
+
+
+def _encode(body: bytes) -> str:
+    return base64.b64encode(body).decode("ascii")
+
+
+def _probe(url: str, mode: str) -> Any:
+    extractors.YOUTUBE_PROBE_MODE = mode
+    # 每轮使用新的 client / YoutubeDL，与进程内第一次探测的开销一致
+    youtube_probe._client = None
+    extractors._ydl_local.__dict__.clear()
+    try:
+        return extractors.probe_youtube_basic_info(url)
+    except ContentExtractionError as e:
+        return {"error": str(e)}
+
+
+def record(url: str) -> str:
+    """
+    联网执行两种探测并保存全部 HTTP 交互。
+    """
+    from yt_dlp import YoutubeDL
+    from yt_dlp.networking.common import Response
+
+    video_id = extractors.validate_and_get_video_id(url)
+    exchanges: Dict[str, List[Dict[str, Any]]] = {"fast": [], "ytdlp": []}
+
+    def on_response(response: httpx.Response) -> None:
+        response.read()
+        exchanges["fast"].append(
+            {
+                "url": str(response.request.url),
+                "status": response.status_code,
+                "headers": dict(response.headers),
+                "body": _encode(response.content),
+            }
+        )
+
+    youtube_probe._client = None
+    client = youtube_probe._get_client()
+    client.event_hooks["response"] = [on_response]
+    extractors.YOUTUBE_PROBE_MODE = "fast"
+    try:
+        fast_result = extractors.probe_youtube_basic_info(url)
+    except ContentExtractionError as e:
+        fast_result = {"error": str(e)}
+
+    original_urlopen = YoutubeDL.urlopen
+
+    def recording_urlopen(self, req):
+        response = original_urlopen(self, req)
+        body = response.read()
+        exchanges["ytdlp"].append(
+            {
+                "url": req if isinstance(req, str) else req.url,
+                "status": response.status,
+                "headers": dict(response.headers),
+                "body": _encode(body),
+            }
+        )
+        return Response(io.BytesIO(body), response.url, response.headers, response.status)
+
+    YoutubeDL.urlopen = recording_urlopen
+    try:
+        ytdlp_result = _probe(url, "ytdlp")
+    finally:
+        YoutubeDL.urlopen = original_urlopen
+
+    os.makedirs(FIXTURES_DIR, exist_ok=True)
+    path = os.path.join(FIXTURES_DIR, f"{video_id}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "url": url,
+                "results": {"fast": fast_result, "ytdlp": ytdlp_result},
+                "exchanges": exchanges,
+            },
+            f,
+        )
+    return path
+
+
+def _replayer(recorded: List[Dict[str, Any]], rtt_ms: float) -> Callable[[str], Dict[str, Any]]:
+    """
+    按 URL（去掉查询参数）依次取出录制的响应。
+    """
+    queues: Dict[str, deque] = defaultdict(deque)
+    for item in recorded:
+        queues[item["url"].split("?")[0]].append(item)
+
+    def next_response(url: str) -> Dict[str, Any]:
+        time.sleep(rtt_ms / 1000)
+        queue = queues[url.split("?")[0]]
+        if not queue:
+            raise RuntimeError(f"No recorded response for {url}")
+        return queue.popleft()
+
+    return next_response
+
+
+def replay(fixture: Dict[str, Any], mode: str, rtt_ms: float) -> Dict[str, Any]:
+    """
+    回放一次探测，返回耗时、请求数与下载字节数。
+    """
+    from yt_dlp import YoutubeDL
+    from yt_dlp.networking.common import Response
+
+    next_response = _replayer(fixture["exchanges"][mode], rtt_ms)
+    stats = {"requests": 0, "bytes": 0}
+
+    def take(url: str) -> Dict[str, Any]:
+        item = next_response(url)
+        body = base64.b64decode(item["body"])
+        stats["requests"] += 1
+        stats["bytes"] += len(body)
+        return {**item, "body": body}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        item = take(str(request.url))
+        headers = {
+            k: v
+            for k, v in item["headers"].items()
+            if k.lower() not in ("content-encoding", "content-length", "transfer-encoding")
+        }
+        return httpx.Response(item["status"], headers=headers, content=item["body"])
+
+    def replay_urlopen(self, req):
+        url = req if isinstance(req, str) else req.url
+        item = take(url)
+        return Response(io.BytesIO(item["body"]), item["url"], item["headers"], item["status"])
+
+    original_get_client = youtube_probe._get_client
+    original_urlopen = YoutubeDL.urlopen
+    youtube_probe._get_client = lambda: httpx.Client(transport=httpx.MockTransport(handler))
+    YoutubeDL.urlopen = replay_urlopen
+    try:
+        t0 = time.perf_counter()
+        result = _probe(fixture["url"], mode)
+        elapsed = time.perf_counter() - t0
+    finally:
+        youtube_probe._get_client = original_get_client
+        YoutubeDL.urlopen = original_urlopen
+    return {"elapsed": elapsed, "result": result, **stats}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--record", nargs="*", default=[], help="联网录制这些视频的探测交互")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--rtt-ms", type=float, default=80.0)
+    args = parser.parse_args()
+
+    for url in args.record:
+        print(f"recorded {url} -> {record(url)}")
+    if args.record:
+        return
+
+    names = sorted(os.listdir(FIXTURES_DIR)) if os.path.isdir(FIXTURES_DIR) else []
+    if not names:
+        print(f"no recordings in {FIXTURES_DIR}, run with --record first")
+        return
+    for name in names:
+        with open(os.path.join(FIXTURES_DIR, name), encoding="utf-8") as f:
+            fixture = json.load(f)
+        print(fixture["url"])
+        for mode in ("ytdlp", "fast"):
+            runs = [replay(fixture, mode, args.rtt_ms) for _ in range(args.rounds)]
+            avg = sum(r["elapsed"] for r in runs) / len(runs)
+            print(
+                f"  {mode:<6} avg={avg * 1000:8.1f}ms  requests={runs[0]['requests']}"
+                f"  bytes={runs[0]['bytes']}  result={runs[0]['result']}"
+            )
+
+
+if __name__ == "__main__":
+    main()
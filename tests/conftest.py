@@ -9,6 +9,9 @@ from fastapi.testclient import TestClient
 from unittest.mock import AsyncMock, patch
 from app.main import app
 from app.schemas.rewrite_schema import LLMResponse
+from app.services.llms.rewriting_client import rewrite_cache
+from app.services.extraction_cache import extraction_cache
+from app.services.youtube_cache import youtube_cache
 
 
 @pytest.fixture(scope="module")
@@ -22,6 +25,10 @@ def mock_external_services():
     """
     Mock all external service calls to LLMs and Extractors.
     """
+    # 每个用例从空缓存开始，避免用例之间相互影响
+    rewrite_cache.clear()
+    extraction_cache.clear()
+    youtube_cache.clear()
     with patch(
         "app.services.llms.rewriting_client.get_rewriting_result",
         new_callable=AsyncMock,
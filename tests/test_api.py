@@ -1,5 +1,8 @@
+import asyncio
 import json
-from app.schemas.rewrite_schema import LLMType
+import time
+from unittest.mock import patch
+from app.schemas.rewrite_schema import LLMResponse, LLMType
 
 
 def test_health_check(client):
@@ -80,3 +83,170 @@ def test_avatar_endpoint(client):
 
     assert response.status_code == 200
     assert response.json()["video_url"] == "http://mock.video/output.mp4"
+
+
+def _parse_sse(body: str):
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = block.split("\n")
+        event = lines[0].removeprefix("event: ")
+        data = json.loads(lines[1].removeprefix("data: "))
+        events.append((event, data))
+    return events
+
+
+def test_rewrite_stream_endpoint(client):
+    async def fake_stream(**kwargs):
+        for chunk in [
+            '{"article": "Stre',
+            "amed\\n art",
+            'icle", "summ',
+            'ary": "Short"}',
+        ]:
+            yield chunk
+
+    inputs = [{"id": "1", "type": "text", "content": "Hello World"}]
+    data = {"inputs": json.dumps(inputs), "prompt": "Rewrite", "llm_type": "qwen-flash"}
+
+    with patch(
+        "app.services.llms.rewriting_client.stream_rewriting_result", fake_stream
+    ):
+        response = client.post("/api/v1/rewrite/stream", data=data)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = _parse_sse(response.text)
+    assert events[0][0] == "start"
+    assert events[0][1]["original"].strip() == "[文本]\nHello World"
+
+    streamed = "".join(
+        d["text"] for e, d in events if e == "delta" and d["field"] == "rewritten"
+    )
+    assert streamed == "Streamed\n article"
+
+    assert events[-1][0] == "done"
+    assert events[-1][1]["rewritten"] == "Streamed\n article"
+    assert events[-1][1]["summary"] == "Short"
+
+
+def test_rewrite_stream_provider_error(client):
+    async def failing_stream(**kwargs):
+        yield '{"rewritten": "partial'
+        raise RuntimeError("provider down")
+
+    inputs = [{"id": "1", "type": "text", "content": "Hello World"}]
+    data = {"inputs": json.dumps(inputs), "prompt": "Rewrite", "llm_type": "gpt-5"}
+
+    with patch(
+        "app.services.llms.rewriting_client.stream_rewriting_result", failing_stream
+    ):
+        response = client.post("/api/v1/rewrite/stream", data=data)
+
+    events = _parse_sse(response.text)
+    assert events[-1][0] == "error"
+    assert events[-1][1]["code"] == "LLM_PROVIDER_ERROR"
+
+
+def test_rewrite_result_cache(client, mock_external_services):
+    inputs = [{"id": "1", "type": "text", "content": "Cache me"}]
+    data = {"inputs": json.dumps(inputs), "prompt": "Rewrite", "llm_type": "gpt-5"}
+
+    first = client.post("/api/v1/rewrite", data=data)
+    second = client.post("/api/v1/rewrite", data=data)
+
+    assert first.json()["cached"] is False
+    assert second.json()["cached"] is True
+    assert second.json()["rewritten"] == first.json()["rewritten"]
+    assert mock_external_services["rewrite"].await_count == 1
+
+    stats = client.get("/api/v1/rewrite/cache/stats").json()["rewrite"]
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+
+def test_degraded_rewrite_result_is_not_cached(client, mock_external_services):
+    mock_external_services["rewrite"].return_value = LLMResponse(
+        rewritten="raw model output", summary=""
+    ).mark_degraded()
+    inputs = [{"id": "1", "type": "text", "content": "Do not cache me"}]
+    data = {"inputs": json.dumps(inputs), "prompt": "Rewrite", "llm_type": "qwen-flash"}
+
+    first = client.post("/api/v1/rewrite", data=data)
+    second = client.post("/api/v1/rewrite", data=data)
+
+    assert first.json()["rewritten"] == "raw model output"
+    assert first.json()["cached"] is False
+    assert second.json()["cached"] is False
+    assert mock_external_services["rewrite"].await_count == 2
+
+
+def test_pdf_extraction_cache_depends_on_char_budget(client, mock_external_services):
+    inputs = [{"id": "1", "type": "file", "contentKey": "file_1"}]
+    files = {"file_1": ("report.pdf", b"%PDF-1.4 same bytes", "application/pdf")}
+    data = {"inputs": json.dumps(inputs), "prompt": "Rewrite", "llm_type": "gpt-5"}
+
+    for budget in (1000, 1000, 5000):
+        with patch("app.routers.rewrite.PDF_MAX_CHARS", budget):
+            client.post("/api/v1/rewrite", data=data, files=files)
+
+    # 预算变大后不复用按较小预算截断的结果
+    mock_pdf = mock_external_services["pdf"]
+    assert mock_pdf.await_count == 2
+    assert mock_pdf.await_args.kwargs["max_chars"] == 5000
+
+
+def test_rewrite_extracts_items_concurrently_in_order(client, mock_external_services):
+    async def slow_extract(url):
+        await asyncio.sleep(0.3)
+        return f"content of {url}"
+
+    mock_external_services["url"].side_effect = slow_extract
+    inputs = [
+        {"id": "1", "type": "url", "content": "http://a.example"},
+        {"id": "2", "type": "text", "content": "Middle text"},
+        {"id": "3", "type": "url", "content": "http://b.example"},
+        {"id": "4", "type": "url", "content": "http://a.example"},
+    ]
+    data = {"inputs": json.dumps(inputs), "prompt": "Rewrite", "llm_type": "gpt-5"}
+
+    t0 = time.perf_counter()
+    response = client.post("/api/v1/rewrite", data=data)
+    elapsed = time.perf_counter() - t0
+
+    assert response.status_code == 200
+    original = response.json()["original"]
+    positions = [
+        original.index("content of http://a.example"),
+        original.index("Middle text"),
+        original.index("content of http://b.example"),
+    ]
+    assert positions == sorted(positions)
+    # 重复链接只抓取一次，正文也只出现一次
+    assert mock_external_services["url"].await_count == 2
+    assert original.count("content of http://a.example") == 1
+    assert elapsed < 0.6
+
+
+def test_rewrite_file_extraction_cache(client, mock_external_services):
+    inputs = [{"id": "1", "type": "file", "contentKey": "file_1"}]
+    files = {"file_1": ("release.docx", b"same docx bytes", "application/octet-stream")}
+
+    for prompt in ("新闻风格", "评论风格"):
+        data = {"inputs": json.dumps(inputs), "prompt": prompt, "llm_type": "gpt-5"}
+        response = client.post("/api/v1/rewrite", data=data, files=files)
+        assert response.status_code == 200
+        assert "Extracted content from DOCX" in response.json()["original"]
+
+    # 相同内容的文件第二次上传直接命中提取缓存
+    assert mock_external_services["docx"].await_count == 1
+
+    files = {
+        "file_1": ("release.docx", b"edited docx bytes", "application/octet-stream")
+    }
+    data = {"inputs": json.dumps(inputs), "prompt": "新闻风格", "llm_type": "gpt-5"}
+    client.post("/api/v1/rewrite", data=data, files=files)
+    assert mock_external_services["docx"].await_count == 2
+
+    with patch.dict("app.routers.rewrite.EXTRACTOR_VERSIONS", {"docx": "next"}):
+        client.post("/api/v1/rewrite", data=data, files=files)
+    assert mock_external_services["docx"].await_count == 3
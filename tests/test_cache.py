@@ -0,0 +1,39 @@
+import time
+
+import pytest
+
+from app.services.cache import TieredCache, TTLCache
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(max_entries=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_ttl_cache_expires_entries():
+    cache = TTLCache(max_entries=2, ttl=0.01)
+    cache.set("a", 1)
+    time.sleep(0.02)
+    assert cache.get("a") is None
+
+
+@pytest.mark.asyncio
+async def test_tiered_cache_disk_tier_survives_restart(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = TieredCache("test", max_entries=4, ttl=60, sqlite_path=path)
+    await cache.set("key", {"rewritten": "text", "summary": "sum"})
+
+    # 新实例模拟进程重启：内存层为空，从磁盘层读取
+    restarted = TieredCache("test", max_entries=4, ttl=60, sqlite_path=path)
+    assert await restarted.get("key") == {"rewritten": "text", "summary": "sum"}
+    assert restarted.stats()["disk_hits"] == 1
+
+    assert await restarted.get("missing") is None
+    assert restarted.stats()["misses"] == 1
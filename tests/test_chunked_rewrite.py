@@ -0,0 +1,97 @@
+import asyncio
+import time
+
+import pytest
+
+from app.schemas.rewrite_schema import LLMResponse, LLMType
+from app.services.llms import rewriting_client
+from app.core.exceptions import LLMProviderError
+
+
+@pytest.fixture
+def chunked(monkeypatch):
+    monkeypatch.setattr(rewriting_client, "REWRITE_CHUNK_THRESHOLD", 500)
+    monkeypatch.setattr(rewriting_client, "REWRITE_CHUNK_CHARS", 300)
+    monkeypatch.setattr(rewriting_client, "REWRITE_CHUNK_CONCURRENCY", 8)
+
+
+@pytest.mark.asyncio
+async def test_long_source_is_rewritten_in_parallel_chunks(
+    chunked, mock_external_services
+):
+    async def rewrite(llm_type, instruction, source):
+        if instruction == rewriting_client._SUMMARY_REDUCE_INSTRUCTION:
+            return LLMResponse(rewritten="", summary="全文摘要:" + source.replace("\n", "|"))
+        await asyncio.sleep(0.1)
+        head = source.split("。")[0]
+        return LLMResponse(rewritten=f"<{head}>", summary=f"[{head}]")
+
+    mock_rewrite = mock_external_services["rewrite"]
+    mock_rewrite.side_effect = rewrite
+    source = "\n\n".join(f"第{i}段。" + "内容。" * 90 for i in range(6))
+
+    t0 = time.perf_counter()
+    result, cached = await rewriting_client.get_rewriting_result_cached(
+        llm_type=LLMType.QWEN, instruction="改写成新闻稿", source=source
+    )
+    elapsed = time.perf_counter() - t0
+
+    assert not cached
+    # 6 段改写 + 1 次摘要合并
+    assert mock_rewrite.await_count == 7
+    # 整体耗时接近单段耗时，而不是 6 段之和
+    assert elapsed < 0.4
+    assert result.rewritten == "\n\n".join(f"<第{i}段>" for i in range(6))
+    assert result.summary == "全文摘要:" + "|".join(f"[第{i}段]" for i in range(6))
+
+    instructions = [call.kwargs["instruction"] for call in mock_rewrite.await_args_list][:6]
+    assert all(i.startswith("改写成新闻稿") for i in instructions)
+    assert any("第 1/6 部分" in i for i in instructions)
+    # 后续段落附带上一段原文结尾用于衔接
+    assert any("上一部分原文结尾" in i for i in instructions)
+
+
+@pytest.mark.asyncio
+async def test_short_source_uses_single_call(chunked, mock_external_services):
+    mock_rewrite = mock_external_services["rewrite"]
+    await rewriting_client.get_rewriting_result_cached(
+        llm_type=LLMType.QWEN, instruction="改写", source="短文。" * 50
+    )
+    assert mock_rewrite.await_count == 1
+    assert mock_rewrite.await_args.kwargs["instruction"] == "改写"
+
+
+@pytest.mark.asyncio
+async def test_chunk_summaries_are_joined_when_reduce_fails(
+    chunked, mock_external_services
+):
+    async def rewrite(llm_type, instruction, source):
+        if instruction == rewriting_client._SUMMARY_REDUCE_INSTRUCTION:
+            raise LLMProviderError("reduce failed")
+        return LLMResponse(rewritten="正文", summary=source.split("。")[0])
+
+    mock_external_services["rewrite"].side_effect = rewrite
+    source = "\n\n".join(f"第{i}段。" + "内容。" * 90 for i in range(3))
+
+    result = await rewriting_client.get_chunked_rewriting_result(
+        llm_type=LLMType.QWEN, instruction="改写", source=source
+    )
+
+    assert result.summary == "第0段\n第1段\n第2段"
+    # 退回拼接的摘要不写入结果缓存
+    assert result.degraded
+
+
+
+def test_cache_key_changes_with_chunking_and_length_settings(monkeypatch):
+    def key():
+        return rewriting_client.build_cache_key(LLMType.QWEN, "改写", "原文")
+
+    base = key()
+    monkeypatch.setattr(rewriting_client, "REWRITE_CHUNK_THRESHOLD", 500)
+    chunked = key()
+    monkeypatch.setattr(rewriting_client, "REWRITE_LENGTH_MODE", "map_reduce")
+    map_reduce = key()
+
+    # 配置变化后不再命中按旧配置生成的结果
+    assert len({base, chunked, map_reduce}) == 3
@@ -0,0 +1,94 @@
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from app.schemas.rewrite_schema import LLMType, LLMResponse
+from app.services.llms import rewriting_client
+from app.services.llms.client_registry import provider_clients
+
+# 模拟单次大模型生成耗时
+PROVIDER_DELAY = 0.5
+CONCURRENT_REQUESTS = 8
+
+
+class FakeAsyncOpenAI:
+    """
+    延迟返回的 AsyncOpenAI 替身，同时覆盖 OpenAI 与 Qwen 两条调用路径。
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.responses = SimpleNamespace(parse=self._parse)
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    async def _parse(self, **kwargs):
+        await asyncio.sleep(PROVIDER_DELAY)
+        return SimpleNamespace(
+            output_parsed=LLMResponse(rewritten="fake article", summary="fake summary")
+        )
+
+    async def _create(self, **kwargs):
+        await asyncio.sleep(PROVIDER_DELAY)
+        content = json.dumps({"article": "fake article", "summary": "fake summary"})
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content))]
+        )
+
+
+class FakeGenaiClient:
+    """
+    延迟返回的 genai.Client 替身。
+    """
+
+    def __init__(self, *args, **kwargs):
+        models = SimpleNamespace(generate_content=self._generate_content)
+        self.aio = SimpleNamespace(models=models)
+
+    async def _generate_content(self, **kwargs):
+        await asyncio.sleep(PROVIDER_DELAY)
+        return SimpleNamespace(
+            text=LLMResponse(
+                rewritten="fake article", summary="fake summary"
+            ).model_dump_json()
+        )
+
+
+@pytest.fixture
+def fake_providers(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+    monkeypatch.setenv("DASHSCOPE_API_KEY", "test-key")
+    with patch.object(
+        provider_clients, "get_openai_client", return_value=FakeAsyncOpenAI()
+    ), patch.object(
+        provider_clients, "get_qwen_client", return_value=FakeAsyncOpenAI()
+    ), patch.object(
+        provider_clients, "get_gemini_client", return_value=FakeGenaiClient()
+    ):
+        yield
+
+
+# conftest 会在测试期间替换 rewriting_client.get_rewriting_result，这里保留真实的分发函数
+_get_rewriting_result = rewriting_client.get_rewriting_result
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("llm_type", list(LLMType))
+async def test_concurrent_rewrites_do_not_block_event_loop(fake_providers, llm_type):
+    t0 = time.perf_counter()
+    results = await asyncio.gather(
+        *[
+            _get_rewriting_result(
+                llm_type=llm_type, instruction="Rewrite", source=f"source {i}"
+            )
+            for i in range(CONCURRENT_REQUESTS)
+        ]
+    )
+    elapsed = time.perf_counter() - t0
+
+    assert all(r.rewritten == "fake article" for r in results)
+    # 若 provider 调用阻塞事件循环，总耗时约为 N * PROVIDER_DELAY
+    assert elapsed < PROVIDER_DELAY * 2
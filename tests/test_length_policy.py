@@ -0,0 +1,123 @@
+import asyncio
+import json
+from unittest.mock import patch
+
+import pytest
+
+from app.routers import rewrite as rewrite_router
+from app.schemas.rewrite_schema import LLMResponse, LLMType
+from app.services import extractors
+from app.services.text_chunks import split_text
+
+
+def test_split_text_keeps_text_and_boundaries():
+    text = (
+        "第一段第一句。第二句！“引号里的一句。”\n\n"
+        + "The first sentence. Pi is 3.14 here! Another one?\n" * 6
+        + "x" * 45
+    )
+    chunks = split_text(text, 40)
+    assert "".join(chunks) == text
+    assert all(len(c) <= 40 for c in chunks)
+    # 小数点不是句子边界
+    assert not any(c.endswith("3.") for c in chunks)
+    assert chunks[0].startswith("第一段第一句。第二句！“引号里的一句。”")
+
+
+@pytest.mark.asyncio
+async def test_map_reduce_summarizes_chunks_concurrently(
+    mock_external_services, monkeypatch
+):
+    monkeypatch.setattr(extractors, "SUMMARIZE_CHUNK_CHARS", 100)
+    monkeypatch.setattr(extractors, "SUMMARIZE_CONCURRENCY", 3)
+    running = 0
+    peak = 0
+
+    async def summarize(llm_type, instruction, source):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return LLMResponse(rewritten=source[:11], summary="")
+
+    mock_external_services["rewrite"].side_effect = summarize
+    text = "\n\n".join(f"Paragraph {i}. " + "word " * 15 for i in range(8))
+
+    applied = await extractors.apply_length_policy(
+        text, mode="map_reduce", max_chars=200, llm_type="gpt-5"
+    )
+
+    assert applied["mode"] == "map_reduce"
+    assert applied["chunks"] == 8
+    assert peak == 3
+    # 各块摘要按原顺序合并，未超过上限时不需要额外的 reduce 调用
+    assert applied["text"].split("\n\n")[:2] == ["Paragraph 0", "Paragraph 1"]
+    assert mock_external_services["rewrite"].await_count == 8
+    assert (
+        mock_external_services["rewrite"].await_args.kwargs["llm_type"]
+        is LLMType.OPENAI
+    )
+
+
+def test_rewrite_compresses_long_merged_source(
+    client, mock_external_services, monkeypatch
+):
+    monkeypatch.setattr(rewrite_router, "REWRITE_SOURCE_MAX_TOKENS", 400)
+    monkeypatch.setattr(rewrite_router, "REWRITE_LENGTH_MODE", "map_reduce")
+    monkeypatch.setattr(extractors, "SUMMARIZE_CHUNK_CHARS", 400)
+    mock_rewrite = mock_external_services["rewrite"]
+    long_text = "这是一句很长的原文内容。" * 100
+    inputs = [{"id": "1", "type": "text", "content": long_text}]
+    data = {"inputs": json.dumps(inputs), "prompt": "改写", "llm_type": "gpt-5"}
+
+    response = client.post("/api/v1/rewrite", data=data)
+
+    assert response.status_code == 200
+    assert response.json()["original"].strip().endswith(long_text)
+    # 4 次分块摘要 + 1 次洗稿
+    assert mock_rewrite.await_count == 5
+    assert mock_rewrite.await_args.kwargs["source"] != response.json()["original"]
+
+
+def test_rewrite_stream_applies_token_budget(
+    client, mock_external_services, monkeypatch
+):
+    monkeypatch.setattr(rewrite_router, "REWRITE_SOURCE_MAX_TOKENS", 400)
+    monkeypatch.setattr(rewrite_router, "REWRITE_LENGTH_MODE", "truncate")
+    sources = []
+
+    async def fake_stream(**kwargs):
+        sources.append(kwargs["source"])
+        yield '{"rewritten": "ok", "summary": "s"}'
+
+    long_text = "这是一句很长的原文内容。" * 100
+    inputs = [{"id": "1", "type": "text", "content": long_text}]
+    data = {"inputs": json.dumps(inputs), "prompt": "改写", "llm_type": "gpt-5"}
+    with patch(
+        "app.services.llms.rewriting_client.stream_rewriting_result", fake_stream
+    ):
+        response = client.post("/api/v1/rewrite/stream", data=data)
+
+    assert response.status_code == 200
+    assert len(sources) == 1
+    assert len(sources[0]) < len(long_text)
+    assert extractors.estimate_source_length_tokens(sources[0], LLMType.OPENAI) <= 400
+    # 流式路径同样不额外调用模型做摘要
+    assert mock_external_services["rewrite"].await_count == 0
+
+
+@pytest.mark.asyncio
+async def test_token_budget_drives_truncation():
+    # 中文按 token 计数时远比 “4 字符 1 token” 的估算多
+    text = "中文内容测试。" * 200
+    tokens = extractors.estimate_source_length_tokens(text, LLMType.OPENAI)
+    assert tokens > len(text) / 4 * 2
+
+    applied = await extractors.apply_length_policy(
+        text, mode="truncate", max_chars=len(text), llm_type="gpt-5", max_tokens=100
+    )
+    assert applied["truncated"]
+    assert applied["orig_tokens"] == tokens
+    assert 90 <= applied["final_tokens"] <= 100
+    assert text.startswith(applied["text"])
@@ -0,0 +1,132 @@
+import asyncio
+import json
+import time
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from app.routers import miniprogram
+from app.services.llms.client_registry import provider_clients
+
+
+@pytest.fixture(autouse=True)
+def results_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(miniprogram, "RESULTS_DIR", str(tmp_path))
+    return tmp_path
+
+
+def _post_story(client):
+    return client.post(
+        "/api/v1/miniprogram/generate",
+        json={"api_key": "sk-test", "keywords": {"title": "小熊"}, "age": "3-5"},
+    )
+
+
+def test_generate_returns_job_before_story_is_ready(client):
+    async def slow_story(messages, api_key=None):
+        await asyncio.sleep(0.3)
+        return json.dumps({"title": "小熊睡觉", "rewritten_text": "从前有一只小熊。"})
+
+    with patch("app.routers.miniprogram.call_openai", side_effect=slow_story):
+        t0 = time.perf_counter()
+        response = _post_story(client)
+        assert time.perf_counter() - t0 < 0.3
+        body = response.json()
+        assert body["success"] is True
+        assert body["resultUrl"].endswith(
+            f"/api/v1/miniprogram/results/{body['jobId']}.json"
+        )
+
+        pending = client.get(f"/api/v1/miniprogram/results/{body['jobId']}.json")
+        assert pending.status_code == 202
+        assert pending.json() == {
+            "success": True,
+            "status": "pending",
+            "jobId": body["jobId"],
+        }
+
+        done = client.get(
+            f"/api/v1/miniprogram/results/{body['jobId']}.json", params={"wait": 5}
+        )
+
+    assert done.status_code == 200
+    result = done.json()
+    assert result["status"] == "done"
+    assert result["success"] is True
+    assert result["title"] == "小熊睡觉"
+    assert result["rewritten_text"] == "从前有一只小熊。"
+    assert result["age"] == "3-5"
+
+
+def test_story_http_call_does_not_block_the_event_loop(client, monkeypatch):
+    calls = []
+
+    async def slow_openai(request):
+        calls.append(json.loads(request.content))
+        await asyncio.sleep(0.5)
+        story = json.dumps({"title": "小熊睡觉", "rewritten_text": "从前有一只小熊。"})
+        return httpx.Response(200, json={"choices": [{"message": {"content": story}}]})
+
+    http_client = httpx.AsyncClient(transport=httpx.MockTransport(slow_openai))
+    monkeypatch.setattr(provider_clients, "get_http_client", lambda: http_client)
+
+    t0 = time.perf_counter()
+    job_id = _post_story(client).json()["jobId"]
+    # 模型请求仍在进行中，jobId 已返回
+    assert time.perf_counter() - t0 < 0.3
+
+    done = client.get(f"/api/v1/miniprogram/results/{job_id}.json", params={"wait": 5})
+
+    assert done.json()["status"] == "done"
+    assert done.json()["rewritten_text"] == "从前有一只小熊。"
+    assert calls[0]["messages"][0]["role"] == "system"
+
+
+def test_failed_generation_is_reported(client):
+    with patch("app.routers.miniprogram.call_openai", side_effect=RuntimeError("boom")):
+        job_id = _post_story(client).json()["jobId"]
+        response = client.get(
+            f"/api/v1/miniprogram/results/{job_id}.json", params={"wait": 5}
+        )
+
+    assert response.status_code == 500
+    assert response.json()["status"] == "failed"
+    assert "boom" in response.json()["error"]
+
+
+def test_stale_pending_job_is_reported_as_failed(client, results_dir):
+    (results_dir / "stale.json").write_text(
+        json.dumps({"success": True, "status": "pending", "jobId": "stale", "createdAt": 0}),
+        encoding="utf-8",
+    )
+    response = client.get("/api/v1/miniprogram/results/stale.json")
+    assert response.status_code == 500
+    assert response.json()["status"] == "failed"
+
+
+def test_unknown_job_is_not_found(client):
+    response = client.get("/api/v1/miniprogram/results/missing.json")
+    assert response.status_code == 404
+
+
+def test_wait_rejects_non_finite_values(client):
+    for value in ("nan", "inf", "-1"):
+        response = client.get(
+            "/api/v1/miniprogram/results/missing.json", params={"wait": value}
+        )
+        assert response.status_code == 422
+
+
+def test_shutdown_marks_running_jobs_failed(client, results_dir):
+    async def never_finishes(messages, api_key=None):
+        await asyncio.sleep(3600)
+
+    with patch("app.routers.miniprogram.call_openai", side_effect=never_finishes):
+        job_id = _post_story(client).json()["jobId"]
+        # 在应用的事件循环中执行 lifespan 关闭时的同一步骤
+        client.portal.call(miniprogram.shutdown_story_jobs)
+
+    data = json.loads((results_dir / f"{job_id}.json").read_text(encoding="utf-8"))
+    assert data["status"] == "failed"
+    assert not miniprogram._background_tasks
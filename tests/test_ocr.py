@@ -0,0 +1,70 @@
+import io
+
+import pytest
+from PIL import Image, ImageDraw
+
+from app.services import ocr as ocr_module
+from app.services import parsers
+from app.services.ocr import OcrService
+from app.services.parsers import split_image_tiles
+from app.services.workers import ExtractorPool
+
+
+def _striped_image(width, height, stripes):
+    """
+    生成白底长图：在 (y, 灰度) 处画一条 4 像素高的横线，灰度值即该“文本行”的内容。
+    """
+    image = Image.new("RGB", (width, height), "white")
+    draw = ImageDraw.Draw(image)
+    for y, value in stripes:
+        draw.rectangle((0, y, width - 1, y + 3), fill=(value, value, value))
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def _fake_recognize(image):
+    # 把每条横线识别为一行文本：中心纵坐标 + 灰度值
+    lines, start = [], None
+    for y in range(image.height + 1):
+        dark = y < image.height and image.getpixel((0, y))[0] < 250
+        if dark and start is None:
+            start = y
+        elif not dark and start is not None:
+            value = image.getpixel((0, start))[0]
+            lines.append(((start + y - 1) / 2, str(value)))
+            start = None
+    return lines
+
+
+def test_split_image_tiles_downscales_and_overlaps():
+    content = _striped_image(1000, 5000, [])
+    tiles = split_image_tiles(content, max_width=500, tile_aspect=1.5, overlap=40)
+
+    assert [(top, own_top, own_bottom) for _, top, own_top, own_bottom in tiles] == [
+        (0, 0, 750),
+        (710, 750, 1500),
+        (1460, 1500, 2250),
+        (2210, 2250, 2500),
+    ]
+    first = Image.open(io.BytesIO(tiles[0][0]))
+    assert first.size == (500, 790)
+
+
+@pytest.mark.asyncio
+async def test_tall_image_is_tiled_and_merged_in_reading_order(monkeypatch):
+    pool = ExtractorPool()
+    pool.max_workers = 0
+    monkeypatch.setattr(ocr_module, "extractor_pool", pool)
+    monkeypatch.setattr(ocr_module, "OCR_MAX_WIDTH", 0)
+    monkeypatch.setattr(ocr_module, "OCR_TILE_ASPECT", 1.5)
+    monkeypatch.setattr(ocr_module, "OCR_TILE_OVERLAP", 48)
+    monkeypatch.setattr(parsers, "_recognize", _fake_recognize)
+
+    # 部分横线落在分块的重叠区域内，应只输出一次
+    stripes = [(40 + 97 * i, i + 1) for i in range(20)]
+    service = OcrService()
+    text = await service.recognize(_striped_image(200, 2000, stripes))
+
+    assert text.split("\n") == [str(i + 1) for i in range(20)]
+    assert service.stats()["tiles"] == 7
@@ -0,0 +1,157 @@
+import io
+
+import pytest
+from pypdf import PdfWriter
+from pypdf.generic import (
+    DecodedStreamObject,
+    DictionaryObject,
+    NameObject,
+    NumberObject,
+)
+
+from app.core.exceptions import InvalidInputError
+from app.services.extractors import extract_pdf_pages, parse_page_range
+from app.services.workers import ExtractorPool
+
+
+def make_text_pdf(page_texts):
+    """
+    生成 PDF；page_texts 中为 None 的页只包含一张图片（模拟扫描页）。
+    """
+    writer = PdfWriter()
+    font = DictionaryObject(
+        {
+            NameObject("/Type"): NameObject("/Font"),
+            NameObject("/Subtype"): NameObject("/Type1"),
+            NameObject("/BaseFont"): NameObject("/Helvetica"),
+        }
+    )
+    for text in page_texts:
+        page = writer.add_blank_page(width=612, height=792)
+        if text is None:
+            _add_image(writer, page)
+            continue
+        page[NameObject("/Resources")] = DictionaryObject(
+            {
+                NameObject("/Font"): DictionaryObject(
+                    {NameObject("/F1"): writer._add_object(font)}
+                )
+            }
+        )
+        stream = DecodedStreamObject()
+        stream.set_data(f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode("latin-1"))
+        page[NameObject("/Contents")] = writer._add_object(stream)
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+def _add_image(writer, page):
+    image = DecodedStreamObject()
+    image.set_data(bytes(range(256)) * 16)
+    image.update(
+        {
+            NameObject("/Type"): NameObject("/XObject"),
+            NameObject("/Subtype"): NameObject("/Image"),
+            NameObject("/Width"): NumberObject(64),
+            NameObject("/Height"): NumberObject(64),
+            NameObject("/ColorSpace"): NameObject("/DeviceGray"),
+            NameObject("/BitsPerComponent"): NumberObject(8),
+        }
+    )
+    page[NameObject("/Resources")] = DictionaryObject(
+        {
+            NameObject("/XObject"): DictionaryObject(
+                {NameObject("/Im1"): writer._add_object(image)}
+            )
+        }
+    )
+    stream = DecodedStreamObject()
+    stream.set_data(b"q 64 0 0 64 72 600 cm /Im1 Do Q")
+    page[NameObject("/Contents")] = writer._add_object(stream)
+
+
+@pytest.fixture
+def thread_pool(monkeypatch):
+    # 单测中在线程里执行解析，避免启动进程
+    pool = ExtractorPool()
+    pool.max_workers = 0
+    monkeypatch.setattr("app.services.extractors.extractor_pool", pool)
+    monkeypatch.setattr("app.services.extractors.PDF_PAGES_PER_TASK", 2)
+    return pool
+
+
+def test_parse_page_range():
+    assert parse_page_range(None, 3) == [0, 1, 2]
+    assert parse_page_range("2", 5) == [1]
+    assert parse_page_range("2-3, 5", 5) == [1, 2, 4]
+    assert parse_page_range("4-", 6) == [3, 4, 5]
+    assert parse_page_range("3-100", 4) == [2, 3]
+    with pytest.raises(InvalidInputError):
+        parse_page_range("b-a", 4)
+    with pytest.raises(InvalidInputError):
+        parse_page_range("10-12", 4)
+
+
+@pytest.mark.asyncio
+async def test_extract_pages_in_order_with_timings(thread_pool):
+    content = make_text_pdf([f"Page {i}" for i in range(1, 8)])
+    result = await extract_pdf_pages(content, page_range="2-6", max_chars=0)
+
+    assert result["total_pages"] == 7
+    assert [p["page"] for p in result["pages"]] == [2, 3, 4, 5, 6]
+    assert result["text"].split("\n") == [f"Page {i}" for i in range(2, 7)]
+    assert all(p["ms"] >= 0 for p in result["pages"])
+    assert result["truncated"] is False
+
+
+@pytest.mark.asyncio
+async def test_extract_stops_at_char_budget(thread_pool):
+    content = make_text_pdf([f"Page {i:03d}" for i in range(1, 41)])
+    result = await extract_pdf_pages(content, max_chars=20)
+
+    assert result["truncated"] is True
+    assert len(result["text"]) <= 20
+    # 预算在第 3 页达到，后续批次不再提取
+    assert len(result["pages"]) < 40
+    assert result["text"].startswith("Page 001\nPage 002")
+
+
+@pytest.mark.asyncio
+async def test_scanned_pages_are_ocred_within_budget(thread_pool, monkeypatch):
+    ocr_inputs = []
+
+    def fake_ocr(content):
+        ocr_inputs.append(content)
+        return f"OCR {len(ocr_inputs)}"
+
+    monkeypatch.setattr("app.services.parsers.ocr_image", fake_ocr)
+    monkeypatch.setattr("app.services.extractors._rapid_ocr_available", True)
+    monkeypatch.setattr("app.services.extractors.PDF_OCR_MAX_PAGES", 2)
+    content = make_text_pdf(["Page 1", None, None, "Page 4", None])
+    result = await extract_pdf_pages(content, max_chars=0)
+
+    assert [p["source"] for p in result["pages"]] == [
+        "text",
+        "ocr",
+        "ocr",
+        "text",
+        "text",
+    ]
+    assert result["text"].split("\n") == ["Page 1", "OCR 1", "OCR 2", "Page 4"]
+    assert result["text_pages"] == 2
+    assert result["ocr_pages"] == 2
+    assert result["ocr_skipped_pages"] == 1
+    # 交给 OCR 的是页面内嵌图片的编码字节
+    assert all(isinstance(data, bytes) and data for data in ocr_inputs)
+
+
+@pytest.mark.asyncio
+async def test_scanned_pages_count_as_skipped_without_ocr(thread_pool, monkeypatch):
+    monkeypatch.setattr("app.services.extractors._rapid_ocr_available", False)
+    content = make_text_pdf(["Page 1", None, None])
+    result = await extract_pdf_pages(content, max_chars=0)
+
+    assert result["text"] == "Page 1"
+    assert result["ocr_pages"] == 0
+    assert result["ocr_skipped_pages"] == 2
@@ -0,0 +1,67 @@
+import os
+
+import yaml
+
+from app.services.llms.prompt_store import PromptStore
+
+
+def _write_prompt(path, text, mtime_ns):
+    path.write_text(f"system_prompt: |\n  {text}\n", encoding="utf-8")
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_prompt_is_cached_until_mtime_changes(tmp_path):
+    prompt_file = tmp_path / "openai_system_prompt.yaml"
+    _write_prompt(prompt_file, "first", 1_000_000_000)
+    store = PromptStore(prompts_dir=str(tmp_path))
+
+    assert store.get("openai").strip() == "first"
+    v1 = store.get_version("openai")
+
+    # 内容变化但 mtime 未变：继续使用缓存
+    _write_prompt(prompt_file, "second", 1_000_000_000)
+    assert store.get("openai").strip() == "first"
+
+    # mtime 变化：重新加载，版本号随之变化
+    _write_prompt(prompt_file, "second", 2_000_000_000)
+    assert store.get("openai").strip() == "second"
+    assert store.get_version("openai") != v1
+
+
+def test_failed_reload_keeps_previous_prompt(tmp_path):
+    prompt_file = tmp_path / "qwen_system_prompt.yaml"
+    _write_prompt(prompt_file, "stable", 1_000_000_000)
+    store = PromptStore(prompts_dir=str(tmp_path))
+    version = store.get_version("qwen")
+
+    prompt_file.write_text("system_prompt: [unclosed", encoding="utf-8")
+    os.utime(prompt_file, ns=(2_000_000_000, 2_000_000_000))
+
+    assert store.get("qwen").strip() == "stable"
+    assert store.get_version("qwen") == version
+
+
+def test_failed_reload_is_not_retried_until_file_changes(tmp_path, monkeypatch):
+    prompt_file = tmp_path / "gemini_system_prompt.yaml"
+    _write_prompt(prompt_file, "stable", 1_000_000_000)
+    store = PromptStore(prompts_dir=str(tmp_path))
+    store.get("gemini")
+
+    prompt_file.write_text("system_prompt: [unclosed", encoding="utf-8")
+    os.utime(prompt_file, ns=(2_000_000_000, 2_000_000_000))
+    loads = []
+    original = yaml.safe_load
+
+    def counting_load(stream):
+        loads.append(1)
+        return original(stream)
+
+    monkeypatch.setattr(yaml, "safe_load", counting_load)
+    for _ in range(3):
+        assert store.get("gemini").strip() == "stable"
+    assert len(loads) == 1
+
+    # 修复后的文件 mtime 变化，重新加载
+    _write_prompt(prompt_file, "fixed", 3_000_000_000)
+    assert store.get("gemini").strip() == "fixed"
+    assert len(loads) == 2
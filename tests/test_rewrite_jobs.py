@@ -0,0 +1,187 @@
+import asyncio
+import json
+import os
+import time
+
+import pytest
+
+from app.services import rewrite_jobs
+from app.services.rewrite_jobs import (
+    JOB_DONE,
+    JOB_FAILED,
+    JOB_QUEUED,
+    RewriteJobQueue,
+    RewriteJobStore,
+)
+from app.core.exceptions import ContentExtractionError, ServiceUnavailableError
+
+
+def _wait_for_job(client, job_id, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        body = client.get(f"/api/v1/rewrite/jobs/{job_id}").json()
+        if body["status"] in (JOB_DONE, JOB_FAILED):
+            return body
+        time.sleep(0.02)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def test_rewrite_job_with_file_completes(client):
+    inputs = [
+        {"id": "1", "type": "text", "content": "Hello World"},
+        {"id": "2", "type": "file", "contentKey": "file_2"},
+    ]
+    data = {"inputs": json.dumps(inputs), "prompt": "Rewrite", "llm_type": "gpt-5"}
+    files = {"file_2": ("notes.txt", b"Uploaded notes", "text/plain")}
+
+    response = client.post("/api/v1/rewrite/jobs", data=data, files=files)
+
+    assert response.status_code == 202
+    created = response.json()
+    assert created["status"] == JOB_QUEUED
+    body = _wait_for_job(client, created["job_id"])
+    assert body["status"] == JOB_DONE
+    assert "Uploaded notes" in body["result"]["original"]
+    assert body["result"]["rewritten"] == "Rewritten content by Mock LLM"
+    for stage in ("parse_ms", "queue_ms", "extract_ms", "llm_ms", "total_ms"):
+        assert stage in body["timings"]
+    # 任务结束后暂存的上传文件被清理
+    assert not os.path.exists(rewrite_jobs.job_files_dir(created["job_id"]))
+
+
+def test_rewrite_job_validates_before_queueing(client):
+    data = {"inputs": "", "prompt": "Test", "llm_type": "gpt-5"}
+    response = client.post("/api/v1/rewrite/jobs", data=data)
+    assert response.status_code == 400
+
+
+def test_rewrite_job_not_found(client):
+    response = client.get("/api/v1/rewrite/jobs/missing")
+    assert response.status_code == 404
+    assert response.json()["code"] == "NOT_FOUND"
+
+
+def test_unfinished_jobs_resume_after_restart(tmp_path):
+    db_path = str(tmp_path / "jobs.sqlite3")
+    store = RewriteJobStore(db_path)
+    store.create("queued-job", {"n": 1})
+    store.create("running-job", {"n": 2})
+    store.update("running-job", "running", {"queue_ms": 1.0})
+    store.create("done-job", {"n": 3})
+    store.update("done-job", JOB_DONE, {}, {"ok": True})
+    store.close()
+
+    seen = []
+
+    async def handler(request):
+        seen.append(request["n"])
+        if request["n"] == 2:
+            raise ContentExtractionError("boom")
+        return {"n": request["n"]}, {"extract_ms": 1.0}
+
+    async def main():
+        queue = RewriteJobQueue(db_path, workers=1)
+        await queue.start(handler)
+        await queue._queue.join()
+        jobs = {
+            job_id: await queue.get(job_id) for job_id in ("queued-job", "running-job")
+        }
+        await queue.shutdown()
+        return jobs
+
+    jobs = asyncio.run(main())
+
+    assert seen == [1, 2]
+    assert jobs["queued-job"]["status"] == JOB_DONE
+    assert jobs["queued-job"]["result"] == {"n": 1}
+    assert jobs["running-job"]["status"] == JOB_FAILED
+    assert jobs["running-job"]["error"]["code"] == "CONTENT_EXTRACTION_ERROR"
+
+
+def _job_dirs():
+    root = rewrite_jobs.REWRITE_JOB_FILES_DIR
+    return set(os.listdir(root)) if os.path.isdir(root) else set()
+
+
+def test_full_queue_rejects_new_jobs(client, monkeypatch):
+    monkeypatch.setattr(rewrite_jobs.rewrite_job_queue, "max_queued", 0)
+    inputs = [{"id": "1", "type": "file", "contentKey": "f1"}]
+    data = {"inputs": json.dumps(inputs), "prompt": "Rewrite", "llm_type": "gpt-5"}
+    files = {"f1": ("notes.txt", b"Uploaded notes", "text/plain")}
+    before = _job_dirs()
+
+    response = client.post("/api/v1/rewrite/jobs", data=data, files=files)
+
+    assert response.status_code == 503
+    assert response.json()["code"] == "SERVICE_UNAVAILABLE"
+    # 未能排队的任务不留下上传文件
+    assert _job_dirs() == before
+
+
+def test_submit_requires_running_workers(tmp_path):
+    queue = RewriteJobQueue(str(tmp_path / "jobs.sqlite3"))
+
+    with pytest.raises(ServiceUnavailableError):
+        asyncio.run(queue.submit("job", {}))
+
+
+def test_job_interrupted_too_often_is_failed_without_running(tmp_path):
+    db_path = str(tmp_path / "jobs.sqlite3")
+    store = RewriteJobStore(db_path)
+    store.create("crashy-job", {"n": 1})
+    store.create("fresh-job", {"n": 2})
+    # 模拟前几次执行时进程退出：每次启动都认领过一次但未结束
+    for _ in range(3):
+        store.claim("crashy-job", {})
+    store.close()
+
+    seen = []
+
+    async def handler(request):
+        seen.append(request["n"])
+        return {"n": request["n"]}, {}
+
+    async def main():
+        queue = RewriteJobQueue(db_path, workers=1, max_attempts=3)
+        await queue.start(handler)
+        await queue._queue.join()
+        jobs = {
+            job_id: await queue.get(job_id) for job_id in ("crashy-job", "fresh-job")
+        }
+        await queue.shutdown()
+        return jobs
+
+    jobs = asyncio.run(main())
+
+    assert seen == [2]
+    assert jobs["crashy-job"]["status"] == JOB_FAILED
+    assert jobs["crashy-job"]["error"]["details"] == {"attempts": 3}
+    assert jobs["fresh-job"]["status"] == JOB_DONE
+    assert jobs["fresh-job"]["attempts"] == 1
+
+
+def test_expired_jobs_are_pruned_while_running(tmp_path, monkeypatch):
+    monkeypatch.setattr(rewrite_jobs, "REWRITE_JOB_RETENTION", 0)
+    monkeypatch.setattr(rewrite_jobs, "REWRITE_JOB_PRUNE_INTERVAL", 0)
+
+    async def handler(request):
+        return {"ok": True}, {}
+
+    async def main():
+        queue = RewriteJobQueue(str(tmp_path / "jobs.sqlite3"), workers=1)
+        await queue.start(handler)
+        await queue.submit("old-job", {})
+        await queue._queue.join()
+        # worker 在任务结束后清理，不必等到下次启动
+        for _ in range(100):
+            if queue.pruned:
+                break
+            await asyncio.sleep(0.01)
+        job = await queue.get("old-job")
+        await queue.shutdown()
+        return queue.pruned, job
+
+    pruned, job = asyncio.run(main())
+
+    assert pruned == 1
+    assert job is None
@@ -0,0 +1,126 @@
+import asyncio
+import os
+import re
+import subprocess
+import sys
+from unittest.mock import AsyncMock
+
+import httpx
+from fastapi.testclient import TestClient
+
+from app.configs.settings import GEMINI_BASE_URL, OPENAI_BASE_URL, QWEN_BASE_URL
+from app.main import app
+from app.services.llms import client_registry
+from app.services.llms.client_registry import _open_connection, provider_clients
+
+# `import app.main` 的耗时预算（毫秒）。当前约 0.6s（其中 FastAPI 自身约 0.5s），
+# 重型依赖被提前导入时会回到 2s 以上
+IMPORT_TIME_BUDGET_MS = float(os.getenv("IMPORT_TIME_BUDGET_MS", "1500"))
+
+# 只允许在首次使用时导入的重型依赖
+LAZY_MODULES = [
+    "yt_dlp",
+    "youtube_transcript_api",
+    "rapidocr_onnxruntime",
+    "numpy",
+    "dashscope",
+    "google.genai",
+    "openai",
+    "tokenizers",
+    "pypdf",
+    "docx",
+    "readability",
+]
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+_LINE_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|(\s+)(\S+)$")
+
+
+def _import_app_main():
+    """
+    以 -X importtime 导入 app.main，返回 {模块名: 累计耗时微秒}。
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules = {}
+    for line in result.stderr.splitlines():
+        match = _LINE_RE.match(line)
+        if match:
+            modules[match.group(4)] = int(match.group(2))
+    return modules
+
+
+def test_heavy_dependencies_are_imported_lazily():
+    modules = _import_app_main()
+    eager = [
+        name
+        for name in modules
+        if any(name == lazy or name.startswith(lazy + ".") for lazy in LAZY_MODULES)
+    ]
+    assert eager == []
+
+
+def test_import_time_within_budget():
+    # 取两次中的较快一次，减少首次编译 .pyc 与机器抖动的影响
+    elapsed_ms = min(_import_app_main()["app.main"] for _ in range(2)) / 1000
+    assert elapsed_ms <= IMPORT_TIME_BUDGET_MS, (
+        f"import app.main took {elapsed_ms:.0f}ms "
+        f"(budget {IMPORT_TIME_BUDGET_MS:.0f}ms)"
+    )
+
+
+def test_lifespan_creates_provider_clients_once_and_closes_them(monkeypatch):
+    for key in ("OPENAI_API_KEY", "DASHSCOPE_API_KEY", "GEMINI_API_KEY"):
+        monkeypatch.setenv(key, "test-key")
+    monkeypatch.setattr(client_registry, "PROVIDER_WARMUP", True)
+    open_connection = AsyncMock()
+    monkeypatch.setattr(client_registry, "_open_connection", open_connection)
+
+    with TestClient(app):
+        openai_client = provider_clients.get_openai_client()
+        qwen_client = provider_clients.get_qwen_client()
+        gemini_client = provider_clients.get_gemini_client()
+        gemini_transport = provider_clients._gemini_transport
+        http_clients = [
+            provider_clients.get_http_client(),
+            provider_clients._openai_http_client,
+            provider_clients._qwen_http_client,
+        ]
+        # 启动时已创建，请求路径上的 get_* 拿到的是同一个实例
+        assert provider_clients.get_openai_client() is openai_client
+        assert provider_clients.get_qwen_client() is qwen_client
+        assert provider_clients.get_gemini_client() is gemini_client
+        gemini_aclose = AsyncMock(wraps=gemini_client.aio.aclose)
+        monkeypatch.setattr(gemini_client.aio, "aclose", gemini_aclose)
+
+    # Gemini 的预热经由 aio client 使用的同一个 transport
+    warmed = {call.args[1]: call.args[0] for call in open_connection.await_args_list}
+    assert warmed == {
+        OPENAI_BASE_URL: http_clients[1],
+        QWEN_BASE_URL: http_clients[2],
+        GEMINI_BASE_URL: gemini_transport,
+    }
+
+    assert all(client.is_closed for client in http_clients)
+    gemini_aclose.assert_awaited_once()
+    assert provider_clients._openai_client is None
+    assert provider_clients._gemini_client is None
+
+
+def test_warmup_through_transport_sends_head_request():
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(404)
+
+    asyncio.run(_open_connection(httpx.MockTransport(handler), "https://example.com"))
+
+    assert [(r.method, str(r.url)) for r in requests] == [
+        ("HEAD", "https://example.com")
+    ]
@@ -0,0 +1,20 @@
+from app.services.llms.stream_parser import JSONFieldStreamParser
+
+
+def _parse(raw):
+    parser = JSONFieldStreamParser({"rewritten": "rewritten", "summary": "summary"})
+    # 逐字符喂入，覆盖转义序列被拆到多个增量中的情况
+    text = "".join(
+        t for ch in raw for field, t in parser.feed(ch) if field == "rewritten"
+    )
+    return text
+
+
+def test_surrogate_pair_is_combined():
+    assert _parse('{"rewritten": "a\\ud83d\\ude00b"}') == "a\U0001f600b"
+
+
+def test_lone_surrogates_become_replacement_char():
+    text = _parse('{"rewritten": "a\\udc00b\\ud83dc"}')
+    assert text == "a�b�c"
+    text.encode("utf-8")
@@ -0,0 +1,94 @@
+import base64
+import os
+
+import pytest
+
+from app.schemas.rewrite_schema import LLMType
+from app.services.tokens import TokenCounter
+
+
+def test_profiles_follow_provider():
+    counter = TokenCounter()
+    assert counter.profile(LLMType.OPENAI).name == "openai"
+    assert counter.profile(LLMType.QWEN).name == "qwen"
+    assert counter.profile("gemini-2.5-flash").name == "gemini"
+    assert counter.profile("gpt-4o-mini").name == "openai"
+    assert counter.profile(None).name == "openai"
+
+
+def test_heuristic_counts_cjk_per_char(tmp_path):
+    # 词表缓存目录为空：不联网，回退到经验系数估算
+    counter = TokenCounter(cache_dir=str(tmp_path))
+    assert counter.count("你好世界" * 10, LLMType.GEMINI) == 40
+    assert counter.count("abcd" * 10, LLMType.GEMINI) == 10
+    assert counter.stats()["backends"]["gemini"] == "heuristic"
+
+
+def test_repeated_strings_are_memoized(tmp_path):
+    counter = TokenCounter(cache_dir=str(tmp_path))
+    system_prompt = "你是一名忠实改写器。" * 20
+    for _ in range(3):
+        counter.count(system_prompt, LLMType.QWEN)
+    assert counter.memo_hits == 2
+    assert counter.memo_misses == 1
+
+
+def test_tiktoken_vocab_is_read_from_cache_dir(tmp_path, monkeypatch):
+    pytest.importorskip("tiktoken")
+    monkeypatch.delenv("TIKTOKEN_CACHE_DIR", raising=False)
+    # 用只含单字节 token 的极小词表代替真实的 o200k_base，验证离线加载路径
+    vocab = tmp_path / "tiktoken" / "o200k_base.tiktoken"
+    vocab.parent.mkdir()
+    vocab.write_text(
+        "".join(
+            f"{base64.b64encode(bytes([i])).decode()} {i}\n" for i in range(256)
+        )
+    )
+    counter = TokenCounter(cache_dir=str(tmp_path))
+    assert counter.count("abc", LLMType.OPENAI) == 3
+    assert counter.stats()["backends"]["openai"] == "tiktoken:o200k_base"
+    # 不修改进程级环境变量
+    assert "TIKTOKEN_CACHE_DIR" not in os.environ
+
+
+def test_qwen_tokenizer_json_is_read_from_cache_dir(tmp_path):
+    tokenizers = pytest.importorskip("tokenizers")
+    # 用极小的 WordLevel 词表代替真实的 Qwen tokenizer.json，验证离线加载路径
+    tokenizer = tokenizers.Tokenizer(
+        tokenizers.models.WordLevel({"[UNK]": 0, "你好": 1, "世界": 2}, unk_token="[UNK]")
+    )
+    tokenizer.pre_tokenizer = tokenizers.pre_tokenizers.Whitespace()
+    (tmp_path / "qwen").mkdir()
+    tokenizer.save(str(tmp_path / "qwen" / "tokenizer.json"))
+
+    counter = TokenCounter(cache_dir=str(tmp_path))
+    assert counter.count("你好 世界 你好", LLMType.QWEN) == 3
+    assert counter.stats()["backends"]["qwen"] == "hf:qwen/tokenizer.json"
+
+
+def test_memo_does_not_retain_source_text(tmp_path):
+    counter = TokenCounter(cache_dir=str(tmp_path))
+    text = "需要计数的原文内容。" * 50
+    counter.count(text, LLMType.QWEN)
+    assert all(text not in key for key in counter._memo)
+
+
+def test_truncate_uses_few_tokenizer_calls(tmp_path, monkeypatch):
+    counter = TokenCounter(cache_dir=str(tmp_path))
+    calls = []
+    original = counter._count
+
+    def counting(profile, text):
+        calls.append(len(text))
+        return original(profile, text)
+
+    monkeypatch.setattr(counter, "_count", counting)
+    text = ("中文内容。" * 50 + "English words here. " * 40) * 40
+
+    out = counter.truncate(text, 5000, LLMType.GEMINI)
+
+    assert text.startswith(out)
+    assert original(counter.profile(LLMType.GEMINI), out) <= 5000
+    assert original(counter.profile(LLMType.GEMINI), text[: len(out) + 1]) > 5000
+    # 比例估算后只需少量分词，远少于对全文长度二分所需的次数
+    assert len(calls) <= 12
@@ -0,0 +1,149 @@
+import io
+import json
+import os
+
+from typing import Annotated
+
+import pytest
+from fastapi import FastAPI, Form
+from starlette.datastructures import Headers, UploadFile
+from starlette.applications import Starlette
+from starlette.formparsers import MultiPartParser
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app.middleware.body_limit import BodySizeLimitMiddleware
+
+from app.core.exceptions import PayloadTooLargeError
+from app.services import uploads
+from app.services.uploads import SizeLimitedMultiPartParser, spooled_upload
+
+
+def _upload(content: bytes, filename: str = "doc.pdf") -> UploadFile:
+    return UploadFile(
+        file=io.BytesIO(content),
+        size=len(content),
+        filename=filename,
+        headers=Headers({"content-type": "application/octet-stream"}),
+    )
+
+
+@pytest.mark.asyncio
+async def test_small_upload_is_passed_as_bytes(monkeypatch):
+    monkeypatch.setattr(uploads, "UPLOAD_SPOOL_THRESHOLD", 1024)
+    async with spooled_upload(_upload(b"small")) as source:
+        assert source == b"small"
+
+
+@pytest.mark.asyncio
+async def test_large_upload_is_spooled_to_named_file(monkeypatch):
+    monkeypatch.setattr(uploads, "UPLOAD_SPOOL_THRESHOLD", 1024)
+    content = os.urandom(4096)
+    async with spooled_upload(_upload(content)) as source:
+        assert isinstance(source, str) and source.endswith(".pdf")
+        with open(source, "rb") as f:
+            assert f.read() == content
+    assert not os.path.exists(source)
+
+
+def test_oversized_file_is_rejected(client, monkeypatch):
+    monkeypatch.setattr(uploads, "UPLOAD_MAX_FILE_BYTES", 100)
+    data = {
+        "inputs": json.dumps([{"type": "file", "contentKey": "f1"}]),
+        "llm_type": "gpt-5",
+    }
+    files = {"f1": ("big.pdf", b"x" * 1000, "application/pdf")}
+    response = client.post("/api/v1/rewrite", data=data, files=files)
+    assert response.status_code == 413
+    assert response.json()["code"] == "PAYLOAD_TOO_LARGE"
+
+
+@pytest.mark.asyncio
+async def test_oversized_file_stops_parsing_while_streaming(monkeypatch):
+    monkeypatch.setattr(uploads, "UPLOAD_MAX_FILE_BYTES", 1000)
+    sent = []
+
+    async def body():
+        yield (
+            b"--b\r\n"
+            b'Content-Disposition: form-data; name="f1"; filename="big.pdf"\r\n'
+            b"Content-Type: application/pdf\r\n\r\n"
+        )
+        for _ in range(100):
+            sent.append(1)
+            yield b"x" * 300
+        yield b"\r\n--b--\r\n"
+
+    parser = SizeLimitedMultiPartParser(
+        Headers({"content-type": "multipart/form-data; boundary=b"}), body()
+    )
+    with pytest.raises(PayloadTooLargeError) as exc_info:
+        await parser.parse()
+
+    assert exc_info.value.details["filename"] == "big.pdf"
+    # 超限后立即中止，不再读取（及落盘）剩余的请求体
+    assert len(sent) == 4
+
+
+def test_oversized_request_is_rejected_before_parsing():
+    parsed = []
+
+    async def endpoint(request):
+        parsed.append(await request.form())
+        return JSONResponse({"ok": True})
+
+    inner = Starlette(routes=[Route("/", endpoint, methods=["POST"])])
+    with TestClient(BodySizeLimitMiddleware(inner, max_bytes=500)) as c:
+        files = {"f1": ("big.pdf", b"x" * 1000, "application/pdf")}
+        response = c.post("/", files=files)
+        assert response.status_code == 413
+        assert response.json()["code"] == "PAYLOAD_TOO_LARGE"
+        assert parsed == []
+
+        response = c.post("/", files={"f1": ("ok.pdf", b"x" * 10, "application/pdf")})
+        assert response.status_code == 200
+
+
+def test_multipart_is_parsed_once(client, monkeypatch):
+    parses = []
+    original_parse = MultiPartParser.parse
+
+    async def counting_parse(self):
+        parses.append(1)
+        return await original_parse(self)
+
+    monkeypatch.setattr(MultiPartParser, "parse", counting_parse)
+    data = {
+        "inputs": json.dumps([{"type": "file", "contentKey": "f1"}]),
+        "llm_type": "gpt-5",
+    }
+    files = {"f1": ("a.pdf", b"%PDF-1.4", "application/pdf")}
+    response = client.post("/api/v1/rewrite", data=data, files=files)
+    assert response.status_code == 200
+    assert len(parses) == 1
+
+
+def test_oversized_chunked_request_returns_error_response():
+    app = FastAPI()
+
+    @app.post("/")
+    async def endpoint(text: Annotated[str, Form()]):
+        return {"ok": True}
+
+    def chunks():
+        for _ in range(10):
+            yield b"text=" + b"x" * 100
+
+    with TestClient(BodySizeLimitMiddleware(app, max_bytes=500)) as c:
+        # 生成器请求体以分块传输发送，没有 Content-Length
+        response = c.post(
+            "/",
+            content=chunks(),
+            headers={"content-type": "application/x-www-form-urlencoded"},
+        )
+    assert response.status_code == 413
+    body = response.json()
+    assert body["code"] == "PAYLOAD_TOO_LARGE"
+    assert body["success"] is False
+    assert body["details"]["max_bytes"] == 500
@@ -0,0 +1,108 @@
+import httpx
+import pytest
+
+from app.core.exceptions import ContentExtractionError
+from app.services import url_fetcher as url_fetcher_module
+from app.services.url_fetcher import UrlFetcher
+
+HTML = "<html><body><article><p>Cached article body</p></article></body></html>"
+
+
+@pytest.fixture
+def fetcher(monkeypatch):
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(
+            200,
+            text=HTML,
+            headers={"ETag": '"v1"', "Content-Type": "text/html; charset=utf-8"},
+        )
+
+    parsed = []
+
+    async def fake_run(fn, html):
+        parsed.append(html)
+        return "Cached article body"
+
+    monkeypatch.setattr(url_fetcher_module.extractor_pool, "run", fake_run)
+    fetcher = UrlFetcher()
+    fetcher._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    fetcher.requests = requests
+    fetcher.parsed = parsed
+    return fetcher
+
+
+@pytest.mark.asyncio
+async def test_fresh_entry_skips_network(fetcher):
+    url = "https://example.com/news"
+    assert await fetcher.fetch_text(url) == "Cached article body"
+    assert await fetcher.fetch_text(url) == "Cached article body"
+
+    assert len(fetcher.requests) == 1
+    assert len(fetcher.parsed) == 1
+
+
+@pytest.mark.asyncio
+async def test_stale_entry_revalidates_with_etag(fetcher, monkeypatch):
+    monkeypatch.setattr(url_fetcher_module, "URL_CACHE_TTL", 0)
+    url = "https://example.com/news"
+
+    await fetcher.fetch_text(url)
+    assert await fetcher.fetch_text(url) == "Cached article body"
+
+    assert len(fetcher.requests) == 2
+    assert fetcher.requests[1].headers["If-None-Match"] == '"v1"'
+    # 304 时不再重新解析
+    assert len(fetcher.parsed) == 1
+    assert fetcher.stats()["revalidated"] == 1
+
+
+def _fetcher_for(monkeypatch, handler):
+    async def fake_run(fn, html):
+        return html
+
+    monkeypatch.setattr(url_fetcher_module.extractor_pool, "run", fake_run)
+    fetcher = UrlFetcher()
+    fetcher._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return fetcher
+
+
+@pytest.mark.asyncio
+async def test_non_html_content_type_is_rejected(monkeypatch):
+    fetcher = _fetcher_for(
+        monkeypatch,
+        lambda request: httpx.Response(
+            200, content=b"\x00" * 1024, headers={"Content-Type": "video/mp4"}
+        ),
+    )
+    with pytest.raises(ContentExtractionError):
+        await fetcher.fetch_text("https://example.com/video.mp4")
+
+
+@pytest.mark.asyncio
+async def test_body_is_capped(monkeypatch):
+    monkeypatch.setattr(url_fetcher_module, "URL_FETCH_MAX_BYTES", 10_000)
+    fetcher = _fetcher_for(
+        monkeypatch,
+        lambda request: httpx.Response(
+            200, content=b"a" * 50_000, headers={"Content-Type": "text/html"}
+        ),
+    )
+    text = await fetcher.fetch_text("https://example.com/huge")
+    assert len(text) == 10_000
+
+
+@pytest.mark.asyncio
+async def test_charset_from_meta_tag(monkeypatch):
+    body = '<html><head><meta charset="gb2312"></head><body>中文正文</body></html>'
+    fetcher = _fetcher_for(
+        monkeypatch,
+        lambda request: httpx.Response(
+            200, content=body.encode("gbk"), headers={"Content-Type": "text/html"}
+        ),
+    )
+    assert "中文正文" in await fetcher.fetch_text("https://example.com/gbk")
@@ -0,0 +1,88 @@
+import asyncio
+import io
+
+import pytest
+
+from app.core.exceptions import ContentExtractionError
+from app.services import workers
+from app.services.parsers import parse_docx
+from app.services.workers import ExtractorPool
+
+
+def burn_cpu() -> int:
+    # 模拟病态文档：持续占用 CPU
+    total = 0
+    while True:
+        total += 1
+
+
+def _make_docx(paragraphs):
+    import docx
+
+    document = docx.Document()
+    for text in paragraphs:
+        document.add_paragraph(text)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def pool():
+    pool = ExtractorPool()
+    pool.max_workers = 1
+    yield pool
+    pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_pool_runs_parser_in_worker_process(pool):
+    content = _make_docx(["第一段", "Second paragraph"])
+
+    result = await pool.run(parse_docx, content)
+
+    assert result == "第一段\nSecond paragraph"
+    stats = pool.stats()
+    assert stats["tasks"] == 1
+    assert stats["max_exec_ms"] > 0
+
+
+@pytest.mark.asyncio
+async def test_pool_kills_task_over_cpu_time_limit(pool, monkeypatch):
+    if workers.resource is None:
+        pytest.skip("RLIMIT_CPU is only available on POSIX")
+    monkeypatch.setattr(workers, "EXTRACTOR_CPU_TIME_LIMIT", 1)
+
+    with pytest.raises(ContentExtractionError):
+        await pool.run(burn_cpu)
+
+    # worker 在超限后仍可继续处理任务
+    assert await pool.run(parse_docx, _make_docx(["ok"])) == "ok"
+    assert pool.stats()["failures"] == 1
+
+
+def sleep_forever() -> None:
+    # 模拟卡死的任务：不占 CPU，只能靠整体超时终止
+    import time
+
+    while True:
+        time.sleep(1)
+
+
+@pytest.mark.asyncio
+async def test_pool_restarts_once_when_concurrent_tasks_hang(pool, monkeypatch):
+    pool.max_workers = 2
+    monkeypatch.setattr(workers, "EXTRACTOR_TASK_TIMEOUT", 1)
+    pool.start()
+    old_executor = pool._executor
+
+    results = await asyncio.gather(
+        pool.run(sleep_forever), pool.run(sleep_forever), return_exceptions=True
+    )
+
+    assert all(isinstance(r, ContentExtractionError) for r in results)
+    # 同一旧池上的任务相继失败，只触发一次重建，新池不会被再次终止
+    assert pool.stats()["restarts"] == 1
+    assert pool._executor is not None and pool._executor is not old_executor
+    monkeypatch.setattr(workers, "EXTRACTOR_TASK_TIMEOUT", 30)
+    assert await pool.run(parse_docx, _make_docx(["ok"])) == "ok"
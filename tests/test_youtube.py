@@ -0,0 +1,206 @@
+import asyncio
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock
+
+import httpx
+import pytest
+
+from app.core.exceptions import ContentExtractionError
+from app.services import extractors, youtube_probe
+from app.services.llms.client_registry import provider_clients
+
+FIXTURES = Path(__file__).parent / "fixtures" / "youtube"
+
+URL = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+PROBE = {
+    "videoId": "dQw4w9WgXcQ",
+    "title": "Video",
+    "duration": 212,
+    "is_live": False,
+    "availability": "public",
+    "age_limit": 0,
+}
+
+
+@pytest.fixture
+def youtube_calls(monkeypatch):
+    probe = AsyncMock(return_value=PROBE)
+    fetch = AsyncMock(
+        return_value={
+            "text": "[Music] hello\nhello\nworld",
+            "transcript_type": "human",
+            "lang": "en",
+            "orig_len": 20,
+        }
+    )
+    monkeypatch.setattr(extractors, "probe_youtube_basic_info", probe)
+    monkeypatch.setattr(extractors, "fetch_youtube_transcript", fetch)
+    return probe, fetch
+
+
+@pytest.mark.asyncio
+async def test_repeat_submission_skips_network(youtube_calls):
+    probe, fetch = youtube_calls
+    first = await extractors.ingest_youtube_url_v1(URL)
+    second = await extractors.ingest_youtube_url_v1(URL)
+
+    assert first["text"] == second["text"] == "hello\nworld"
+    assert first["meta"]["cached"] is False
+    assert second["meta"]["cached"] is True
+    assert second["meta"]["title"] == "Video"
+    assert second["meta"]["lang"] == "en"
+    assert probe.call_count == 1
+    assert fetch.await_count == 1
+
+    # 不同的语言偏好单独缓存
+    await extractors.ingest_youtube_url_v1(URL, prefer_langs=["ja"])
+    assert fetch.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_no_captions_is_cached_briefly(youtube_calls):
+    _, fetch = youtube_calls
+    fetch.side_effect = ContentExtractionError(
+        "该视频无可用字幕", details={"reason": "no_captions"}
+    )
+    for _ in range(2):
+        with pytest.raises(ContentExtractionError, match="无可用字幕"):
+            await extractors.ingest_youtube_url_v1(URL)
+    assert fetch.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_transient_failures_are_not_cached(youtube_calls):
+    _, fetch = youtube_calls
+    fetch.side_effect = ContentExtractionError("字幕获取失败：timeout")
+    for _ in range(2):
+        with pytest.raises(ContentExtractionError):
+            await extractors.ingest_youtube_url_v1(URL)
+    assert fetch.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_probe_rejection_cancels_transcript_fetch(youtube_calls):
+    probe, fetch = youtube_calls
+    probe.side_effect = ContentExtractionError(
+        "暂不支持直播视频", details={"reason": "unsupported_video"}
+    )
+    started = asyncio.Event()
+    cancelled = asyncio.Event()
+
+    async def slow_fetch(**kwargs):
+        started.set()
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    fetch.side_effect = slow_fetch
+    with pytest.raises(ContentExtractionError, match="直播"):
+        await asyncio.wait_for(extractors.ingest_youtube_url_v1(URL), timeout=2)
+    await asyncio.sleep(0)
+    # 字幕拉取与探测同时开始，探测拒绝后被取消
+    assert started.is_set()
+    assert cancelled.is_set()
+    assert fetch.await_args.kwargs["video_id"] == "dQw4w9WgXcQ"
+
+
+def _serve_watch_page(monkeypatch, name):
+    html = (FIXTURES / name).read_text(encoding="utf-8")
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, text=html)
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(provider_clients, "get_http_client", lambda: client)
+    return requests
+
+
+@pytest.mark.parametrize(
+    "name, expected",
+    [
+        ("watch_public.html", {"id": "dQw4w9WgXcQ", "duration": 212, "is_live": False}),
+        ("watch_live.html", {"id": "jfKfPfyJRdk", "duration": 0, "is_live": True}),
+        ("watch_login_required.html", None),
+    ],
+)
+@pytest.mark.asyncio
+async def test_fast_probe_reads_player_response(monkeypatch, name, expected):
+    requests = _serve_watch_page(monkeypatch, name)
+    info = await youtube_probe.fetch_basic_info("dQw4w9WgXcQ")
+    # 经由共享的异步 client 请求，并携带跳过 cookie 同意页的 cookie
+    assert "CONSENT=" in requests[0].headers["cookie"]
+    if expected is None:
+        assert info is None
+    else:
+        assert {k: info[k] for k in expected} == expected
+        assert info["availability"] == "public"
+
+
+@pytest.mark.asyncio
+async def test_fast_probe_falls_back_to_ytdlp(monkeypatch):
+    monkeypatch.setattr(extractors, "YOUTUBE_PROBE_MODE", "fast")
+    ydl = MagicMock()
+    ydl.extract_info.return_value = {**PROBE, "id": "aaaaaaaaaaa", "age_limit": 18}
+    monkeypatch.setattr(extractors, "_get_youtube_dl", lambda: ydl)
+
+    _serve_watch_page(monkeypatch, "watch_public.html")
+    basic = await extractors.probe_youtube_basic_info(URL)
+    assert basic["title"].startswith("Rick Astley")
+    assert ydl.extract_info.call_count == 0
+
+    # 需要登录（年龄限制）时由 yt-dlp 给出权威判断
+    _serve_watch_page(monkeypatch, "watch_login_required.html")
+    with pytest.raises(ContentExtractionError, match="Age restricted"):
+        await extractors.probe_youtube_basic_info(URL)
+    assert ydl.extract_info.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_caption_strategies_race_after_head_start():
+    cancelled = asyncio.Event()
+
+    async def slow():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    async def empty():
+        return ""
+
+    async def fast():
+        await asyncio.sleep(0.01)
+        return "caption"
+
+    async def hanging():
+        await asyncio.sleep(10)
+
+    wins = dict(extractors.caption_metrics["wins"])
+    text = await asyncio.wait_for(
+        extractors._race_caption_strategies(
+            [("slow", slow), ("empty", empty), ("fast", fast), ("hanging", hanging)],
+            head_start=0.05,
+            timeout=5,
+        ),
+        timeout=2,
+    )
+    await asyncio.sleep(0)
+    assert text == "caption"
+    assert cancelled.is_set()
+    assert extractors.caption_metrics["wins"]["fast"] == wins.get("fast", 0) + 1
+
+    # 先行方式在领先期内失败时立即启动备用方式；单个方式超时不影响其余方式
+    text = await asyncio.wait_for(
+        extractors._race_caption_strategies(
+            [("empty", empty), ("hanging", hanging), ("fast", fast)],
+            head_start=5,
+            timeout=0.05,
+        ),
+        timeout=2,
+    )
+    assert text == "caption"